@@ -0,0 +1,334 @@
+"""
+Benchmark suite and regression gate for the forensics pipeline.
+
+The suite runs py_parser extractors (full, incremental and recovering parses),
+lint_engine detectors, the frequency reports and mining.checkPythonFile over
+a synthetic corpus (synthetic_corpus.py), and reports throughput (files/s,
+MB/s, rows/s) and tracemalloc peak memory next to the timings.
+
+    python benchmarks.py                      # run and compare against benchmarks_baseline.json
+    python benchmarks.py --update-baseline    # re-record the baseline after an intended change
+    python ci_runner.py --bench               # tests, then this gate
+
+Every benchmark is warmed up, then timed REPEATS times. Each timing is
+divided by a fixed pure-Python calibration loop run just before it, so a
+baseline recorded on one machine can be checked on another. A benchmark regresses
+when its median exceeds the baseline median by more than its tolerance AND a
+one-sided Mann-Whitney U test on the samples says it is slower (p < ALPHA).
+"""
+
+import os
+import sys
+import json
+import math
+import itertools
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+FORENSICS = os.path.join(BASE, "forensics")
+sys.path.insert(0, FORENSICS)
+sys.path.insert(0, BASE)
+
+BASELINE_FILE = os.path.join(BASE, "benchmarks_baseline.json")
+WARMUPS = 2
+REPEATS = 15
+ALPHA = 0.01
+DEFAULT_TOLERANCE = 0.25
+
+BENCHMARKS = []
+WORK_DIRS = []            # scratch directories made by benchmark setups, removed after the run
+
+def benchmark(name, tolerance=DEFAULT_TOLERANCE):
+    # the decorated function does its setup and returns the callable to time
+    # and the work one call does ({'files': .., 'bytes': .., 'rows': ..})
+    def register(setup_fn):
+        BENCHMARKS.append({"name": name, "setup": setup_fn, "tolerance": tolerance})
+        return setup_fn
+    return register
+
+# ---------------------------------------------------------
+# Inputs: one synthetic corpus, generated on first use
+# ---------------------------------------------------------
+CORPUS_OPTIONS = {"repos": 6, "files_per_repo": 8, "notebook_ratio": 0.1, "seed": 2021, "median_lines": 80}
+LINT_FILES = 8            # lint_engine runs every detector per file; a slice keeps the suite short
+_corpus = {}
+
+def make_work_dir():
+    work_dir = tempfile.mkdtemp(prefix="bench_")
+    WORK_DIRS.append(work_dir)
+    return work_dir
+
+def get_corpus():
+    if not _corpus:
+        import synthetic_corpus
+        corpus_dir = make_work_dir()
+        manifest_ = synthetic_corpus.generateCorpus(corpus_dir, **CORPUS_OPTIONS)
+        _corpus.update(dir=corpus_dir, manifest=manifest_,
+                       results=synthetic_corpus.dumpResultsCsv(manifest_, os.path.join(corpus_dir, "V5_OUTPUT_SYNTHETIC.csv")))
+        _corpus["sources"] = []
+        for entry_ in manifest_:
+            with open(entry_["FILE"]) as f:
+                _corpus["sources"].append((entry_["FILE"], f.read()))
+    return _corpus
+
+def get_work(sources):
+    return {"files": len(sources), "bytes": sum(len(source_) for _, source_ in sources)}
+
+# ---------------------------------------------------------
+# Suite
+# ---------------------------------------------------------
+@benchmark("py_parser.extractors")
+def bench_py_parser():
+    import py_parser
+    sources_ = [(file_, py_parser.getNotebookSource(source_) if file_.endswith(".ipynb") else source_)
+                for file_, source_ in get_corpus()["sources"]]
+    def run():
+        for file_, source_ in sources_:
+            tree_ = py_parser.getPythonParseObjectFromSource(source_, file_)
+            py_parser.getFunctionAssignments(tree_)
+            py_parser.getFunctionDefinitions(tree_)
+            py_parser.getPythonAttributeFuncs(tree_)
+            py_parser.getModelFeature(tree_)
+    return run, get_work(sources_)
+
+@benchmark("py_parser.incremental")
+def bench_py_parser_incremental():
+    # every run inserts a new top-level line mid-file, so only that segment is parsed
+    import py_parser
+    sources_ = []
+    for file_, source_ in get_corpus()["sources"]:
+        if not file_.endswith(".ipynb"):
+            segments_ = py_parser.getTopLevelSegments(source_)
+            split_ = segments_[len(segments_) // 2][0] - 1
+            lines_ = source_.split("\n")
+            sources_.append((file_, "\n".join(lines_[:split_]), "\n".join(lines_[split_:])))
+    edits_ = itertools.count()
+    def run():
+        edit_ = next(edits_)
+        for file_, head_, tail_ in sources_:
+            tree_ = py_parser.getPythonParseObjectIncremental(f"{head_}\nedit_{edit_} = {edit_}\n{tail_}", file_)
+            py_parser.getFunctionAssignments(tree_)
+            py_parser.getFunctionDefinitions(tree_)
+            py_parser.getPythonAttributeFuncs(tree_)
+            py_parser.getModelFeature(tree_)
+    return run, get_work([(file_, head_ + tail_) for file_, head_, tail_ in sources_])
+
+@benchmark("py_parser.recovery")
+def bench_py_parser_recovery():
+    # a Python 2 print statement mid-file; a cold segment cache, as in a scan
+    import py_parser
+    sources_ = []
+    for file_, source_ in get_corpus()["sources"]:
+        if not file_.endswith(".ipynb"):
+            segments_ = py_parser.getTopLevelSegments(source_)
+            lines_ = source_.split("\n")
+            lines_.insert(segments_[len(segments_) // 2][0] - 1, "print 'checkpoint'")
+            sources_.append((file_, "\n".join(lines_)))
+    def run():
+        py_parser.SEGMENT_CACHE.clear()
+        for file_, source_ in sources_:
+            tree_ = py_parser.getPythonParseObjectFromSource(source_, file_)
+            py_parser.getFunctionAssignments(tree_)
+            py_parser.getFunctionDefinitions(tree_)
+            py_parser.getPythonAttributeFuncs(tree_)
+            py_parser.getModelFeature(tree_)
+    return run, get_work(sources_)
+
+@benchmark("lint_engine.getEventCounts")
+def bench_lint_engine():
+    import lint_engine
+    sources_ = get_corpus()["sources"][:LINT_FILES]
+    def run():
+        for file_, source_ in sources_:
+            lint_engine.getEventCounts(file_, source_)
+    return run, get_work(sources_)
+
+@benchmark("frequency.reportProportion", tolerance=0.35)
+def bench_report_proportion():
+    import frequency
+    corpus_ = get_corpus()
+    output_file = os.path.join(corpus_["dir"], "PROPORTION_SYNTHETIC.csv")
+    return lambda: frequency.reportProportion(corpus_["results"], output_file), {"rows": len(corpus_["manifest"])}
+
+@benchmark("frequency.reportEventDensity", tolerance=0.35)
+def bench_report_density():
+    # reads every file listed in the results for its SLOC
+    import frequency
+    corpus_ = get_corpus()
+    output_file = os.path.join(corpus_["dir"], "DENSITY_SYNTHETIC.csv")
+    return (lambda: frequency.reportEventDensity(corpus_["results"], output_file),
+            dict(get_work(corpus_["sources"]), rows=len(corpus_["manifest"])))
+
+@benchmark("mining.checkPythonFile")
+def bench_check_python_file():
+    import mining
+    corpus_ = get_corpus()
+    return lambda: mining.checkPythonFile(corpus_["dir"]), get_work(corpus_["sources"])
+
+# ---------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------
+def calibration_loop():
+    # fixed interpreter work (arithmetic, allocation, dict and string ops), a few ms
+    table_ = {}
+    for i_ in range(20000):
+        table_[str(i_)] = [i_ * i_ % 7, i_]
+    return sorted(table_, key=len)
+
+def time_samples(fn, warmups, repeats):
+    # each timing is paired with a calibration run right before it, so CPU
+    # frequency and noisy-neighbour drift during the run divide out
+    for _ in range(warmups):
+        calibration_loop()
+        fn()
+    samples_, calibrations_ = [], []
+    for _ in range(repeats):
+        start_ = time.perf_counter()
+        calibration_loop()
+        middle_ = time.perf_counter()
+        fn()
+        end_ = time.perf_counter()
+        calibrations_.append(middle_ - start_)
+        samples_.append(end_ - middle_)
+    return samples_, calibrations_
+
+def peak_memory(fn):
+    # separate run: tracemalloc slows the timed ones down
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def get_throughput(work, seconds):
+    # files/s, MB/s and rows/s for the units the benchmark declares
+    rates_ = {"files": ("files_per_s", 1), "bytes": ("mb_per_s", 1e6), "rows": ("rows_per_s", 1)}
+    return {rates_[unit_][0]: round(amount_ / rates_[unit_][1] / seconds, 2) for unit_, amount_ in work.items() if seconds}
+
+def describe(samples):
+    q1_, median_, q3_ = statistics.quantiles(samples, n=4) if len(samples) > 1 else (samples[0],) * 3
+    return {"median": median_, "q1": q1_, "q3": q3_, "iqr": q3_ - q1_}
+
+def mann_whitney_p(slower, faster):
+    # one-sided p-value that `slower` is stochastically larger (normal approximation, tie-corrected ranks)
+    pooled_ = sorted([(v_, 0) for v_ in slower] + [(v_, 1) for v_ in faster])
+    ranks_, i_ = [0.0] * len(pooled_), 0
+    while i_ < len(pooled_):
+        j_ = i_
+        while j_ + 1 < len(pooled_) and pooled_[j_ + 1][0] == pooled_[i_][0]:
+            j_ += 1
+        for k_ in range(i_, j_ + 1):
+            ranks_[k_] = (i_ + j_) / 2 + 1
+        i_ = j_ + 1
+    n1_, n2_ = len(slower), len(faster)
+    rank_sum = sum(r_ for r_, (_, group_) in zip(ranks_, pooled_) if group_ == 0)
+    u_ = rank_sum - n1_ * (n1_ + 1) / 2
+    mean_u, sd_u = n1_ * n2_ / 2, math.sqrt(n1_ * n2_ * (n1_ + n2_ + 1) / 12)
+    if sd_u == 0:
+        return 1.0
+    z_ = (u_ - mean_u) / sd_u
+    return 0.5 * math.erfc(z_ / math.sqrt(2))
+
+def run_suite(names=None, warmups=WARMUPS, repeats=REPEATS):
+    saved_stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    logging.disable(logging.CRITICAL)
+    results_, calibrations_ = {}, []
+    try:
+        for bench_ in BENCHMARKS:
+            if names and bench_["name"] not in names:
+                continue
+            run_, work_ = bench_["setup"]()
+            samples_, bench_calibrations = time_samples(run_, warmups, repeats)
+            relative_ = [s_ / c_ for s_, c_ in zip(samples_, bench_calibrations)]
+            calibrations_.extend(bench_calibrations)
+            seconds_ = statistics.median(samples_)
+            results_[bench_["name"]] = dict(describe(relative_), samples=relative_, seconds=seconds_,
+                                            tolerance=bench_["tolerance"], peak_bytes=peak_memory(run_),
+                                            throughput=get_throughput(work_, seconds_))
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+        logging.disable(logging.NOTSET)
+        _corpus.clear()
+        while WORK_DIRS:
+            shutil.rmtree(WORK_DIRS.pop(), ignore_errors=True)
+    return {"calibration_seconds": statistics.median(calibrations_) if calibrations_ else 0.0, "benchmarks": results_}
+
+def compare(current, baseline):
+    verdicts_ = []
+    for name_, cur_ in current["benchmarks"].items():
+        base_ = baseline["benchmarks"].get(name_)
+        if base_ is None:
+            verdicts_.append({"name": name_, "status": "new", "ratio": None, "p": None})
+            continue
+        ratio_ = cur_["median"] / base_["median"]
+        p_ = mann_whitney_p(cur_["samples"], base_["samples"])
+        tolerance_ = base_.get("tolerance", cur_["tolerance"])
+        if ratio_ > 1 + tolerance_ and p_ < ALPHA:
+            status_ = "regressed"
+        elif ratio_ < 1 - tolerance_ and mann_whitney_p(base_["samples"], cur_["samples"]) < ALPHA:
+            status_ = "improved"
+        else:
+            status_ = "ok"
+        verdicts_.append({"name": name_, "status": status_, "ratio": round(ratio_, 3), "p": round(p_, 5), "tolerance": tolerance_})
+    return verdicts_
+
+def format_report(current, verdicts):
+    lines_ = [f"calibration loop: {current['calibration_seconds'] * 1000:.2f} ms"]
+    for verdict_ in verdicts:
+        cur_ = current["benchmarks"][verdict_["name"]]
+        rates_ = ", ".join(f"{value_} {unit_.replace('_per_s', '/s').replace('mb', 'MB')}" for unit_, value_ in cur_["throughput"].items())
+        line_ = (f"{verdict_['status']:9} {verdict_['name']:30} median {cur_['seconds'] * 1000:8.2f} ms "
+                 f"({cur_['median']:.2f} x cal, IQR {cur_['iqr']:.2f}) {rates_}, peak {cur_['peak_bytes'] / 2 ** 20:.1f} MiB")
+        if verdict_["ratio"] is not None:
+            line_ += f"  vs baseline x{verdict_['ratio']} (tolerance {verdict_['tolerance']:.0%}, p={verdict_['p']})"
+        lines_.append(line_)
+    return "\n".join(lines_)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--update-baseline", action="store_true", help=f"record the results as {os.path.basename(BASELINE_FILE)}")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--output", help="write results and verdicts as JSON")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("names", nargs="*", help="only these benchmarks")
+    opts = parser.parse_args(argv)
+
+    current_ = run_suite(opts.names, repeats=opts.repeats)
+    if opts.update_baseline:
+        baseline_ = {"benchmarks": {}}
+        if os.path.exists(opts.baseline):
+            with open(opts.baseline) as f:
+                baseline_ = json.load(f)
+        baseline_["benchmarks"].update(current_["benchmarks"])
+        with open(opts.baseline, "w") as f:
+            json.dump(baseline_, f, indent=1, sort_keys=True)
+        print(format_report(current_, [{"name": n_, "status": "recorded", "ratio": None} for n_ in current_["benchmarks"]]))
+        print(f"Baseline written to {opts.baseline}")
+        return 0
+
+    if not os.path.exists(opts.baseline):
+        print(f"No baseline at {opts.baseline}; run with --update-baseline")
+        return 1
+    with open(opts.baseline) as f:
+        baseline_ = json.load(f)
+    verdicts_ = compare(current_, baseline_)
+    print(format_report(current_, verdicts_))
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump({"results": current_, "verdicts": verdicts_}, f, indent=1)
+    regressed_ = [v_["name"] for v_ in verdicts_ if v_["status"] == "regressed"]
+    if regressed_:
+        print(f"Performance regressions: {', '.join(regressed_)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,50 +1,273 @@
 import subprocess
 import sys
 import os
+import json
+import time
+import shutil
+import signal
+import hashlib
+import argparse
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-print("*" * 50)
-print("Starting local CI runner")
-print("*" * 50)
-print()
+BASE = os.path.dirname(os.path.abspath(__file__))
 
 # List of tests to run (relative paths)
 tests = [
     "forensics/test_logging_frequency.py",
     "forensics/test_logging_mining.py",
-    "forensics/test_logging_py_parser.py"
+    "forensics/test_logging_py_parser.py",
+    "forensics/test_logging_blob_miner.py",
+    "forensics/test_logging_archive_scanner.py",
+    "forensics/test_logging_scanner.py",
+    "forensics/test_logging_content_store.py",
+    "forensics/test_logging_forensic_logging.py",
+    "forensics/test_logging_tracing.py",
+    "forensics/test_logging_log_analyzer.py",
+    "forensics/test_logging_fuzz_engine.py",
+    "forensics/test_logging_scan_pool.py",
+    "forensics/test_logging_synthetic_corpus.py",
+    "forensics/test_logging_ci_runner.py",
+    "forensics/test_logging_lint_engine.py"
 ]
 
-def run_test(test_path):
-    print(f"Running {test_path}...\n")
+TEST_TIMEOUT = 300        # seconds per test script
+RESULTS_DIR = "ci_results"
+POLL_INTERVAL = 0.05
 
-    result = subprocess.run(
-        ["python3", test_path],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
+# Test-impact selection (--changed-since)
+GRAPH_CACHE = os.path.join(".ci_cache", "import_graph.json")
+MODULE_DIRS = ["", "forensics"]       # flat layout: modules are imported by bare name from these folders
+# shared by everything, or outside the import graph: a change here runs the whole suite
+FULL_RUN_TRIGGERS = {"forensics/constants.py", "ci_runner.py", "requirements.txt", "workflows/ci.yml"}
+NO_TEST_CHANGES = (".md", "LICENSE", ".gitignore", "benchmarks_baseline.json")
 
-    print(result.stdout)
+def get_test_name(test_path):
+    return os.path.splitext(os.path.basename(test_path))[0]
 
-    if result.returncode != 0:
-        print(result.stderr)
-        print(f"❌ {test_path} failed!")
-        return False
-    
-    print(f"✅ {test_path} passed!\n")
-    return True
+def run_test(test_path, timeout, results_dir):
+    # every test gets its own working directory: the scripts write logs and
+    # scratch files (forensics.log, dummy_sloc_test/, ...) relative to the cwd
+    name = get_test_name(test_path)
+    work_dir = tempfile.mkdtemp(prefix=f"ci_{name}_")
+    stdout_path, stderr_path = os.path.join(work_dir, "stdout.txt"), os.path.join(work_dir, "stderr.txt")
+    started = time.monotonic()
+    timed_out = False
+    with open(stdout_path, "w") as out_, open(stderr_path, "w") as err_:
+        # own session, so a timeout also kills the worker processes the test started
+        proc = subprocess.Popen([sys.executable, os.path.join(BASE, test_path)], cwd=work_dir, stdout=out_, stderr=err_,
+                                start_new_session=True)
+        # wait4 instead of communicate(): it also returns the child's rusage (peak RSS)
+        while True:
+            pid_, status_, usage_ = os.wait4(proc.pid, os.WNOHANG)
+            if pid_:
+                break
+            if time.monotonic() - started > timeout:
+                timed_out = True
+                os.killpg(proc.pid, signal.SIGKILL)
+                pid_, status_, usage_ = os.wait4(proc.pid, 0)
+                break
+            time.sleep(POLL_INTERVAL)
+    proc.returncode = os.waitstatus_to_exitcode(status_)
+    wall_time = time.monotonic() - started
 
+    with open(stdout_path) as f:
+        stdout_ = f.read()
+    with open(stderr_path) as f:
+        stderr_ = f.read()
+    # keep the logs the test wrote; the CI workflow uploads them
+    log_dir = os.path.join(results_dir, "logs", name)
+    for file_ in os.listdir(work_dir):
+        if file_.endswith(".log"):
+            os.makedirs(log_dir, exist_ok=True)
+            shutil.copy(os.path.join(work_dir, file_), log_dir)
+    shutil.rmtree(work_dir, ignore_errors=True)
 
-all_passed = True
+    status = "timeout" if timed_out else ("passed" if proc.returncode == 0 else "failed")
+    return {
+        "test": test_path,
+        "name": name,
+        "status": status,
+        "returncode": proc.returncode,
+        "wall_seconds": round(wall_time, 3),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_bytes": usage_.ru_maxrss * 1024,
+        "stdout": stdout_,
+        "stderr": stderr_,
+    }
 
-for test in tests:
-    ok = run_test(test)
-    if not ok:
-        all_passed = False
+def write_junit(results, junit_path):
+    suite = ET.Element("testsuite", name="ci_runner", tests=str(len(results)),
+                       failures=str(sum(r["status"] == "failed" for r in results)),
+                       errors=str(sum(r["status"] == "timeout" for r in results)),
+                       time=str(round(sum(r["wall_seconds"] for r in results), 3)))
+    for result in results:
+        case = ET.SubElement(suite, "testcase", classname="forensics", name=result["name"], time=str(result["wall_seconds"]))
+        ET.SubElement(case, "properties").append(ET.Element("property", name="peak_rss_bytes", value=str(result["peak_rss_bytes"])))
+        if result["status"] == "failed":
+            ET.SubElement(case, "failure", message=f"exit code {result['returncode']}").text = result["stderr"][-4000:]
+        elif result["status"] == "timeout":
+            ET.SubElement(case, "error", type="timeout", message=f"killed after {result['wall_seconds']}s").text = result["stderr"][-4000:]
+        ET.SubElement(case, "system-out").text = result["stdout"][-4000:]
+    ET.ElementTree(suite).write(junit_path, encoding="utf-8", xml_declaration=True)
 
-print("*" * 50)
-if all_passed:
-    print("All tests passed successfully!")
-else:
-    print("Some tests failed! Check logs.")
-print("*" * 50)
+def write_summary(results, summary_path, wall_time):
+    summary = {
+        "passed": sum(r["status"] == "passed" for r in results),
+        "failed": sum(r["status"] == "failed" for r in results),
+        "timed_out": sum(r["status"] == "timeout" for r in results),
+        "wall_seconds": round(wall_time, 3),
+        "tests": [{k: v for k, v in r.items() if k not in ("stdout", "stderr")} for r in results],
+    }
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def report(result):
+    if result["status"] != "passed":
+        print(result["stdout"])
+        print(result["stderr"])
+    timing = f"({result['wall_seconds']}s, {result['peak_rss_bytes'] // (1024 * 1024)} MiB)"
+    if result["status"] == "passed":
+        print(f"✅ {result['test']} passed! {timing}")
+    elif result["status"] == "timeout":
+        print(f"❌ {result['test']} timed out! {timing}")
+    else:
+        print(f"❌ {result['test']} failed! {timing}")
+
+def get_module_files():
+    # module name -> path relative to BASE; the forensics folder wins a name clash, as on the tests' sys.path
+    module_files = {}
+    for dir_ in MODULE_DIRS:
+        for file_ in sorted(os.listdir(os.path.join(BASE, dir_))):
+            if file_.endswith(".py"):
+                module_files[file_[:-3]] = os.path.join(dir_, file_) if dir_ else file_
+    return module_files
+
+def build_import_graph(cache_file=GRAPH_CACHE):
+    # path -> set of paths it imports; parsed imports are cached by content hash
+    sys.path.insert(0, os.path.join(BASE, "forensics"))
+    import py_parser
+    cache_path = os.path.join(BASE, cache_file)
+    try:
+        with open(cache_path) as f:
+            cached_imports = json.load(f)
+    except (OSError, ValueError):
+        cached_imports = {}
+    module_files = get_module_files()
+    graph, current_imports = {}, {}
+    for path_ in module_files.values():
+        with open(os.path.join(BASE, path_), "rb") as f:
+            source_ = f.read()
+        digest_ = hashlib.sha1(source_).hexdigest()
+        if digest_ not in cached_imports:
+            tree_ = py_parser.getPythonParseObjectFromSource(source_.decode("utf-8", "replace"), path_)
+            cached_imports[digest_] = py_parser.getImportedModules(tree_)
+        current_imports[digest_] = cached_imports[digest_]
+        # `import a.b` and `from a.b import c` depend on a
+        graph[path_] = {module_files[m_.split(".")[0]] for m_ in cached_imports[digest_] if m_.split(".")[0] in module_files}
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump(current_imports, f)
+    return graph
+
+def get_changed_files(ref):
+    # committed, staged and unstaged changes against ref, plus untracked files
+    try:
+        changed_ = subprocess.check_output(["git", "diff", "--name-only", ref, "--"], cwd=BASE, text=True).split()
+        changed_ += subprocess.check_output(["git", "ls-files", "--others", "--exclude-standard"], cwd=BASE, text=True).split()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Could not diff against {ref} ({e}); running every test")
+        return None
+    return sorted(set(changed_))
+
+def get_import_closure(path_, graph):
+    seen_, stack_ = {path_}, [path_]
+    while stack_:
+        for dep_ in graph.get(stack_.pop(), ()):
+            if dep_ not in seen_:
+                seen_.add(dep_)
+                stack_.append(dep_)
+    return seen_
+
+def select_tests(test_list, changed, graph):
+    # returns the tests to run and why
+    if changed is None:
+        return list(test_list), "no diff available"
+    changed_modules = set()
+    for path_ in changed:
+        if path_ in FULL_RUN_TRIGGERS:
+            return list(test_list), f"{path_} changed"
+        if path_.endswith(NO_TEST_CHANGES):
+            continue
+        if path_ not in graph:
+            # data files, deleted modules, anything the graph cannot see
+            return list(test_list), f"{path_} is outside the import graph"
+        changed_modules.add(path_)
+    selected_ = [test_ for test_ in test_list if get_import_closure(test_, graph) & changed_modules]
+    return selected_, f"{len(changed_modules)} changed module(s)"
+
+def run_benchmarks(results_dir, update_baseline=False):
+    # separate interpreter, after the tests: nothing else competes for the CPU
+    command = [sys.executable, os.path.join(BASE, "benchmarks.py")]
+    command += ["--update-baseline"] if update_baseline else ["--output", os.path.join(results_dir, "benchmarks.json")]
+    return subprocess.run(command, cwd=BASE).returncode
+
+def run_tests(test_list, jobs, timeout, results_dir):
+    os.makedirs(results_dir, exist_ok=True)
+    started = time.monotonic()
+    results = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(run_test, test, timeout, results_dir) for test in test_list]
+        for future in as_completed(futures):
+            result = future.result()
+            report(result)
+            results.append(result)
+    results.sort(key=lambda r: test_list.index(r["test"]))
+    write_junit(results, os.path.join(results_dir, "junit.xml"))
+    return write_summary(results, os.path.join(results_dir, "summary.json"), time.monotonic() - started)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="test scripts run in parallel")
+    parser.add_argument("--timeout", type=float, default=TEST_TIMEOUT, help="seconds before a test is killed")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="junit.xml, summary.json and test logs")
+    parser.add_argument("--bench", action="store_true", help="fail on regressions against benchmarks_baseline.json")
+    parser.add_argument("--update-baseline", action="store_true", help="re-record benchmarks_baseline.json and exit")
+    parser.add_argument("--changed-since", metavar="REF", help="only run tests that import files changed since this git ref")
+    opts = parser.parse_args()
+
+    if opts.update_baseline:
+        sys.exit(run_benchmarks(opts.results_dir, update_baseline=True))
+
+    print("*" * 50)
+    print("Starting local CI runner")
+    print("*" * 50)
+    print()
+
+    selected_tests = tests
+    if opts.changed_since:
+        changed_files = get_changed_files(opts.changed_since)
+        selected_tests, reason = select_tests(tests, changed_files, build_import_graph())
+        print(f"Test-impact selection against {opts.changed_since}: {len(selected_tests)} of {len(tests)} tests ({reason})")
+        for test in sorted(set(tests) - set(selected_tests)):
+            print(f"⏭️  {test} skipped, not affected")
+        print()
+
+    summary = run_tests(selected_tests, opts.jobs, opts.timeout, opts.results_dir)
+
+    print("*" * 50)
+    print(f"{summary['passed']} passed, {summary['failed']} failed, {summary['timed_out']} timed out in {summary['wall_seconds']}s")
+    if summary["failed"] == 0 and summary["timed_out"] == 0:
+        print("All tests passed successfully!")
+    else:
+        print("Some tests failed! Check logs.")
+    print("*" * 50)
+    tests_ok = summary["failed"] == 0 and summary["timed_out"] == 0
+    bench_ok = True
+    if opts.bench and tests_ok:
+        print("Running benchmark gate")
+        bench_ok = run_benchmarks(opts.results_dir) == 0
+        print(f"{'✅' if bench_ok else '❌'} benchmarks {'within baseline' if bench_ok else 'regressed'}!")
+    sys.exit(0 if tests_ok and bench_ok else 1)
@@ -0,0 +1,68 @@
+'''
+Scan .tar(.gz/.bz2/.xz) and .zip corpus snapshots without extracting them.
+Python and notebook members are read straight from the decompression stream
+and reported under <archive path>/<member path> identifiers.
+'''
+
+import os
+import logging
+import tarfile
+import zipfile
+
+import mining
+import scanner
+import forensic_logging
+
+def getMemberRepo(archive_path, member_name):
+    # snapshots hold one repo per top-level folder
+    parts_ = member_name.strip('/').split('/')
+    if len(parts_) > 1:
+        return os.path.join(archive_path, parts_[0])
+    return archive_path
+
+def iterArchiveFiles(archive_path):
+    logging.info("Streaming Python members of %s", archive_path)
+    member_count = 0
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zip_:
+            for info_ in zip_.infolist():
+                if info_.is_dir() or not info_.filename.endswith(scanner.SCAN_EXTENSIONS):
+                    continue
+                with zip_.open(info_) as member_:
+                    member_count += 1
+                    yield info_.filename, scanner.decodeSource(member_.read())
+    else:
+        # 'r|*' reads the archive as a forward-only stream, no seeks, nothing on disk
+        with tarfile.open(archive_path, 'r|*') as tar_:
+            for info_ in tar_:
+                if not info_.isfile() or not info_.name.endswith(scanner.SCAN_EXTENSIONS):
+                    continue
+                member_count += 1
+                yield info_.name, scanner.decodeSource(tar_.extractfile(info_).read())
+    logging.info("Streamed %s members of %s", member_count, archive_path)
+
+def checkArchivePatterns(archive_path):
+    # archive counterpart of mining.checkPythonFile
+    usageCount = 0
+    for member_name, source in iterArchiveFiles(archive_path):
+        usageCount += mining.checkPythonSource(source, os.path.join(archive_path, member_name))
+    logging.info("Total patterns found in %s: %s", archive_path, usageCount)
+    return usageCount
+
+def iterArchiveRows(archive_path):
+    for member_name, source in iterArchiveFiles(archive_path):
+        yield getMemberRepo(archive_path, member_name), os.path.join(archive_path, member_name), source
+
+def scanArchive(archive_path):
+    logging.info("Scanning archive %s", archive_path)
+    scan_list, dedup_stats = scanner.scanFiles(iterArchiveRows(archive_path))
+    scanner.getDedupReport(dedup_stats)
+    return scan_list
+
+if __name__ == '__main__':
+    forensic_logging.setupForensicLogging('forensics.log')
+    import sys
+    all_rows = []
+    for archive_ in sys.argv[1:]:
+        all_rows += scanArchive(archive_)
+    scanner.dumpScan(all_rows, 'ARCHIVE_SCAN.csv')
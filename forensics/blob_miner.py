@@ -0,0 +1,144 @@
+'''
+Mine lint_engine event counts straight from a repository's object database.
+Blob contents are streamed through one `git cat-file --batch` process, so no
+commit is ever checked out, and each distinct blob id is analysed only once.
+'''
+
+import csv
+import logging
+import subprocess
+
+import constants
+import scanner
+import lint_engine
+import forensic_logging
+
+# ----------------------------
+# git cat-file --batch access
+# ----------------------------
+
+def openCatFileBatch(repo_path):
+    logging.info("Starting cat-file batch reader for %s", repo_path)
+    return subprocess.Popen(['git', '-C', repo_path, 'cat-file', '--batch'],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+def readBlob(cat_proc, blob_id):
+    cat_proc.stdin.write(f"{blob_id}\n".encode())
+    cat_proc.stdin.flush()
+    header = cat_proc.stdout.readline().decode().split()
+    if len(header) < 3 or header[1] == constants.GIT_MISSING_KW:
+        logging.error("Blob %s not found in object database", blob_id)
+        return None
+    content = cat_proc.stdout.read(int(header[2]))
+    cat_proc.stdout.read(1)  # trailing newline after every object
+    return content
+
+def closeCatFileBatch(cat_proc):
+    cat_proc.stdin.close()
+    cat_proc.wait()
+    logging.info("Closed cat-file batch reader")
+
+# ----------------------------
+# Commit and tree enumeration
+# ----------------------------
+
+def listCommits(repo_path, branchName='master'):
+    logging.info("Listing commits of %s on branch %s", repo_path, branchName)
+    cmd_ = ['git', '-C', repo_path, 'log', '--reverse', '--format=%H %cs', branchName]
+    try:
+        output = subprocess.check_output(cmd_, stderr=subprocess.DEVNULL).decode()
+    except subprocess.CalledProcessError as e:
+        logging.warning("Skipping repo %s due to branch name problem: %s", repo_path, e)
+        return []
+    commits = [tuple(line_.split(' ', 1)) for line_ in output.splitlines() if line_]
+    logging.info("Commits found: %s", len(commits))
+    return commits
+
+def listPythonBlobs(repo_path, rev, extensions=(constants.PY_FILE_EXTENSION,)):
+    cmd_ = ['git', '-C', repo_path, 'ls-tree', '-r', '-z', rev]
+    try:
+        output = subprocess.check_output(cmd_, stderr=subprocess.DEVNULL).decode('utf-8', 'replace')
+    except subprocess.CalledProcessError as e:
+        logging.error("Trouble listing tree %s of %s: %s", rev, repo_path, e)
+        return []
+    blob_list = []
+    for entry_ in output.split('\0'):
+        if not entry_:
+            continue
+        meta_, path_ = entry_.split('\t', 1)
+        _, type_, blob_id = meta_.split()
+        if type_ == constants.GIT_BLOB_KW and path_.endswith(extensions):
+            blob_list.append((path_, blob_id))
+    return blob_list
+
+# ----------------------------
+# History mining
+# ----------------------------
+
+def getBlobEventCounts(cat_proc, blob_id, path_, blob_cache):
+    if blob_id not in blob_cache:
+        content = readBlob(cat_proc, blob_id)
+        source = scanner.decodeSource(content) if content is not None else constants.EMPTY_STRING
+        # successive versions of a file share most top-level blocks
+        blob_cache[blob_id] = lint_engine.getEventCounts(path_, source, incremental=True)
+    return blob_cache[blob_id]
+
+def mineHistoryEvents(repo_path, branchName='master'):
+    logging.info("Mining event history of %s", repo_path)
+    categories = list(lint_engine.EVENT_DETECTORS) + [constants.TOTAL_EVENT_COUNT_KW]
+    blob_cache, history_list, file_versions = {}, [], 0
+    cat_proc = openCatFileBatch(repo_path)
+    try:
+        for commit_hash, commit_date in listCommits(repo_path, branchName):
+            totals = dict.fromkeys(categories, 0)
+            blob_list = listPythonBlobs(repo_path, commit_hash)
+            for path_, blob_id in blob_list:
+                blob_counts = getBlobEventCounts(cat_proc, blob_id, path_, blob_cache)
+                for category_ in categories:
+                    totals[category_] += blob_counts[category_]
+            file_versions += len(blob_list)
+            history_list.append((commit_hash, commit_date, len(blob_list)) + tuple(totals[c_] for c_ in categories))
+    finally:
+        closeCatFileBatch(cat_proc)
+    logging.info("Repo %s: %s commits, %s file versions, %s distinct blobs analysed", repo_path, len(history_list), file_versions, len(blob_cache))
+    return history_list
+
+def dumpHistoryEvents(history_list, output_file):
+    header = ['COMMIT', 'COMMIT_DATE', 'PYTHON_FILES'] + list(lint_engine.EVENT_DETECTORS) + [constants.TOTAL_EVENT_COUNT_KW]
+    with open(output_file, 'w', newline='') as fileToWrite:
+        writer = csv.writer(fileToWrite)
+        writer.writerow(header)
+        writer.writerows(history_list)
+    logging.info("History events saved to %s", output_file)
+
+# ----------------------------
+# HEAD scan of bare / mirror repos
+# ----------------------------
+
+def iterHeadFiles(repo_path, rev='HEAD'):
+    # streams (in-repo path, source) pairs of HEAD through one cat-file process
+    blob_list = listPythonBlobs(repo_path, rev, (constants.PY_FILE_EXTENSION, constants.IPYNB_FILE_EXTENSION))
+    logging.info("Streaming %s Python/notebook blobs of %s@%s", len(blob_list), repo_path, rev)
+    cat_proc = openCatFileBatch(repo_path)
+    try:
+        for path_, blob_id in blob_list:
+            content = readBlob(cat_proc, blob_id)
+            if content is not None:
+                yield path_, scanner.decodeSource(content)
+    finally:
+        closeCatFileBatch(cat_proc)
+
+def scanMirrorHead(repo_path, rev='HEAD'):
+    logging.info("Scanning %s of mirror %s", rev, repo_path)
+    scan_results = {}
+    for path_, source in iterHeadFiles(repo_path, rev):
+        scan_results[path_] = lint_engine.getEventCounts(path_, source)
+    logging.info("Scanned %s files in %s", len(scan_results), repo_path)
+    return scan_results
+
+if __name__ == '__main__':
+    forensic_logging.setupForensicLogging('forensics.log')
+    import sys
+    repo_path = sys.argv[1]
+    branch = sys.argv[2] if len(sys.argv) > 2 else 'master'
+    dumpHistoryEvents(mineHistoryEvents(repo_path, branch), 'HISTORY_EVENTS.csv')
@@ -26,3 +26,175 @@ CLASS_KW = "class"
 FEATURE_KW = "feature"
 
 # Any additional constants referenced in py_parser
+
+# lint_engine rule keywords: parent (class) names
+TORCH_KW = "torch"
+DATA_KW = "data"
+PICKLE_KW = "pickle"
+JSON_KW = "json"
+NP_KW = "np"
+PD_KW = "pd"
+YAML_KW = "yaml"
+AGENT_KW = "agent"
+HUB_KW = "hub"
+TF_HUB_KW = "tf_hub"
+IBROSA_KW = "librosa"
+DSET_KW = "dset"
+TARFILE_KW = "tarfile"
+AUDIO_KW = "audio"
+IMAGE_KW = "Image"
+REPLAY_BUFFER_KW = "replay_buffer"
+H5PY_KW = "h5py"
+LATEST_BLOB_KW = "latest_blob"
+BLOB_KW = "blob"
+TAGGING_DATA_LOADER_KW = "tagging_data_loader"
+CAFFE_PARSER_KW = "caffe_parser"
+IO_KW = "io"
+COCO_GT_KW = "coco_gt"
+DATASET_KW = "Dataset"
+DATA_LOADER_FACTORY_KW = "DataLoaderFactory"
+DATA_UTILS_KW = "data_utils"
+FILES_KW = "files"
+VISDOM_LOGGER_KW = "visdom_logger"
+MODEL_KW = "model"
+MODELS_KW = "models"
+NETWORK_KW = "network"
+MODEL_ZOO_KW = "model_zoo"
+DEEP_SPEECH_KW = "DeepSpeech"
+SP_MODEL_KW = "sp_model"
+VGG_KW = "vgg"
+TRAIN_KW = "train"
+MISC_KW = "misc"
+WGET_KW = "wget"
+REQUEST_KW = "request"
+URL_LIB_KW = "urllib"
+ARG_PARSE_KW = "argparse"
+PIPELINE_CONFIG_KW = "pipeline_config"
+OBSERVATION_SPACE_KW = "observation_space"
+ACTION_SPACE_KW = "action_space"
+ENV_KW = "env"
+WRAPPED_ENV_KW = "wrapped_env"
+GYM_KW = "gym"
+KERAS_KW = "keras"
+TENSORFLOW_KW = "tensorflow"
+SYMNET_KW = "symnet"
+TF_KW = "tf"
+LOGGER_KW = "logger"
+
+# lint_engine rule keywords: function / attribute names
+LOAD_KW = "load"
+LOAD_CAPITAL_KW = "Load"
+OPEN_KW = "open"
+FILE_KW = "File"
+MNIST_KW = "MNIST"
+LOAD_WAV_KW = "load_wav"
+DOWNLOAD_TO_FILENAME_KW = "download_to_filename"
+UPLOAD_FROM_FILENAME_KW = "upload_from_filename"
+READ_CSV_KW = "read_csv"
+READ_FILE_KW = "read_file"
+READ_CAFFE_MODEL_KW = "read_caffemodel"
+LOADRES_KW = "loadRes"
+TENSOR_SLICE_KW = "from_tensor_slices"
+GET_DATA_LOADER_KW = "get_data_loader"
+LOAD_CELEBA_KW = "load_celebA"
+LOAD_FILES_LIST_KW = "load_files_list"
+LOAD_PREVIOUS_VALUES_KW = "load_previous_values"
+GET_LOADER_KW = "get_loader"
+FROM_BUFFER_KW = "frombuffer"
+LOAD_RANDOMLY_AUGMENTED_AUDIO_KW = "load_randomly_augmented_audio"
+LOAD_AUDIO_KW = "load_audio"
+LOAD_GENERIC_AUDIO_KW = "load_generic_audio"
+LOAD_IMAGE_DATASET_KW = "load_image_dataset"
+LOAD_ATTRIBUTE_DATASET_KW = "load_attribute_dataset"
+LOAD_VOCAB_FILE_KW = "load_vocab_file"
+LOAD_STATE_DICT_KW = "load_state_dict"
+LOAD_MODEL_KW = "load_model"
+LOAD_NET_KW = "load_net"
+LOAD_URL_KW = "load_url"
+LOAD_MODEL_PACKAGE_KW = "load_model_package"
+LOAD_FROM_NPY_FILE_KW = "load_from_npy_file"
+LOAD_CHECKPOINT_KW = "load_checkpoint"
+LOAD_PARAM_KW = "load_param"
+LOAD_PRETRAINED_KW = "load_pretrained"
+LOAD_LUA_KW = "load_lua"
+LOAD_DECODER_KW = "load_decoder"
+CHECK_POINT_KW = "checkpoint"
+CAFFE_FUNCTION_KW = "CaffeFunction"
+SEQ_LABEL_KW = "SeqLabel"
+DOWNLOAD_KW = "download"
+_DOWNLOAD_KW = "_download"
+DOWNLOAD_FROM_URL_KW = "download_from_url"
+PREPARE_URL_IMAGE_KW = "prepare_url_image"
+URL_OPEN_KW = "urlopen"
+URL_RETRIEVE_KW = "urlretrieve"
+READ_H5FILE_KW = "read_h5file"
+ARRAY_KW = "array"
+CONVERT_KW = "convert"
+AS_TYPE_KW = "astype"
+LOAD_DATA_AND_LABELS_KW = "load_data_and_labels"
+CREATE_DATASET_KW = "create_dataset"
+SHOW_DATA_SUMMARY_KW = "show_data_summary"
+SUMMARY_KW = "summary"
+GET_TENSOR_KW = "get_tensor"
+EVALUATE_KW = "evaluate"
+EVAL_KW = "eval"
+F1_SCORE_KW = "f1_score"
+ACCURACY_SCORE_KW = "accuracy_score"
+CLASSIFICATION_LOSS_KW = "classification_loss"
+CONFUSION_MATRIX_KW = "confusion_matrix"
+ARGUMENT_PARSER_KW = "ArgumentParser"
+GET_CONFIGS_FROM_PIPELINE_FILE_KW = "get_configs_from_pipeline_file"
+TRAIN_EVAL_PIPELINE_CONFIG_KW = "TrainEvalPipelineConfig"
+GET_RAW_FILES_KW = "get_raw_files"
+PATCH_PATH_KW = "patch_path"
+STEP_KW = "step"
+MAKE_KW = "make"
+SHAPE_KW = "shape"
+PREDICT_KW = "predict"
+FIT_KW = "fit"
+MODEL_C_KW = "Model"
+RELU_KW = "relu"
+POINT_NET_CLS_KW = "PointNetCls"
+CLS_KW = "cls"
+CASCADED_MODEL_KW = "cascaded_model"
+PERMUTE_KW = "permute"
+MINIMUM_KW = "minimum"
+GRAPH_KW = "graph"
+VGG_16_GRAPH_KW = "vgg_16_graph"
+IMRE_SIZE_KW = "imresize"
+GET_LOGGER_KW = "getLogger"
+BASIC_CONFIG_KW = "basicConfig"
+INFO_KW = "info"
+
+# lint_engine rule keywords: assignment targets
+LABEL_KW = "label"
+SENT_KW = "sent"
+INPUT_BATCH_LIST_KW = "input_batch_list"
+HP_BATCH_SIZE_KW = "hp_batch_size"
+DUMMY_LOG_KW = "dummy_log"
+
+# lint_engine console output
+CONSOLE_STR_DISPLAY = "{} found at line {} in {}"
+CONSOLE_STR_DATA_LOAD = "DATA_LOAD"
+CONSOLE_STR_MODEL_LOAD = "MODEL_LOAD"
+CONSOLE_STR_DATA_DLOAD = "DATA_DOWNLOAD"
+CONSOLE_STR_MODEL_FEATURE = "MODEL_FEATURE"
+CONSOLE_STR_MODEL_LABEL = "MODEL_LABEL"
+CONSOLE_STR_MODEL_OUTPUT = "MODEL_OUTPUT"
+CONSOLE_STR_PIPELINE = "DATA_PIPELINE"
+CONSOLE_STR_REL_ENV = "ENVIRONMENT"
+
+# Event count columns of the V5 results CSV
+TOTAL_EVENT_COUNT_KW = "TOTAL_EVENT_COUNT"
+
+# Git object access
+GIT_BLOB_KW = "blob"
+GIT_MISSING_KW = "missing"
+PY_FILE_EXTENSION = ".py"
+IPYNB_FILE_EXTENSION = ".ipynb"
+
+# Notebook (.ipynb) JSON fields
+CELLS_KW = "cells"
+CELL_TYPE_KW = "cell_type"
+CODE_KW = "code"
+SOURCE_KW = "source"
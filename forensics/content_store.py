@@ -0,0 +1,97 @@
+'''
+Content-addressed store for the Python files of cloned repos. Each distinct
+file content is kept once under <store>/<sha1[:2]>/<sha1[2:]> and every copy in
+a working tree becomes a hardlink to it, so readers (getAllSLOC, lint_engine)
+see the same paths and bytes. expandRepo undoes the compaction.
+
+Hardlinked copies share one inode: the clones must be treated as read-only
+while compacted, and the store has to live on the same filesystem.
+'''
+
+import os
+import shutil
+import hashlib
+import logging
+
+import constants
+
+def getFileDigest(full_path_file):
+    sha_ = hashlib.sha1()
+    with open(full_path_file, 'rb') as f:
+        for block_ in iter(lambda: f.read(1 << 16), b''):
+            sha_.update(block_)
+    return sha_.hexdigest()
+
+def getStorePath(store_dir, digest_):
+    return os.path.join(store_dir, digest_[:2], digest_[2:])
+
+def iterPythonFiles(repo_path):
+    for root_, _, filenames in os.walk(repo_path):
+        for file_ in filenames:
+            full_path_file = os.path.join(root_, file_)
+            if file_.endswith(constants.PY_FILE_EXTENSION) and os.path.isfile(full_path_file) and not os.path.islink(full_path_file):
+                yield full_path_file
+
+def replaceWithLink(store_file, full_path_file):
+    # link under a temporary name first so the path is never missing
+    tmp_path = full_path_file + '.fslink'
+    os.link(store_file, tmp_path)
+    os.replace(tmp_path, full_path_file)
+
+def compactRepo(repo_path, store_dir):
+    logging.info("Compacting Python files of %s into %s", repo_path, store_dir)
+    store_stats = {'FILES': 0, 'LINKED': 0, 'STORED': 0, 'BYTES_RECLAIMED': 0}
+    for full_path_file in iterPythonFiles(repo_path):
+        store_stats['FILES'] += 1
+        store_file = getStorePath(store_dir, getFileDigest(full_path_file))
+        try:
+            if not os.path.exists(store_file):
+                os.makedirs(os.path.dirname(store_file), exist_ok=True)
+                os.link(full_path_file, store_file)
+                store_stats['STORED'] += 1
+                continue
+            file_stat, store_stat = os.stat(full_path_file), os.stat(store_file)
+            if file_stat.st_ino == store_stat.st_ino:
+                continue
+            replaceWithLink(store_file, full_path_file)
+            store_stats['LINKED'] += 1
+            if file_stat.st_nlink == 1:
+                store_stats['BYTES_RECLAIMED'] += file_stat.st_size
+        except OSError as e:
+            logging.error("Could not link %s into %s: %s", full_path_file, store_dir, e)
+    logging.info("Compacted %s: %s", repo_path, store_stats)
+    return store_stats
+
+def compactRepos(repo_root, store_dir):
+    all_repos = [f.path for f in os.scandir(repo_root) if f.is_dir() and os.path.abspath(f.path) != os.path.abspath(store_dir)]
+    total_stats = {'FILES': 0, 'LINKED': 0, 'STORED': 0, 'BYTES_RECLAIMED': 0}
+    for repo_path in all_repos:
+        for key_, val_ in compactRepo(repo_path, store_dir).items():
+            total_stats[key_] += val_
+    print(f"Compacted {len(all_repos)} repos: {total_stats['FILES']} Python files, {total_stats['STORED']} new store objects, {total_stats['BYTES_RECLAIMED']} bytes reclaimed")
+    return total_stats
+
+def expandRepo(repo_path):
+    # give every linked copy its own inode again
+    logging.info("Expanding hardlinked Python files of %s", repo_path)
+    expanded_count = 0
+    for full_path_file in iterPythonFiles(repo_path):
+        if os.stat(full_path_file).st_nlink > 1:
+            tmp_path = full_path_file + '.fscopy'
+            shutil.copy2(full_path_file, tmp_path)
+            os.replace(tmp_path, full_path_file)
+            expanded_count += 1
+    logging.info("Expanded %s files in %s", expanded_count, repo_path)
+    return expanded_count
+
+def pruneStore(store_dir):
+    # drop objects no working tree links to any more
+    pruned_count = 0
+    for root_, _, filenames in os.walk(store_dir):
+        for file_ in filenames:
+            store_file = os.path.join(root_, file_)
+            if os.stat(store_file).st_nlink == 1:
+                os.remove(store_file)
+                pruned_count += 1
+    logging.info("Pruned %s unreferenced objects from %s", pruned_count, store_dir)
+    return pruned_count
@@ -0,0 +1,66 @@
+'''
+Low-overhead forensic logging.
+
+- setupForensicLogging: the root logger hands records to a queue and a
+  background QueueListener thread does the file writes
+- logSampled: per-call-site sampling for messages logged inside hot loops
+- hot-path switch: hot call sites are guarded with
+      if __debug__ and forensic_logging.HOT_PATH_LOGGING:
+  FORENSICS_HOT_PATH_LOGGING=0 turns them off at runtime, and running
+  under `python -O` removes the guarded code from the bytecode entirely
+'''
+
+import os
+import queue
+import atexit
+import logging
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+HOT_PATH_LOGGING = os.environ.get('FORENSICS_HOT_PATH_LOGGING', '1') != '0'
+# every call site logs its first HOT_PATH_BURST hits, then one hit in HOT_PATH_SAMPLE_EVERY
+HOT_PATH_BURST = int(os.environ.get('FORENSICS_HOT_PATH_BURST', '10'))
+HOT_PATH_SAMPLE_EVERY = int(os.environ.get('FORENSICS_HOT_PATH_SAMPLE_EVERY', '1000'))
+
+SITE_COUNTS = {}
+_listener = None
+
+def setupForensicLogging(filename='forensics.log', level=logging.INFO):
+    global _listener
+    # logging.handlers pulls in socket/pickle/threading; only entry points need it
+    import logging.handlers
+    stopForensicLogging()
+    root_logger = logging.getLogger()
+    for handler_ in list(root_logger.handlers):
+        root_logger.removeHandler(handler_)
+        handler_.close()
+
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    record_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(record_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    root_logger.addHandler(logging.handlers.QueueHandler(record_queue))
+    root_logger.setLevel(level)
+    return _listener
+
+def stopForensicLogging():
+    # flushes everything still queued; registered to run at interpreter exit
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler_ in _listener.handlers:
+            handler_.close()
+        _listener = None
+
+atexit.register(stopForensicLogging)
+
+def logSampled(level, msg, *args):
+    # the message template identifies the call site
+    hit_count = SITE_COUNTS.get(msg, 0) + 1
+    SITE_COUNTS[msg] = hit_count
+    if hit_count <= HOT_PATH_BURST or hit_count % HOT_PATH_SAMPLE_EVERY == 0:
+        logging.log(level, msg + " (call site hit %d)", *args, hit_count)
+
+def resetSampling():
+    SITE_COUNTS.clear()
@@ -1,18 +1,12 @@
-import numpy as np
 import os
-import pandas as pd
 import time
 import datetime
 import logging
+import forensic_logging
+import tracing
 
-# ----------------------------
-# Configure Forensics Logging
-# ----------------------------
-logging.basicConfig(
-    filename='forensics_frequency.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# pandas and numpy are imported inside the report functions, so scanners that
+# only need the SLOC helpers do not pay for them; logging is set up by the entry point
 
 # ----------------------------
 # MLForensics Frequency Functions
@@ -21,23 +15,35 @@ logging.basicConfig(
 def giveTimeStamp():
     tsObj = time.time()
     strToret = datetime.datetime.fromtimestamp(tsObj).strftime('%Y-%m-%d %H:%M:%S')
-    logging.info(f"Timestamp generated: {strToret}")
+    logging.info("Timestamp generated: %s", strToret)
     return strToret
 
+def getSourceSLOC(source):
+    # same count as iterating the lines of the file on disk
+    sloc = source.count('\n')
+    if source and not source.endswith('\n'):
+        sloc += 1
+    return sloc
+
+@tracing.traced
 def getAllSLOC(df_param, csv_encoding='latin-1'):
     logging.info("Calculating total SLOC from dataframe")
+    import numpy as np
     total_sloc = 0
     all_files = np.unique(df_param['FILE_FULL_PATH'].tolist())
     for file_ in all_files:
         try:
             total_sloc += sum(1 for line in open(file_, encoding=csv_encoding))
         except Exception as e:
-            logging.error(f"Error reading file {file_}: {e}")
-    logging.info(f"Total SLOC calculated: {total_sloc}")
+            logging.error("Error reading file %s: %s", file_, e)
+    logging.info("Total SLOC calculated: %s", total_sloc)
     return total_sloc
 
+@tracing.traced
 def reportProportion(res_file, output_file):
-    logging.info(f"Generating proportion report from {res_file}")
+    logging.info("Generating proportion report from %s", res_file)
+    import numpy as np
+    import pandas as pd
     res_df = pd.read_csv(res_file)
     repo_names = np.unique(res_df['REPO_FULL_PATH'].tolist())
     
@@ -47,23 +53,27 @@ def reportProportion(res_file, output_file):
     df_list = []
 
     for repo in repo_names:
-        logging.info(f"Processing repo: {repo}")
+        logging.info("Processing repo: %s", repo)
         repo_entity = res_df[res_df['REPO_FULL_PATH'] == repo]
         all_py_files = np.unique(repo_entity['FILE_FULL_PATH'].tolist())
         for field in fields2explore:
             field_atleast_one_df = repo_entity[repo_entity[field] > 0]
             atleast_one_files = np.unique(field_atleast_one_df['FILE_FULL_PATH'].tolist())
             prop_metric = round(len(atleast_one_files) / len(all_py_files), 5) * 100
-            logging.info(f"{repo} | Field: {field} | Total Files: {len(all_py_files)} | At least one: {len(atleast_one_files)} | Proportion: {prop_metric}")
+            logging.info("%s | Field: %s | Total Files: %s | At least one: %s | Proportion: %s", repo, field, len(all_py_files), len(atleast_one_files), prop_metric)
             df_list.append((repo, len(all_py_files), field, len(atleast_one_files), prop_metric))
     
     CSV_HEADER = ['REPO_NAME', 'TOTAL_FILES', 'CATEGORY', 'ATLEASTONE', 'PROP_VAL']
     full_df = pd.DataFrame(df_list)
-    full_df.to_csv(output_file, header=CSV_HEADER, index=False, encoding='utf-8')
-    logging.info(f"Proportion report saved to {output_file}")
+    with tracing.traceSpan('frequency.writeCSV', output_file=output_file):
+        full_df.to_csv(output_file, header=CSV_HEADER, index=False, encoding='utf-8')
+    logging.info("Proportion report saved to %s", output_file)
 
+@tracing.traced
 def reportEventDensity(res_file, output_file):
-    logging.info(f"Generating event density report from {res_file}")
+    logging.info("Generating event density report from %s", res_file)
+    import numpy as np
+    import pandas as pd
     res_df = pd.read_csv(res_file)
     repo_names = np.unique(res_df['REPO_FULL_PATH'].tolist())
     
@@ -73,7 +83,7 @@ def reportEventDensity(res_file, output_file):
     df_list = []
 
     for repo in repo_names:
-        logging.info(f"Processing repo: {repo}")
+        logging.info("Processing repo: %s", repo)
         repo_entity = res_df[res_df['REPO_FULL_PATH'] == repo]
         all_py_files = np.unique(repo_entity['FILE_FULL_PATH'].tolist())
         all_py_size = getAllSLOC(repo_entity)
@@ -85,19 +95,21 @@ def reportEventDensity(res_file, output_file):
                 event_density = round((field_res_count * 1000) / all_py_size, 5)
             except ZeroDivisionError:
                 event_density = 0
-                logging.warning(f"All Python file size is zero for repo {repo}")
-            logging.info(f"{repo} | Field: {field} | Total LOC: {all_py_size} | Total Events: {field_res_count} | Event Density: {event_density}")
+                logging.warning("All Python file size is zero for repo %s", repo)
+            logging.info("%s | Field: %s | Total LOC: %s | Total Events: %s | Event Density: %s", repo, field, all_py_size, field_res_count, event_density)
             df_list.append((repo, all_py_size, field, field_res_count, event_density))
 
     CSV_HEADER = ['REPO_NAME', 'TOTAL_LOC', 'CATEGORY', 'TOTAL_EVENT_COUNT', 'EVENT_DENSITY']
     full_df = pd.DataFrame(df_list)
-    full_df.to_csv(output_file, header=CSV_HEADER, index=False, encoding='utf-8')
-    logging.info(f"Event density report saved to {output_file}")
+    with tracing.traceSpan('frequency.writeCSV', output_file=output_file):
+        full_df.to_csv(output_file, header=CSV_HEADER, index=False, encoding='utf-8')
+    logging.info("Event density report saved to %s", output_file)
 
 if __name__ == '__main__':
+    forensic_logging.setupForensicLogging('forensics_frequency.log')
     logging.info('*' * 100)
     t1 = time.time()
-    logging.info(f"Started at: {giveTimeStamp()}")
+    logging.info("Started at: %s", giveTimeStamp())
     logging.info('*' * 100)
 
     # Example usage: update with actual CSV paths if needed
@@ -109,7 +121,7 @@ if __name__ == '__main__':
     # reportProportion(RESULTS_FILE, PROPORTION_FILE)
     # reportEventDensity(RESULTS_FILE, DENSITY_FILE)
 
-    logging.info(f"Ended at: {giveTimeStamp()}")
-    logging.info(f"Duration: {(time.time() - t1)/60:.5f} minutes")
+    logging.info("Ended at: %s", giveTimeStamp())
+    logging.info("Duration: %.5f minutes", (time.time() - t1)/60)
     logging.info('*' * 100)
 
@@ -5,13 +5,9 @@ Mine Git-based repos
 '''
 
 
-import pandas as pd 
 import csv 
 import subprocess
-import numpy as np
 import shutil
-from git import Repo
-from git import exc 
 from xml.dom import minidom
 from xml.parsers.expat import ExpatError
 import time 
@@ -115,6 +111,8 @@ def getMLLibraryUsage(path2dir):
 
 
 def deleteRepos():
+    import pandas as pd 
+    import numpy as np 
     repos_df = pd.read_csv('DELETE_CANDIDATES_GITHUB_V2.csv')
     repos    = np.unique( repos_df['REPO'].tolist() ) 
     for x_ in repos:
@@ -5,13 +5,44 @@ Oct 20, 2020
 Executes the pattern matching and data flow analysis 
 '''
 
+import logging
+import weakref
 import py_parser
 import constants 
+import tracing
+
+# rule parent names, as the detectors spell them, of the modules they target;
+# an import alias of one of these modules is matched under this name
+RULE_PARENT_MODULES = {
+    'torch': constants.TORCH_KW, 'pickle': constants.PICKLE_KW, 'json': constants.JSON_KW, 'numpy': constants.NP_KW,
+    'pandas': constants.PD_KW, 'yaml': constants.YAML_KW, 'h5py': constants.H5PY_KW, 'librosa': constants.IBROSA_KW,
+    'tarfile': constants.TARFILE_KW, 'gym': constants.GYM_KW, 'wget': constants.WGET_KW,
+    'argparse': constants.ARG_PARSE_KW, 'tensorflow': constants.TF_KW, 'logging': constants.LOGGING_KW,
+}
+RULE_FUNCS_CACHE = weakref.WeakKeyDictionary()
+
+
+def getRuleAttributeFuncs( py_tree ):
+    # attribute calls with import aliases resolved (T.load, numpy_.load) plus
+    # calls of from-imported functions (load after `from torch import load`);
+    # built once per tree and shared by every detector
+    if py_tree in RULE_FUNCS_CACHE:
+        return RULE_FUNCS_CACHE[py_tree]
+    aliases_ = py_parser.getImportIndex( py_tree )['ALIASES']
+    rule_func_list = []
+    for class_name, func_name, func_line, arg_call_list in py_parser.getPythonAttributeFuncs( py_tree ):
+        rule_func_list.append( ( RULE_PARENT_MODULES.get( aliases_.get( class_name ), class_name ), func_name, func_line, arg_call_list ) )
+    for module_, func_name, func_line, arg_call_list in py_parser.getImportedNameCalls( py_tree ):
+        if module_ in RULE_PARENT_MODULES:
+            rule_func_list.append( ( RULE_PARENT_MODULES[module_], func_name, func_line, arg_call_list ) )
+    RULE_FUNCS_CACHE[py_tree] = rule_func_list
+    return rule_func_list
+
 
 def getDataLoadCount( py_file ):
     data_load_count = 0 
     py_tree = py_parser.getPythonParseObject(py_file)
-    func_def_list  = py_parser.getPythonAtrributeFuncs( py_tree ) 
+    func_def_list  = getRuleAttributeFuncs( py_tree ) 
 
     for def_ in func_def_list:
         class_name, func_name, func_line, arg_call_list = def_ 
@@ -216,7 +247,7 @@ def getDataLoadCountc( py_file ):
 def getModelLoadCounta( py_file ):
     model_load_counta = 0 
     py_tree = py_parser.getPythonParseObject(py_file)
-    func_def_list  = py_parser.getPythonAtrributeFuncs( py_tree ) 
+    func_def_list  = getRuleAttributeFuncs( py_tree ) 
     for def_ in func_def_list:
         class_name, func_name, func_line, arg_call_list = def_ 
         
@@ -338,7 +369,7 @@ def getModelLoadCountd( py_file ):
 def getDataDownLoadCount( py_file ):
     data_download_count = 0 
     py_tree = py_parser.getPythonParseObject(py_file)
-    func_def_list  = py_parser.getPythonAtrributeFuncs( py_tree ) 
+    func_def_list  = getRuleAttributeFuncs( py_tree ) 
 
     for def_ in func_def_list:
         class_name, func_name, func_line, arg_call_list = def_ 
@@ -453,7 +484,7 @@ def getModelLabelCountb( py_file ):
 def getModelOutputCount( py_file ):
     model_output_count = 0 
     py_tree = py_parser.getPythonParseObject(py_file)
-    func_def_list  = py_parser.getPythonAtrributeFuncs( py_tree ) 
+    func_def_list  = getRuleAttributeFuncs( py_tree ) 
     for def_ in func_def_list:
         class_name, func_name, func_line, arg_call_list = def_ 
         
@@ -527,7 +558,7 @@ def getModelOutputCountc( py_file ):
 def getDataPipelineCount( py_file ):
     data_pipeline_count = 0 
     py_tree = py_parser.getPythonParseObject(py_file)
-    func_def_list  = py_parser.getPythonAtrributeFuncs( py_tree ) 
+    func_def_list  = getRuleAttributeFuncs( py_tree ) 
     for def_ in func_def_list:
         class_name, func_name, func_line, arg_call_list = def_ 
         
@@ -591,7 +622,7 @@ def getDataPipelineCountd( py_file ):
 def getEnvironmentCount( py_file ):
     environment_count = 0 
     py_tree = py_parser.getPythonParseObject(py_file)
-    func_def_list  = py_parser.getPythonAtrributeFuncs( py_tree ) 
+    func_def_list  = getRuleAttributeFuncs( py_tree ) 
     for def_ in func_def_list:
         class_name, func_name, func_line, arg_call_list = def_ 
         
@@ -635,7 +666,7 @@ def getEnvironmentCountb( py_file ):
 def getStateObserveCount( py_file ):
     state_observe_count = 0 
     py_tree = py_parser.getPythonParseObject(py_file)
-    func_def_list  = py_parser.getPythonAtrributeFuncs( py_tree ) 
+    func_def_list  = getRuleAttributeFuncs( py_tree ) 
     for def_ in func_def_list:
         class_name, func_name, func_line, arg_call_list = def_ 
         
@@ -756,7 +787,7 @@ def getIncompleteLoggingCount( py_file ):
 	incomplete_logging_count = 0 
 	if(checkLoggingLibrary):
 		py_tree = py_parser.getPythonParseObject(py_file)
-		func_def_list  = py_parser.getPythonAtrributeFuncs( py_tree ) 
+		func_def_list  = getRuleAttributeFuncs( py_tree ) 
 		for def_ in func_def_list:
 			class_name, func_name, func_line, arg_call_list = def_ 
 			
@@ -782,4 +813,40 @@ def getIncompleteLoggingCount( py_file ):
 				
 	LOGGING_IS_ON_FLAG = py_parser.checkLoggingPerData( py_tree, constants.DUMMY_LOG_KW ) 
 	# print(LOGGING_IS_ON_FLAG, incomplete_logging_count) 
-	return incomplete_logging_count 
\ No newline at end of file
+	return incomplete_logging_count 
+
+
+# detectors summed into each event count column of the V5 results CSV 
+EVENT_DETECTORS = {
+    'DATA_LOAD_COUNT'     : ( getDataLoadCount, getDataLoadCountb, getDataLoadCountc ), 
+    'MODEL_LOAD_COUNT'    : ( getModelLoadCounta, getModelLoadCountb, getModelLoadCountc, getModelLoadCountd ), 
+    'DATA_DOWNLOAD_COUNT' : ( getDataDownLoadCount, getDataDownLoadCountb ), 
+    'MODEL_LABEL_COUNT'   : ( getModelLabelCount, getModelLabelCountb ), 
+    'MODEL_OUTPUT_COUNT'  : ( getModelOutputCount, getModelOutputCountb, getModelOutputCountc ), 
+    'DATA_PIPELINE_COUNT' : ( getDataPipelineCount, getDataPipelineCountb, getDataPipelineCountc, getDataPipelineCountd ), 
+    'ENVIRONMENT_COUNT'   : ( getEnvironmentCount, getEnvironmentCountb ), 
+    'STATE_OBSERVE_COUNT' : ( getStateObserveCount, ), 
+}
+
+
+def getEventCounts( py_file, source=None, event_counts=None, incremental=False ):
+    # parse once and let every detector reuse the tree; source lets callers 
+    # supply content that is not on disk, with py_file as its identifier. 
+    # A caller-supplied event_counts dict keeps the categories counted so far 
+    # when a detector is interrupted (scan_pool budgets). incremental reparses 
+    # only the top-level blocks not seen in an earlier version (history mining) 
+    event_counts = {} if event_counts is None else event_counts 
+    py_parser.cachePythonSource( py_file, source, incremental ) 
+    try:
+        for category_, detectors_ in EVENT_DETECTORS.items():
+            event_counts[category_] = 0 
+            for detector_ in detectors_:
+                try:
+                    with tracing.traceSpan( 'lint_engine.' + detector_.__name__, 'lint_engine' ):
+                        event_counts[category_] += detector_( py_file ) 
+                except Exception as e:
+                    logging.error("Detector %s failed on %s: %s", detector_.__name__, py_file, e)
+    finally:
+        py_parser.evictPythonSource( py_file ) 
+    event_counts[constants.TOTAL_EVENT_COUNT_KW] = sum( event_counts.values() ) 
+    return event_counts 
@@ -0,0 +1,138 @@
+'''
+Streaming analyzer for the forensics logs (forensics.log,
+forensics_frequency.log, forensics_mining.log). Logs are read through mmap one
+line at a time, start/end messages of the instrumented functions are paired
+into durations, and latency percentiles, error counts and hourly throughput
+are reported per function.
+'''
+
+import os
+import re
+import csv
+import mmap
+import logging
+from array import array
+from datetime import datetime
+
+# (function, start pattern, end pattern, error pattern). A group in the
+# patterns is the key that pairs start and end lines; patterns without a
+# group close the most recent open start of the function.
+PAIR_RULES = [
+    ('mining.cloneRepo',          r'Cloning repo (\S+) into ',                  r'Successfully cloned (\S+)$',        r'Trouble cloning repo (\S+):'),
+    ('mining.cloneMirror',        r'Mirroring repo (\S+) into ',                r'Successfully mirrored (\S+)$',      r'Trouble mirroring repo (\S+):'),
+    ('mining.cloneRepos[repo]',   r'Processing repo (\d+): ',                   r'Completed repo (\d+): ',            None),
+    ('mining.getDevDayCount',     r'Calculating developer day count for (\S+) ', r'Repo (\S+): \d+ devs, ',           None),
+    ('mining.checkPythonFile',    r'Checking Python files in ',                 r'Total patterns found: ',            None),
+    ('frequency.getAllSLOC',      r'Calculating total SLOC from dataframe',     r'Total SLOC calculated: ',           None),
+    ('frequency.reportProportion', r'Generating proportion report from ',       r'Proportion report saved to ',       None),
+    ('frequency.reportEventDensity', r'Generating event density report from ',  r'Event density report saved to ',    None),
+    ('blob_miner.mineHistoryEvents', r'Mining event history of (\S+)$',         r'Repo (\S+): \d+ commits, ',         None),
+    ('scanner.scanCorpus',        r'Scanning corpus ',                          r'Scanned \d+ files, ',               None),
+]
+COMPILED_RULES = [(func_, re.compile(start_), re.compile(end_), re.compile(error_) if error_ else None)
+                  for func_, start_, end_, error_ in PAIR_RULES]
+UNATTRIBUTED_KW = '<unattributed>'
+LINE_SEPARATOR = ' - '
+
+_day_cache = {}
+
+def parseTimestamp(ts_):
+    # '2025-11-24 16:47:31,071' -> epoch seconds, without strptime per line
+    day_ = ts_[:10]
+    if day_ not in _day_cache:
+        _day_cache[day_] = datetime(int(day_[:4]), int(day_[5:7]), int(day_[8:10])).timestamp()
+    return (_day_cache[day_] + int(ts_[11:13]) * 3600 + int(ts_[14:16]) * 60
+            + int(ts_[17:19]) + int(ts_[20:23]) / 1000.0)
+
+def iterLogLines(log_file):
+    if os.path.getsize(log_file) == 0:
+        return
+    with open(log_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm_:
+        for line_ in iter(mm_.readline, b''):
+            yield line_.decode('latin-1').rstrip('\r\n')
+
+def newFunctionStats():
+    return {'DURATIONS': array('d'), 'ERRORS': 0, 'HOURLY': {}}
+
+def analyzeLogs(log_files):
+    func_stats, pending, line_count = {}, {}, 0
+    for log_file in log_files:
+        logging.info("Analyzing log %s", log_file)
+        for line_ in iterLogLines(log_file):
+            parts_ = line_.split(LINE_SEPARATOR, 2)
+            if len(parts_) < 3 or len(parts_[0]) < 23:
+                continue
+            line_count += 1
+            ts_, level_, msg_ = parts_
+            try:
+                when_ = parseTimestamp(ts_)
+            except ValueError:
+                continue
+            matched_ = False
+            for func_, start_re, end_re, error_re in COMPILED_RULES:
+                start_match = start_re.match(msg_)
+                if start_match:
+                    key_ = start_match.group(1) if start_re.groups else None
+                    pending.setdefault((func_, key_), []).append(when_)
+                    matched_ = True
+                    break
+                end_match = end_re.match(msg_)
+                error_match = error_re.match(msg_) if error_re and not end_match else None
+                if end_match or error_match:
+                    match_ = end_match or error_match
+                    key_ = match_.group(1) if match_.re.groups else None
+                    stats_ = func_stats.setdefault(func_, newFunctionStats())
+                    open_starts = pending.get((func_, key_))
+                    if error_match:
+                        stats_['ERRORS'] += 1
+                        if open_starts:
+                            open_starts.pop()
+                    elif open_starts:
+                        stats_['DURATIONS'].append(when_ - open_starts.pop())
+                        hour_ = ts_[:13]
+                        stats_['HOURLY'][hour_] = stats_['HOURLY'].get(hour_, 0) + 1
+                    matched_ = True
+                    break
+            if not matched_ and level_ == 'ERROR':
+                func_stats.setdefault(UNATTRIBUTED_KW, newFunctionStats())['ERRORS'] += 1
+    logging.info("Analyzed %s log lines, %s functions", line_count, len(func_stats))
+    return func_stats
+
+def getPercentile(sorted_vals, pct_):
+    if not sorted_vals:
+        return 0
+    index_ = min(len(sorted_vals) - 1, int(round(pct_ / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[index_]
+
+def getLatencyRows(func_stats):
+    latency_list = []
+    for func_, stats_ in sorted(func_stats.items()):
+        sorted_vals = sorted(stats_['DURATIONS'])
+        ms_ = [round(getPercentile(sorted_vals, pct_) * 1000, 3) for pct_ in (50, 90, 99, 100)]
+        total_calls = len(sorted_vals) + stats_['ERRORS']
+        error_rate = round(stats_['ERRORS'] / total_calls, 5) if total_calls else 0
+        latency_list.append((func_, len(sorted_vals), *ms_, stats_['ERRORS'], error_rate))
+    return latency_list
+
+def getHourlyRows(func_stats):
+    return [(func_, hour_, count_) for func_, stats_ in sorted(func_stats.items())
+            for hour_, count_ in sorted(stats_['HOURLY'].items())]
+
+def dumpLogReport(func_stats, latency_file, hourly_file):
+    with open(latency_file, 'w', newline='') as fileToWrite:
+        writer = csv.writer(fileToWrite)
+        writer.writerow(['FUNCTION', 'COMPLETED', 'P50_MS', 'P90_MS', 'P99_MS', 'MAX_MS', 'ERRORS', 'ERROR_RATE'])
+        writer.writerows(getLatencyRows(func_stats))
+    with open(hourly_file, 'w', newline='') as fileToWrite:
+        writer = csv.writer(fileToWrite)
+        writer.writerow(['FUNCTION', 'HOUR', 'COMPLETED'])
+        writer.writerows(getHourlyRows(func_stats))
+    logging.info("Log reports saved to %s and %s", latency_file, hourly_file)
+
+if __name__ == '__main__':
+    import sys
+    log_files = sys.argv[1:] or ['forensics.log', 'forensics_frequency.log', 'forensics_mining.log']
+    stats = analyzeLogs([f_ for f_ in log_files if os.path.exists(f_)])
+    for row_ in getLatencyRows(stats):
+        print(row_)
+    dumpLogReport(stats, 'LOG_LATENCY.csv', 'LOG_HOURLY.csv')
@@ -1,190 +1,1027 @@
+import os
+import re
 import logging
 import ast
-import os
+import json
+import bisect
+import hashlib
+import weakref
+import functools
+from array import array
+from collections import OrderedDict
 import constants
-
-# Configure logging
-logging.basicConfig(
-    filename='forensics.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+import forensic_logging
+import tracing
 
 # ------------------------------------------
 # FAME-ML Python AST parser with forensics
 # ------------------------------------------
 
-def checkLoggingPerData(tree_object, name2track):
-    logging.info(f"Checking logging existence for data: {name2track}")
-    LOGGING_EXISTS_FLAG = False 
-    IMPORT_FLAG, FUNC_FLAG, ARG_FLAG  = False, False , False 
+# Logging index per parsed tree, built on the first query; every lint_engine
+# detector asks about the same tree, so the walk happens once per file
+LOGGING_INDEX_CACHE = weakref.WeakKeyDictionary()
+
+
+def isLoggingName(parent_name, func_name):
+    return constants.LOGGING_KW in parent_name or constants.LOGGING_KW in func_name
 
-    # Check imports for logging
+
+def isLoggingCall(node_):
+    # logging.info(...), self.logging.warning(...), logging_utils.log(...)
+    if not (isinstance(node_, ast.Call) and isinstance(node_.func, ast.Attribute)):
+        return False
+    parent_name = node_.func.value.id if isinstance(node_.func.value, ast.Name) else ''
+    return isLoggingName(parent_name, node_.func.attr)
+
+
+def getLoggingArgTokens(call_node):
+    # names a logging call mentions: plain and string arguments as the
+    # attribute-call extractor renders them, plus every identifier inside an
+    # argument (f-string fields, attribute bases, nested calls)
+    tokens_ = set()
+    for arg_ in list(call_node.args) + [keyword_.value for keyword_ in call_node.keywords]:
+        if isinstance(arg_, ast.Constant) and isinstance(arg_.value, str):
+            tokens_.add(arg_.value)
+        elif isinstance(arg_, ast.JoinedStr):
+            tokens_.add(''.join(elem.value if isinstance(elem, ast.Constant) else '{expr}' for elem in arg_.values))
+        for node_ in ast.walk(arg_):
+            if isinstance(node_, ast.Name):
+                tokens_.add(node_.id)
+    return tokens_
+
+
+def getLoggingIndex(tree_object):
+    if tree_object in LOGGING_INDEX_CACHE:
+        return LOGGING_INDEX_CACHE[tree_object]
+    if tree_object in SEGMENTED_TREES:
+        LOGGING_INDEX_CACHE[tree_object] = mergeLoggingIndexes([(offset_, getLoggingIndex(tree_))
+                                                                for offset_, tree_ in SEGMENTED_TREES[tree_object]])
+        return LOGGING_INDEX_CACHE[tree_object]
+    logging_index = {'IMPORTED': False, 'CALL_LINES': [], 'TOKEN_LINES': {}}
     for stmt_ in tree_object.body:
         for node_ in ast.walk(stmt_):
             if isinstance(node_, ast.Import):
-                funcDict = node_.__dict__     
-                import_name_objects = funcDict[constants.NAMES_KW]
-                for obj in import_name_objects:
-                    if constants.LOGGING_KW in obj.__dict__[constants.NAME_KW]: 
-                        IMPORT_FLAG = True 
-
-    # Check function attribute calls
-    func_decl_list = getPythonAttributeFuncs(tree_object)
-    for func_decl_ in func_decl_list:
-        # Safe unpack: handle possible missing fields
-        if len(func_decl_) == 4:
-            func_parent_id, func_name, funcLineNo, call_arg_list = func_decl_
-        else:
-            func_parent_id, func_name, funcLineNo = func_decl_
-            call_arg_list = []
+                if any(constants.LOGGING_KW in alias_.name for alias_ in node_.names):
+                    logging_index['IMPORTED'] = True
+            elif isLoggingCall(node_):
+                logging_index['CALL_LINES'].append(node_.lineno)
+                for token_ in getLoggingArgTokens(node_):
+                    logging_index['TOKEN_LINES'].setdefault(token_, []).append(node_.lineno)
+    LOGGING_INDEX_CACHE[tree_object] = logging_index
+    return logging_index
 
-        if constants.LOGGING_KW in func_parent_id or constants.LOGGING_KW in func_name:
-            FUNC_FLAG = True
-            for arg_ in call_arg_list:
-                if name2track in arg_:
-                    ARG_FLAG = True
 
-    LOGGING_EXISTS_FLAG = IMPORT_FLAG and FUNC_FLAG and ARG_FLAG
-    logging.info(f"Logging check result: {LOGGING_EXISTS_FLAG}")
+def getLoggedLines(tree_object, names2track):
+    # batched query: name -> lines of the logging calls that mention it;
+    # empty for every name when the module never imports logging
+    logging_index = getLoggingIndex(tree_object)
+    if not logging_index['IMPORTED']:
+        return {name_: [] for name_ in names2track}
+    return {name_: sorted(set(logging_index['TOKEN_LINES'].get(name_, ()))) for name_ in names2track}
+
+
+def checkLoggingPerData(tree_object, name2track):
+    logging.info("Checking logging existence for data: %s", name2track)
+    LOGGING_EXISTS_FLAG = bool(getLoggedLines(tree_object, [name2track])[name2track])
+    logging.info("Logging check result: %s", LOGGING_EXISTS_FLAG)
     return LOGGING_EXISTS_FLAG 
 
 
-def getPythonParseObject(pyFile):
+# File each parsed tree came from, for indexes that resolve repo-local imports
+TREE_FILES = weakref.WeakKeyDictionary()
+
+# Trees for sources registered with cachePythonSource, keyed by file identifier.
+# Lets the lint_engine detectors run on content that never touches the disk
+# (git blobs, archive members) and share one parse per file.
+PARSE_CACHE = {}
+
+
+@tracing.traced
+def getPythonParseObjectFromSource(source, pyFile):
     try:
-        logging.info(f"Parsing Python file: {pyFile}")
-        full_tree = ast.parse(open(pyFile).read())
-    except SyntaxError as e:
-        logging.error(f"Syntax error parsing {pyFile}: {e}")
-        full_tree = ast.parse(constants.EMPTY_STRING)
+        full_tree = ast.parse(source)
+    except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+        # RecursionError / MemoryError: expressions nested too deep for the parser.
+        # Keep the top-level segments that parse on their own (Python 2 files
+        # usually fail in a few print statements, not everywhere)
+        full_tree = recoverPythonParseObject(source, pyFile)
+        recovery_ = RECOVERY_STATS[full_tree]
+        logging.error("Syntax error parsing %s: %s; recovered %s lines, lost %s in %s segments", pyFile, e,
+                      recovery_['RECOVERED_LINES'], recovery_['LOST_LINES'], len(recovery_['LOST_SEGMENTS']))
+        return full_tree
+    TREE_FILES[full_tree] = pyFile
     return full_tree
 
 
-def getFunctionAssignments(pyTree):
-    logging.info("Extracting function assignments from AST")
-    call_list = []
+@tracing.traced
+def getPythonParseObject(pyFile):
+    if pyFile in PARSE_CACHE:
+        return PARSE_CACHE[pyFile]
+    logging.info("Parsing Python file: %s", pyFile)
+    return getPythonParseObjectFromSource(open(pyFile).read(), pyFile)
+
+
+def getNotebookSource(notebook_text):
+    # Code cells joined into one module; IPython magics and shell escapes are
+    # not Python and are dropped so the rest of the cell still parses
+    try:
+        cells = json.loads(notebook_text).get(constants.CELLS_KW, [])
+    except (ValueError, AttributeError) as e:
+        logging.error("Could not read notebook JSON: %s", e)
+        return constants.EMPTY_STRING
+    code_lines = []
+    for cell_ in cells:
+        if cell_.get(constants.CELL_TYPE_KW) != constants.CODE_KW:
+            continue
+        cell_source = cell_.get(constants.SOURCE_KW, [])
+        if isinstance(cell_source, str):
+            cell_source = cell_source.splitlines(keepends=True)
+        for line_ in cell_source:
+            if not line_.lstrip().startswith(('%', '!')):
+                code_lines.append(line_ if line_.endswith('\n') else line_ + '\n')
+    return constants.EMPTY_STRING.join(code_lines)
+
+
+def cachePythonSource(pyFile, source=None, incremental=False):
+    # incremental: reuse the segments this source shares with versions parsed before
+    if source is None:
+        source = open(pyFile).read()
+    if pyFile.endswith(constants.IPYNB_FILE_EXTENSION):
+        source = getNotebookSource(source)
+    if incremental:
+        PARSE_CACHE[pyFile] = getPythonParseObjectIncremental(source, pyFile)
+    else:
+        PARSE_CACHE[pyFile] = getPythonParseObjectFromSource(source, pyFile)
+    return PARSE_CACHE[pyFile]
+
+
+def evictPythonSource(pyFile):
+    PARSE_CACHE.pop(pyFile, None)
+
+
+# ------------------------------------------
+# Fact table: every extractor is a view over one walk
+# ------------------------------------------
+# One row per fact, in ast.walk order per top-level statement (the order the
+# extractors always reported in). Columns are parallel arrays of ints; names
+# are ids into the table's STRINGS pool, and argument and assignment-target
+# lists are (start, count) spans of TOKENS. An argument that is neither a name
+# nor a string is kept as its node (a negative token into DEFERRED) and only
+# rendered, once, when a consumer reads its value.
+FACT_TABLE_CACHE = weakref.WeakKeyDictionary()
+FACT_NAME_CALL, FACT_ATTRIBUTE_CALL, FACT_OTHER_CALL, FACT_ASSIGNMENT, FACT_FEATURE, FACT_COMPREHENSION, FACT_EXCEPT = range(7)
+FACT_CALL_KINDS = (FACT_NAME_CALL, FACT_ATTRIBUTE_CALL, FACT_OTHER_CALL)
+FACT_COLUMNS = {'KIND': 'B', 'LINE': 'I', 'END_LINE': 'I', 'LHS': 'I', 'PARENT': 'I', 'FUNC': 'I',
+                'ARG_START': 'I', 'ARG_COUNT': 'I', 'TARGET_START': 'I', 'TARGET_COUNT': 'I'}
+COMPREHENSION_KW_TYPES = (ast.ListComp, ast.SetComp, ast.GeneratorExp)
+
+
+def getArgToken(arg_):
+    # the string an argument renders to, or the node when rendering can wait
+    if isinstance(arg_, ast.Name):
+        return arg_.id
+    if isinstance(arg_, ast.Constant) and isinstance(arg_.value, str):
+        return arg_.value
+    if isinstance(arg_, ast.JoinedStr):
+        return ''.join([elem.value if isinstance(elem, ast.Constant) else '{expr}' for elem in arg_.values])
+    return arg_
+
+
+def getFuncName(func_):
+    # foo(...) and x.foo(...) -> 'foo'; a computed callee (f()(...), fs[0](...)) has none
+    if isinstance(func_, ast.Name):
+        return func_.id
+    if isinstance(func_, ast.Attribute):
+        return func_.attr
+    return ''
+
+
+def getRootName(node_):
+    # sent, sent.text, sent[0], (sent, label) -> 'sent'
+    while True:
+        if isinstance(node_, (ast.Attribute, ast.Subscript, ast.Starred)):
+            node_ = node_.value
+        elif isinstance(node_, ast.Call):
+            node_ = node_.func
+        elif isinstance(node_, (ast.Tuple, ast.List)) and node_.elts:
+            node_ = node_.elts[0]
+        else:
+            return node_.id if isinstance(node_, ast.Name) else ''
+
+
+def getTargetList(target_node):
+    # getTargetNames in source order: a, (b, c) = ... gives ['a', 'b', 'c']
+    if isinstance(target_node, (ast.Tuple, ast.List)):
+        return [name_ for elt_ in target_node.elts for name_ in getTargetList(elt_)]
+    return sorted(getTargetNames(target_node))
+
+
+def getFactTable(pyTree):
+    if pyTree in FACT_TABLE_CACHE:
+        return FACT_TABLE_CACHE[pyTree]
+    if pyTree in SEGMENTED_TREES:
+        FACT_TABLE_CACHE[pyTree] = mergeFactTables([(offset_, getFactTable(tree_)) for offset_, tree_ in SEGMENTED_TREES[pyTree]])
+        return FACT_TABLE_CACHE[pyTree]
+    table_ = {column_: array(type_) for column_, type_ in FACT_COLUMNS.items()}
+    tokens_, strings_, string_ids, deferred_ = array('i'), [''], {'': 0}, []
+    call_spans = {}
+
+    def internString(string_):
+        if string_ not in string_ids:
+            string_ids[string_] = len(strings_)
+            strings_.append(string_)
+        return string_ids[string_]
+
+    def addTokens(token_values):
+        start_ = len(tokens_)
+        for value_ in token_values:
+            if isinstance(value_, str):
+                tokens_.append(internString(value_))
+            else:
+                deferred_.append(value_)
+                tokens_.append(-len(deferred_))
+        return start_, len(tokens_) - start_
+
+    def addRow(kind_, line_, lhs_='', parent_='', func_='', args_=(0, 0), targets_=(0, 0), end_line=0):
+        for column_, value_ in (('KIND', kind_), ('LINE', line_ or 0), ('END_LINE', end_line or 0),
+                                ('LHS', internString(lhs_)), ('PARENT', internString(parent_)), ('FUNC', internString(func_)),
+                                ('ARG_START', args_[0]), ('ARG_COUNT', args_[1]),
+                                ('TARGET_START', targets_[0]), ('TARGET_COUNT', targets_[1])):
+            table_[column_].append(value_)
+
     for stmt_ in pyTree.body:
         for node_ in ast.walk(stmt_):
-            if isinstance(node_, ast.Assign):
-                logging.info(f"Found assignment at line {getattr(node_, 'lineno', 'unknown')}")
+            if isinstance(node_, ast.Call):
+                func_ = node_.func
+                args_ = call_spans.pop(id(node_), None) or addTokens(getArgToken(arg_) for arg_ in node_.args)
+                if isinstance(func_, ast.Attribute):
+                    parent_name = func_.value.id if isinstance(func_.value, ast.Name) else ''
+                    addRow(FACT_ATTRIBUTE_CALL, node_.lineno, parent_=parent_name, func_=func_.attr, args_=args_)
+                else:
+                    addRow(FACT_NAME_CALL if isinstance(func_, ast.Name) else FACT_OTHER_CALL, node_.lineno,
+                           func_=getFuncName(func_), args_=args_)
+            elif isinstance(node_, ast.Assign):
+                if __debug__ and forensic_logging.HOT_PATH_LOGGING:
+                    forensic_logging.logSampled(logging.INFO, "Found assignment at line %s", getattr(node_, 'lineno', 'unknown'))
+                targets, value = node_.targets, node_.value
                 lhs = ''
-                assign_dict = node_.__dict__
-                targets, value = assign_dict[constants.TARGETS_KW], assign_dict[constants.VALUE_KW]
-
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        lhs = target.id
                 if isinstance(value, ast.Call):
-                    funcDict = value.__dict__ 
-                    funcName, funcArgs, funcLineNo = funcDict.get(constants.FUNC_KW), funcDict.get(constants.ARGS_KW, []), funcDict.get(constants.LINE_NO_KW)
-
-                    for target in targets:
-                        if isinstance(target, ast.Name):
-                            lhs = target.id
-
-                    call_arg_list = []
-                    for i, funcArg in enumerate(funcArgs):
-                        # Handle Name, Constant, JoinedStr, fallback
-                        if isinstance(funcArg, ast.Name):
-                            call_arg_list.append((funcArg.id, f'arg{i+1}'))
-                        elif isinstance(funcArg, ast.Constant) and isinstance(funcArg.value, str):
-                            call_arg_list.append((funcArg.value, f'arg{i+1}'))
-                        elif isinstance(funcArg, ast.JoinedStr):
-                            joined_str = ''.join([elem.s if isinstance(elem, ast.Constant) else '{expr}' for elem in funcArg.values])
-                            call_arg_list.append((joined_str, f'arg{i+1}'))
-                        else:
-                            call_arg_list.append((str(funcArg), f'arg{i+1}'))
-
-                    # funcName may be ast.Name or ast.Attribute
-                    if isinstance(funcName, ast.Name):
-                        funcNameStr = funcName.id
-                    elif isinstance(funcName, ast.Attribute):
-                        funcNameStr = funcName.attr
-                    else:
-                        funcNameStr = str(funcName)
-
-                    call_list.append((lhs, funcNameStr, funcLineNo, call_arg_list))
-    logging.info(f"Total function assignments extracted: {len(call_list)}")
+                    # the call row reuses the argument span when the walk reaches it
+                    args_ = call_spans[id(value)] = addTokens(getArgToken(arg_) for arg_ in value.args)
+                    target_names = [name_ for target in targets for name_ in getTargetList(target)]
+                    addRow(FACT_ASSIGNMENT, value.lineno, lhs_=lhs, func_=getFuncName(value.func), args_=args_,
+                           targets_=addTokens(target_names))
+                    value = value.args[0] if value.args else None
+                elif isinstance(value, ast.Attribute) and isinstance(value.value, ast.Name):
+                    addRow(FACT_FEATURE, value.lineno, lhs_=lhs, parent_=value.value.id, func_=value.attr)
+                # labels = [sent for sent in input_batch_list], also wrapped as np.array([...])
+                if isinstance(value, COMPREHENSION_KW_TYPES):
+                    for generator_ in value.generators:
+                        addRow(FACT_COMPREHENSION, node_.lineno, lhs_=lhs,
+                               args_=addTokens((getRootName(value.elt), getRootName(generator_.target), getRootName(generator_.iter))))
+            elif isinstance(node_, ast.ExceptHandler):
+                addRow(FACT_EXCEPT, node_.lineno, func_=getDottedName(node_.type) or '', end_line=node_.end_lineno)
+    table_['TOKENS'], table_['STRINGS'], table_['DEFERRED'] = tokens_, strings_, deferred_
+    table_['ROWS'] = {kind_: array('I') for kind_ in range(FACT_EXCEPT + 1)}
+    table_['ROWS']['CALLS'] = array('I')
+    for row_, kind_ in enumerate(table_['KIND']):
+        table_['ROWS'][kind_].append(row_)
+        if kind_ in FACT_CALL_KINDS:
+            table_['ROWS']['CALLS'].append(row_)
+    FACT_TABLE_CACHE[pyTree] = table_
+    return table_
+
+
+def getFactString(table_, column_, row_):
+    return table_['STRINGS'][table_[column_][row_]]
+
+
+def getFactToken(table_, index_):
+    token_ = table_['TOKENS'][index_]
+    if token_ < 0:
+        # first read of a deferred argument: render it and keep the string
+        try:
+            rendered_ = ast.unparse(table_['DEFERRED'][-token_ - 1])
+        except (RecursionError, ValueError):
+            rendered_ = '{expr}'
+        table_['DEFERRED'][-token_ - 1] = None
+        token_ = table_['TOKENS'][index_] = len(table_['STRINGS'])
+        table_['STRINGS'].append(rendered_)
+    return table_['STRINGS'][token_]
+
+
+def getFactTokens(table_, start_, count_):
+    return [getFactToken(table_, start_ + i) for i in range(count_)]
+
+
+class FactArgs:
+    # positional arguments of one call as (value, position) pairs, position
+    # counted from 1; len() renders nothing, values are rendered when read
+    __slots__ = ('table', 'start', 'count')
+
+    def __init__(self, table_, start_, count_):
+        self.table, self.start, self.count = table_, start_, count_
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index_):
+        if isinstance(index_, slice):
+            return [self[i] for i in range(*index_.indices(self.count))]
+        if index_ < 0:
+            index_ += self.count
+        if not 0 <= index_ < self.count:
+            raise IndexError(index_)
+        return (getFactToken(self.table, self.start + index_), index_ + 1)
+
+    def __iter__(self):
+        return (self[i] for i in range(self.count))
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def getFactArgList(table_, row_):
+    return FactArgs(table_, table_['ARG_START'][row_], table_['ARG_COUNT'][row_])
+
+
+def getFunctionAssignments(pyTree):
+    logging.info("Extracting function assignments from AST")
+    table_ = getFactTable(pyTree)
+    call_list = [(getFactString(table_, 'LHS', row_), getFactString(table_, 'FUNC', row_), table_['LINE'][row_],
+                  getFactArgList(table_, row_)) for row_ in table_['ROWS'][FACT_ASSIGNMENT]]
+    logging.info("Total function assignments extracted: %s", len(call_list))
+    return call_list
+
+
+def getFunctionAssignmentsWithMultipleLHS(pyTree):
+    # as getFunctionAssignments, with every name the call is assigned to:
+    # features, labels = load_data(path) gives ['features', 'labels']
+    logging.info("Extracting multi-target function assignments from AST")
+    table_ = getFactTable(pyTree)
+    call_list = [(getFactTokens(table_, table_['TARGET_START'][row_], table_['TARGET_COUNT'][row_]),
+                  getFactString(table_, 'FUNC', row_), table_['LINE'][row_], getFactArgList(table_, row_))
+                 for row_ in table_['ROWS'][FACT_ASSIGNMENT]]
+    logging.info("Total multi-target function assignments extracted: %s", len(call_list))
     return call_list
 
 
+def getTupAssiDetails(pyTree):
+    # (lhs, element name, loop variable, iterated name, line) per comprehension
+    # generator assigned to a name: labels = [sent.tag for sent in batch]
+    # gives ('labels', 'sent', 'sent', 'batch', line)
+    table_ = getFactTable(pyTree)
+    detail_list = []
+    for row_ in table_['ROWS'][FACT_COMPREHENSION]:
+        var_s, var_d, rhs_var_iter = getFactTokens(table_, table_['ARG_START'][row_], 3)
+        detail_list.append((getFactString(table_, 'LHS', row_), var_s, var_d, rhs_var_iter, table_['LINE'][row_]))
+    logging.info("Total comprehension assignments found: %s", len(detail_list))
+    return detail_list
+
+
 def getFunctionDefinitions(pyTree):
-    func_list = []
     logging.info("Analyzing function definitions")
-    for stmt_ in pyTree.body:
-        for node_ in ast.walk(stmt_):
-            if isinstance(node_, ast.Call):
-                funcDict = node_.__dict__ 
-                func_, funcArgs, funcLineNo = funcDict.get(constants.FUNC_KW), funcDict.get(constants.ARGS_KW, []), funcDict.get(constants.LINE_NO_KW)
-
-                # func_ can be Name or Attribute
-                if isinstance(func_, ast.Name):
-                    func_name = func_.id
-                elif isinstance(func_, ast.Attribute):
-                    func_name = func_.attr
-                else:
-                    func_name = str(func_)
-
-                call_arg_list = []
-                for i, arg in enumerate(funcArgs):
-                    if isinstance(arg, ast.Name):
-                        call_arg_list.append((arg.id, f'arg{i+1}'))
-                    elif isinstance(arg, ast.Constant) and isinstance(arg.value, str):
-                        call_arg_list.append((arg.value, f'arg{i+1}'))
-                    elif isinstance(arg, ast.JoinedStr):
-                        joined_str = ''.join([elem.s if isinstance(elem, ast.Constant) else '{expr}' for elem in arg.values])
-                        call_arg_list.append((joined_str, f'arg{i+1}'))
-                    else:
-                        call_arg_list.append((str(arg), f'arg{i+1}'))
-
-                func_list.append((func_name, funcLineNo, call_arg_list))
-    logging.info(f"Total function calls found: {len(func_list)}")
+    table_ = getFactTable(pyTree)
+    func_list = [(getFactString(table_, 'FUNC', row_), table_['LINE'][row_], getFactArgList(table_, row_))
+                 for row_ in table_['ROWS']['CALLS']]
+    logging.info("Total function calls found: %s", len(func_list))
     return func_list
 
 
 def getPythonAttributeFuncs(pyTree):
     logging.info("Detecting attribute function calls")
-    attrib_call_list = []
-    for stmt_ in pyTree.body:
-        for node_ in ast.walk(stmt_):
-            if isinstance(node_, ast.Call):
-                func = node_.func
-                if isinstance(func, ast.Attribute):
-                    parent_name = func.value.id if isinstance(func.value, ast.Name) else str(func.value)
-                    func_name = func.attr
-                    call_arg_list = []
-                    for i, arg in enumerate(node_.args):
-                        if isinstance(arg, ast.Name):
-                            call_arg_list.append((arg.id, f'arg{i+1}'))
-                        elif isinstance(arg, ast.Constant) and isinstance(arg.value, str):
-                            call_arg_list.append((arg.value, f'arg{i+1}'))
-                        elif isinstance(arg, ast.JoinedStr):
-                            joined_str = ''.join([elem.s if isinstance(elem, ast.Constant) else '{expr}' for elem in arg.values])
-                            call_arg_list.append((joined_str, f'arg{i+1}'))
-                        else:
-                            call_arg_list.append((str(arg), f'arg{i+1}'))
-
-                    attrib_call_list.append((parent_name, func_name, node_.lineno, call_arg_list))
-    logging.info(f"Total attribute functions found: {len(attrib_call_list)}")
+    table_ = getFactTable(pyTree)
+    attrib_call_list = [(getFactString(table_, 'PARENT', row_), getFactString(table_, 'FUNC', row_), table_['LINE'][row_],
+                         getFactArgList(table_, row_)) for row_ in table_['ROWS'][FACT_ATTRIBUTE_CALL]]
+    logging.info("Total attribute functions found: %s", len(attrib_call_list))
     return attrib_call_list
 
 
+# FAME-ML spelling, kept for callers written against it
+getPythonAtrributeFuncs = getPythonAttributeFuncs
+
+
 def getModelFeature(pyTree):
-    feature_list = []
     logging.info("Detecting model features from AST")
+    table_ = getFactTable(pyTree)
+    feature_list = [(getFactString(table_, 'LHS', row_), getFactString(table_, 'PARENT', row_), getFactString(table_, 'FUNC', row_),
+                     table_['LINE'][row_]) for row_ in table_['ROWS'][FACT_FEATURE]]
+    logging.info("Total features extracted: %s", len(feature_list))
+    return feature_list
+
+
+# ------------------------------------------
+# Except handler index
+# ------------------------------------------
+# Handler spans from the fact table, sorted by first line. Handlers nest (a
+# try inside an except clause) but never overlap otherwise, so PARENTS links
+# each to its innermost enclosing handler, and one bisect per attribute call
+# puts the call in the bucket of the innermost handler around it. LOGS is set
+# for a handler when it or a handler nested in it makes a logging call.
+EXCEPT_INDEX_CACHE = weakref.WeakKeyDictionary()
+
+
+def getExceptIndex(pyTree):
+    if pyTree in EXCEPT_INDEX_CACHE:
+        return EXCEPT_INDEX_CACHE[pyTree]
+    table_ = getFactTable(pyTree)
+    handler_rows = sorted(table_['ROWS'][FACT_EXCEPT], key=lambda row_: (table_['LINE'][row_], -table_['END_LINE'][row_]))
+    starts_ = array('I', [table_['LINE'][row_] for row_ in handler_rows])
+    ends_ = array('I', [table_['END_LINE'][row_] for row_ in handler_rows])
+    parents_, open_ = array('i'), []
+    for handler_ in range(len(handler_rows)):
+        while open_ and ends_[open_[-1]] < starts_[handler_]:
+            open_.pop()
+        parents_.append(open_[-1] if open_ else -1)
+        open_.append(handler_)
+    buckets_ = [array('I') for _ in handler_rows]
+    logs_ = array('B', bytes(len(handler_rows)))
+    if handler_rows:
+        for call_ in table_['ROWS'][FACT_ATTRIBUTE_CALL]:
+            line_ = table_['LINE'][call_]
+            handler_ = bisect.bisect_right(starts_, line_) - 1
+            while handler_ >= 0 and ends_[handler_] < line_:
+                handler_ = parents_[handler_]
+            if handler_ >= 0:
+                buckets_[handler_].append(call_)
+                if isLoggingName(getFactString(table_, 'PARENT', call_), getFactString(table_, 'FUNC', call_)):
+                    logs_[handler_] = 1
+        # children sort after their parent, so one backwards pass propagates
+        for handler_ in reversed(range(len(handler_rows))):
+            if logs_[handler_] and parents_[handler_] >= 0:
+                logs_[parents_[handler_]] = 1
+    except_index = {'ROWS': array('I', handler_rows), 'STARTS': starts_, 'ENDS': ends_, 'PARENTS': parents_,
+                    'BUCKETS': buckets_, 'LOGS': logs_}
+    EXCEPT_INDEX_CACHE[pyTree] = except_index
+    return except_index
+
+
+def getExceptHandler(table_, except_index, handler_):
+    return (except_index['STARTS'][handler_], except_index['ENDS'][handler_],
+            getFactString(table_, 'FUNC', except_index['ROWS'][handler_]))
+
+
+def getPythonExcepts(pyTree):
+    # (first line, last line, caught exception or '', attribute calls in the
+    # handler) per except clause in source order; calls in a nested handler
+    # count for both
+    table_, except_index = getFactTable(pyTree), getExceptIndex(pyTree)
+    starts_, ends_, buckets_ = except_index['STARTS'], except_index['ENDS'], except_index['BUCKETS']
+    except_list = []
+    for handler_ in range(len(starts_)):
+        # handlers nested in this one follow it directly in start order
+        last_nested = handler_
+        while last_nested + 1 < len(starts_) and starts_[last_nested + 1] <= ends_[handler_]:
+            last_nested += 1
+        call_rows = sorted(call_ for nested_ in range(handler_, last_nested + 1) for call_ in buckets_[nested_])
+        handler_calls = [(getFactString(table_, 'PARENT', call_), getFactString(table_, 'FUNC', call_), table_['LINE'][call_],
+                          getFactArgList(table_, call_)) for call_ in call_rows]
+        except_list.append(getExceptHandler(table_, except_index, handler_) + (handler_calls,))
+    logging.info("Total except handlers found: %s", len(except_list))
+    return except_list
+
+
+def checkAttribFuncsInExcept(except_list):
+    # attribute calls per handler, in handler order
+    return [handler_calls for _, _, _, handler_calls in except_list]
+
+
+def checkExceptLogging(except_func_list):
+    # True when some except handler makes a logging call
+    return any(isLoggingName(parent_name, func_name)
+               for handler_calls in except_func_list for parent_name, func_name, _, _ in handler_calls)
+
+
+def getUnloggedExcepts(pyTree):
+    # (first line, last line, caught exception or '') of every handler
+    # without a logging call
+    table_, except_index = getFactTable(pyTree), getExceptIndex(pyTree)
+    return [getExceptHandler(table_, except_index, handler_)
+            for handler_, logs_ in enumerate(except_index['LOGS']) if not logs_]
+
+
+def getExceptLoggingCounts(pyTree):
+    # (handlers that log, handlers); summed over files for a corpus-wide fraction
+    logs_ = getExceptIndex(pyTree)['LOGS']
+    return sum(logs_), len(logs_)
+
+
+def getExceptLoggingRatio(pyTree):
+    logged_, total_ = getExceptLoggingCounts(pyTree)
+    return logged_ / total_ if total_ else 0.0
+
+
+def getImportedModules(pyTree):
+    # dotted module names of every import, including imports inside functions;
+    # relative `from . import x` has no module name and is skipped
+    module_list = []
     for stmt_ in pyTree.body:
         for node_ in ast.walk(stmt_):
-            if isinstance(node_, ast.Assign):
-                logging.info(f"Processing assignment at line {getattr(node_, 'lineno', 'unknown')}")
-                assign_dict = node_.__dict__
-                targets, value = assign_dict[constants.TARGETS_KW], assign_dict[constants.VALUE_KW]
-                lhs = ''
-                for target in targets:
-                    if isinstance(target, ast.Name):
-                        lhs = target.id
+            if isinstance(node_, ast.Import):
+                module_list.extend(alias_.name for alias_ in node_.names)
+            elif isinstance(node_, ast.ImportFrom) and node_.module:
+                module_list.append(node_.module)
+    logging.info("Total imported modules found: %s", len(module_list))
+    return module_list
+
+
+# ------------------------------------------
+# Def-use index: does a value reach a logging call?
+# ------------------------------------------
+# One scope per function (the module body is a scope too). Within a scope,
+# DERIVED maps a name to the (line, name) pairs assigned from an expression
+# that reads it, and SINKS maps a name to the logging calls that read it.
+# Names are identifiers or attribute chains rooted at one (self.model); a
+# read of self.model.fc is a read of self.model and self as well.
+# Flow follows source order and is may-flow: a reassignment does not cut it,
+# and loop back-edges and calls into other functions are not followed.
+DEF_USE_CACHE = weakref.WeakKeyDictionary()
+SCOPE_KW_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def getDottedName(node_):
+    parts_ = []
+    while isinstance(node_, ast.Attribute):
+        parts_.append(node_.attr)
+        node_ = node_.value
+    if not isinstance(node_, ast.Name):
+        return None
+    parts_.append(node_.id)
+    return '.'.join(reversed(parts_))
+
+
+def getUsedNames(expr_node):
+    used_ = set()
+    if expr_node is None:
+        return used_
+    for node_ in ast.walk(expr_node):
+        if isinstance(node_, ast.Name):
+            used_.add(node_.id)
+        elif isinstance(node_, ast.Attribute):
+            dotted_ = getDottedName(node_)
+            if dotted_:
+                used_.add(dotted_)
+    return used_
+
+
+def getTargetNames(target_node):
+    # x, (a, *b), self.model, cache[key] (an update of cache)
+    if isinstance(target_node, (ast.Tuple, ast.List)):
+        names_ = set()
+        for elt_ in target_node.elts:
+            names_ |= getTargetNames(elt_)
+        return names_
+    if isinstance(target_node, ast.Starred):
+        return getTargetNames(target_node.value)
+    if isinstance(target_node, ast.Subscript):
+        return getTargetNames(target_node.value)
+    dotted_ = getDottedName(target_node)
+    return {dotted_} if dotted_ else set()
+
+
+def iterScopeNodes(scope_node):
+    # nodes of one scope; nested functions are scopes of their own
+    stack_ = list(reversed(scope_node.body))
+    while stack_:
+        node_ = stack_.pop()
+        yield node_
+        if isinstance(node_, SCOPE_KW_TYPES):
+            stack_.extend(reversed(node_.decorator_list))
+            continue
+        stack_.extend(reversed(list(ast.iter_child_nodes(node_))))
+
+
+def getScopeDefUse(scope_node):
+    scope_ = {'NAME': getattr(scope_node, 'name', '<module>'), 'DEFS': {}, 'DERIVED': {}, 'SINKS': {}, 'MEMO': {}}
+
+    def addDef(stmt_, targets_, used_):
+        for line_ in range(stmt_.lineno, (getattr(stmt_, 'end_lineno', None) or stmt_.lineno) + 1):
+            scope_['DEFS'].setdefault(line_, set()).update(targets_)
+        for name_ in used_:
+            scope_['DERIVED'].setdefault(name_, []).extend((stmt_.lineno, target_) for target_ in targets_ if target_ != name_)
+
+    for node_ in iterScopeNodes(scope_node):
+        if isinstance(node_, ast.Assign):
+            targets_ = set()
+            for target_ in node_.targets:
+                targets_ |= getTargetNames(target_)
+            addDef(node_, targets_, getUsedNames(node_.value))
+        elif isinstance(node_, (ast.AnnAssign, ast.AugAssign)) and node_.value is not None:
+            addDef(node_, getTargetNames(node_.target), getUsedNames(node_.value))
+        elif isinstance(node_, (ast.For, ast.AsyncFor)):
+            addDef(node_.target, getTargetNames(node_.target), getUsedNames(node_.iter))
+        elif isinstance(node_, (ast.With, ast.AsyncWith)):
+            for item_ in node_.items:
+                if item_.optional_vars is not None:
+                    addDef(item_.optional_vars, getTargetNames(item_.optional_vars), getUsedNames(item_.context_expr))
+        elif isinstance(node_, ast.NamedExpr):
+            addDef(node_, getTargetNames(node_.target), getUsedNames(node_.value))
+        elif isLoggingCall(node_):
+            for arg_ in list(node_.args) + [keyword_.value for keyword_ in node_.keywords]:
+                for name_ in getUsedNames(arg_):
+                    scope_['SINKS'].setdefault(name_, []).append(node_.lineno)
+        elif isinstance(node_, ast.Call) and isinstance(node_.func, ast.Attribute):
+            # results.append(output): the arguments flow into the receiver
+            receiver_ = getDottedName(node_.func.value)
+            if receiver_:
+                used_ = set()
+                for arg_ in list(node_.args) + [keyword_.value for keyword_ in node_.keywords]:
+                    used_ |= getUsedNames(arg_)
+                addDef(node_, {receiver_}, used_)
+    return scope_
+
+
+def getLineScopes(scopes_):
+    def_use_index = {'SCOPES': scopes_, 'LINE_SCOPES': {}}
+    for scope_ in scopes_:
+        for line_ in scope_['DEFS']:
+            def_use_index['LINE_SCOPES'].setdefault(line_, []).append(scope_)
+    return def_use_index
+
+
+def getDefUseIndex(tree_object):
+    if tree_object in DEF_USE_CACHE:
+        return DEF_USE_CACHE[tree_object]
+    if tree_object in SEGMENTED_TREES:
+        DEF_USE_CACHE[tree_object] = mergeDefUseIndexes([(offset_, getDefUseIndex(tree_))
+                                                         for offset_, tree_ in SEGMENTED_TREES[tree_object]])
+        return DEF_USE_CACHE[tree_object]
+    scopes_ = [getScopeDefUse(tree_object)]
+    for node_ in ast.walk(tree_object):
+        if isinstance(node_, SCOPE_KW_TYPES):
+            scopes_.append(getScopeDefUse(node_))
+    DEF_USE_CACHE[tree_object] = getLineScopes(scopes_)
+    return DEF_USE_CACHE[tree_object]
+
+
+def getNameLoggingLines(scope_, name_, from_line):
+    # logging lines reached from name_ as assigned at from_line; each name is
+    # expanded from the earliest line it is reached at, so the walk stays
+    # linear in the number of def-use edges
+    memo_key = (name_, from_line)
+    if memo_key in scope_['MEMO']:
+        return scope_['MEMO'][memo_key]
+    reached_ = {name_: from_line}
+    stack_, logged_lines = [name_], set()
+    while stack_:
+        current_ = stack_.pop()
+        current_line = reached_[current_]
+        for sink_line in scope_['SINKS'].get(current_, ()):
+            if sink_line >= current_line:
+                logged_lines.add(sink_line)
+        for line_, target_ in scope_['DERIVED'].get(current_, ()):
+            if line_ >= current_line and line_ < reached_.get(target_, float('inf')):
+                reached_[target_] = line_
+                stack_.append(target_)
+    scope_['MEMO'][memo_key] = sorted(logged_lines)
+    return scope_['MEMO'][memo_key]
+
+
+def getValueLoggingLines(tree_object, lineno):
+    # lines of the logging calls that the value(s) assigned at lineno flow into
+    logged_lines = set()
+    for scope_ in getDefUseIndex(tree_object)['LINE_SCOPES'].get(lineno, ()):
+        for name_ in scope_['DEFS'][lineno]:
+            logged_lines.update(getNameLoggingLines(scope_, name_, lineno))
+    return sorted(logged_lines)
+
+
+# ------------------------------------------
+# Import index: local names -> canonical module paths
+# ------------------------------------------
+# `import torch as T` binds T to torch, `from torch import load as L` binds L
+# to torch.load, and relative imports are anchored at the file's package.
+# Only files given by an absolute on-disk path are resolved against their
+# repo. Repo roots and repo-local module lookups are memoized in bounded LRU
+# caches shared by every file of a repo, so a corpus scan touches the file
+# system about once per folder and module name.
+IMPORT_INDEX_CACHE = weakref.WeakKeyDictionary()
+IMPORT_NODES_CACHE = weakref.WeakKeyDictionary()
+REPO_ROOT_CACHE_SIZE = 4096
+MODULE_RESOLUTION_CACHE_SIZE = 16384
+
+
+@functools.lru_cache(maxsize=REPO_ROOT_CACHE_SIZE)
+def findRepoRoot(dir_):
+    # nearest folder at or above dir_ holding .git, or None; ancestors hit the cache
+    if os.path.exists(os.path.join(dir_, '.git')):
+        return dir_
+    parent_ = os.path.dirname(dir_)
+    return None if parent_ == dir_ else findRepoRoot(parent_)
+
+
+def getRepoRoot(pyFile):
+    # nearest folder above pyFile holding .git; the file's own folder otherwise
+    file_dir = os.path.dirname(os.path.abspath(pyFile))
+    return findRepoRoot(file_dir) or file_dir
+
+
+@functools.lru_cache(maxsize=MODULE_RESOLUTION_CACHE_SIZE)
+def resolveRepoModule(search_dir, module_name):
+    # path of module_name as a .py file or package under search_dir, or None
+    base_ = os.path.join(search_dir, *module_name.split('.'))
+    for candidate_ in (base_ + constants.PY_FILE_EXTENSION, os.path.join(base_, '__init__' + constants.PY_FILE_EXTENSION)):
+        if os.path.isfile(candidate_):
+            return candidate_
+    return None
+
+
+def getPackageName(repo_root, pyFile):
+    # dotted package of pyFile relative to the repo root ('' at the root)
+    rel_dir = os.path.relpath(os.path.dirname(os.path.abspath(pyFile)), repo_root)
+    return '' if rel_dir == os.curdir else rel_dir.replace(os.sep, '.')
+
+
+def getImportNodes(tree_object):
+    # Import and ImportFrom nodes at any depth, in walk order
+    if tree_object in IMPORT_NODES_CACHE:
+        return IMPORT_NODES_CACHE[tree_object]
+    if tree_object in SEGMENTED_TREES:
+        IMPORT_NODES_CACHE[tree_object] = [node_ for _, tree_ in SEGMENTED_TREES[tree_object] for node_ in getImportNodes(tree_)]
+    else:
+        IMPORT_NODES_CACHE[tree_object] = [node_ for stmt_ in tree_object.body for node_ in ast.walk(stmt_)
+                                           if isinstance(node_, (ast.Import, ast.ImportFrom))]
+    return IMPORT_NODES_CACHE[tree_object]
+
+
+def getOnDiskFile(tree_object):
+    # content that is not on disk (git blobs, archive members) or given by a
+    # cwd-relative name has no repo to resolve against
+    py_file = TREE_FILES.get(tree_object)
+    return py_file if py_file and os.path.isabs(py_file) and os.path.isfile(py_file) else None
+
+
+def getImportIndex(tree_object):
+    if tree_object in IMPORT_INDEX_CACHE:
+        return IMPORT_INDEX_CACHE[tree_object]
+    py_file = getOnDiskFile(tree_object)
+    package_ = getPackageName(getRepoRoot(py_file), py_file) if py_file else ''
+    import_index = {'ALIASES': {}, 'MODULES': []}
+    for node_ in getImportNodes(tree_object):
+        if isinstance(node_, ast.Import):
+            for alias_ in node_.names:
+                import_index['MODULES'].append(alias_.name)
+                if alias_.asname:
+                    import_index['ALIASES'][alias_.asname] = alias_.name
+                else:
+                    # `import a.b` binds a
+                    top_ = alias_.name.split('.')[0]
+                    import_index['ALIASES'][top_] = top_
+        elif isinstance(node_, ast.ImportFrom):
+            module_ = node_.module or ''
+            if node_.level and py_file:
+                # level 1 is the file's own package, each further dot one package up
+                anchor_ = package_.split('.')[:len(package_.split('.')) - node_.level + 1] if package_ else []
+                module_ = '.'.join(anchor_ + ([module_] if module_ else []))
+            elif node_.level:
+                module_ = '.' * node_.level + module_
+            import_index['MODULES'].append(module_)
+            prefix_ = module_ if not module_ or module_.endswith('.') else module_ + '.'
+            for alias_ in node_.names:
+                if alias_.name != '*':
+                    import_index['ALIASES'][alias_.asname or alias_.name] = prefix_ + alias_.name
+    IMPORT_INDEX_CACHE[tree_object] = import_index
+    return import_index
+
+
+def getLocalModules(tree_object):
+    # imported modules found in the file's repo or next to the file, resolved on request
+    py_file = getOnDiskFile(tree_object)
+    if not py_file:
+        return set()
+    search_dirs = (getRepoRoot(py_file), os.path.dirname(py_file))
+    return {module_ for module_ in getImportIndex(tree_object)['MODULES']
+            if module_ and not module_.startswith('.') and any(resolveRepoModule(dir_, module_) for dir_ in search_dirs)}
+
+
+def getCanonicalName(tree_object, dotted_name):
+    # T.load -> torch.load, L -> torch.load; names not bound by an import are returned as is
+    head_, dot_, rest_ = dotted_name.partition('.')
+    canonical_ = getImportIndex(tree_object)['ALIASES'].get(head_)
+    if canonical_ is None:
+        return dotted_name
+    return canonical_ + dot_ + rest_
+
+
+def getImport(pyTree):
+    # top-level package of every import, in source order
+    import_list = [module_.split('.')[0] for module_ in getImportIndex(pyTree)['MODULES'] if module_ and not module_.startswith('.')]
+    logging.info("Total imports found: %s", len(import_list))
+    return import_list
+
+
+def getImportedNameCalls(pyTree):
+    # calls of from-imported functions as (canonical module, function, line, args):
+    # load(path) after `from torch import load` gives ('torch', 'load', ...)
+    aliases_ = getImportIndex(pyTree)['ALIASES']
+    table_ = getFactTable(pyTree)
+    name_call_list = []
+    for row_ in table_['ROWS'][FACT_NAME_CALL]:
+        canonical_ = aliases_.get(getFactString(table_, 'FUNC', row_), '')
+        if '.' in canonical_:
+            module_, _, func_name = canonical_.rpartition('.')
+            name_call_list.append((module_, func_name, table_['LINE'][row_], getFactArgList(table_, row_)))
+    return name_call_list
+
+
+# ------------------------------------------
+# Incremental parsing across file versions
+# ------------------------------------------
+# A module is split into top-level segments (one statement with its
+# decorators, else/except/finally clauses and trailing comments) by a line
+# scanner that tracks brackets, strings and backslash continuations. Each
+# segment is parsed on its own and cached by content digest, so a new version
+# of a file parses only the segments whose text changed. The module's fact
+# table, logging index and def-use index are merged from the segment ones on
+# first use, with line numbers moved to each segment's place in the file.
+# Statement nodes of a segment keep the line numbers of the segment text, so
+# line-aware answers come from these indexes, not from walking the tree.
+# The same segments recover files that do not parse: a segment with a syntax
+# error is dropped whole and the rest is kept.
+SEGMENT_CACHE = OrderedDict()     # digest -> segment tree, least recently used first
+SEGMENT_CACHE_SIZE = 4096
+SEGMENTED_TREES = weakref.WeakKeyDictionary()
+RECOVERY_STATS = weakref.WeakKeyDictionary()
+SEGMENT_TOKEN_REGEX = re.compile(r'"""|\'\'\'|["\'#()\[\]{}]')
+STRING_END_REGEXES = {
+    '"': re.compile(r'(?:[^"\\\n]|\\.)*"'), "'": re.compile(r"(?:[^'\\\n]|\\.)*'"),
+    '"""': re.compile(r'(?:[^\\]|\\.)*?"""', re.S), "'''": re.compile(r"(?:[^\\]|\\.)*?'''", re.S),
+}
+CLAUSE_REGEX = re.compile(r'(?:else|elif|except|finally)\b')
+
+
+def getTopLevelSegments(source):
+    # (first line, text) per segment; lines before the first statement join it
+    segments_, current_, first_line, has_code = [], [], 1, False
+    depth_, open_string, continued_, decorated_ = 0, None, False, False
+    lines_ = source.split('\n')
+    for number_, line_ in enumerate(lines_, 1):
+        if number_ < len(lines_):
+            line_ += '\n'
+        at_top = depth_ == 0 and open_string is None and not continued_
+        starts_code = at_top and line_[:1] not in ('', ' ', '\t', '\n', '\r', '#', '\x0c')
+        if starts_code and has_code and not decorated_ and not CLAUSE_REGEX.match(line_):
+            segments_.append((first_line, ''.join(current_)))
+            current_, first_line = [], number_
+        if starts_code:
+            has_code, decorated_ = True, line_.startswith('@')
+        current_.append(line_)
+        position_ = 0
+        if open_string is not None:
+            end_ = STRING_END_REGEXES[open_string].match(line_)
+            if end_ is None:
+                continue
+            open_string, position_ = None, end_.end()
+        continued_ = False
+        while True:
+            token_ = SEGMENT_TOKEN_REGEX.search(line_, position_)
+            if token_ is None:
+                continued_ = line_.rstrip('\r\n').endswith('\\')
+                break
+            text_ = token_.group()
+            if text_ == '#':
+                break
+            if text_ in '([{':
+                depth_ += 1
+            elif text_ in ')]}':
+                depth_ = max(0, depth_ - 1)
+            else:
+                end_ = STRING_END_REGEXES[text_].match(line_, token_.end())
+                if end_ is None:
+                    # an open triple-quoted string runs on; an unclosed quote ends with the line
+                    open_string = text_ if len(text_) == 3 else None
+                    continued_ = len(text_) == 1 and line_.rstrip('\r\n').endswith('\\')
+                    break
+                position_ = end_.end()
+                continue
+            position_ = token_.end()
+    if current_:
+        segments_.append((first_line, ''.join(current_)))
+    return segments_
+
+
+def getSegmentTree(segment_text):
+    # None when the segment does not parse on its own
+    digest_ = hashlib.sha1(segment_text.encode('utf-8', 'surrogatepass')).hexdigest()
+    if digest_ in SEGMENT_CACHE:
+        SEGMENT_CACHE.move_to_end(digest_)
+        return SEGMENT_CACHE[digest_]
+    try:
+        segment_tree = ast.parse(segment_text)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        segment_tree = None
+    SEGMENT_CACHE[digest_] = segment_tree
+    if len(SEGMENT_CACHE) > SEGMENT_CACHE_SIZE:
+        SEGMENT_CACHE.popitem(last=False)
+    return segment_tree
+
+
+def mergeFactTables(offset_tables):
+    # one table from (line offset, segment table) pairs, rows in segment order
+    merged_ = {column_: array(type_) for column_, type_ in FACT_COLUMNS.items()}
+    tokens_, strings_, string_ids, deferred_ = array('i'), [''], {'': 0}, []
+    merged_['ROWS'] = {kind_: array('I') for kind_ in list(range(FACT_EXCEPT + 1)) + ['CALLS']}
+    for offset_, table_ in offset_tables:
+        string_map = []
+        for string_ in table_['STRINGS']:
+            if string_ not in string_ids:
+                string_ids[string_] = len(strings_)
+                strings_.append(string_)
+            string_map.append(string_ids[string_])
+        row_offset, token_offset, deferred_offset = len(merged_['KIND']), len(tokens_), len(deferred_)
+        for column_ in ('KIND', 'ARG_COUNT', 'TARGET_COUNT'):
+            merged_[column_].extend(table_[column_])
+        for column_ in ('LINE', 'END_LINE'):
+            merged_[column_].extend([line_ + offset_ if line_ else 0 for line_ in table_[column_]])
+        for column_ in ('LHS', 'PARENT', 'FUNC'):
+            merged_[column_].extend([string_map[id_] for id_ in table_[column_]])
+        for column_ in ('ARG_START', 'TARGET_START'):
+            merged_[column_].extend([start_ + token_offset for start_ in table_[column_]])
+        tokens_.extend([string_map[token_] if token_ >= 0 else token_ - deferred_offset for token_ in table_['TOKENS']])
+        deferred_.extend(table_['DEFERRED'])
+        for kind_, rows_ in table_['ROWS'].items():
+            merged_['ROWS'][kind_].extend([row_ + row_offset for row_ in rows_])
+    merged_['TOKENS'], merged_['STRINGS'], merged_['DEFERRED'] = tokens_, strings_, deferred_
+    return merged_
+
+
+def mergeLoggingIndexes(offset_indexes):
+    merged_ = {'IMPORTED': False, 'CALL_LINES': [], 'TOKEN_LINES': {}}
+    for offset_, logging_index in offset_indexes:
+        merged_['IMPORTED'] = merged_['IMPORTED'] or logging_index['IMPORTED']
+        merged_['CALL_LINES'].extend(line_ + offset_ for line_ in logging_index['CALL_LINES'])
+        for token_, token_lines in logging_index['TOKEN_LINES'].items():
+            merged_['TOKEN_LINES'].setdefault(token_, []).extend(line_ + offset_ for line_ in token_lines)
+    return merged_
+
+
+def assembleSegmentTrees(offset_trees, pyFile):
+    # module of (line offset, segment tree) pairs; its fact table, logging,
+    # def-use and import indexes are merged from the segment ones when first asked for
+    module_ = ast.Module(body=[stmt_ for _, tree_ in offset_trees for stmt_ in tree_.body], type_ignores=[])
+    SEGMENTED_TREES[module_] = offset_trees
+    TREE_FILES[module_] = pyFile
+    return module_
+
+
+def mergeDefUseIndexes(offset_indexes):
+    # the module scopes of all segments form one scope, as in a full parse;
+    # every function lies inside one segment and keeps a scope of its own
+    module_scope = {'NAME': '<module>', 'DEFS': {}, 'DERIVED': {}, 'SINKS': {}, 'MEMO': {}}
+    scopes_ = [module_scope]
+    for offset_, def_use_index in offset_indexes:
+        for position_, scope_ in enumerate(def_use_index['SCOPES']):
+            merged_ = module_scope if position_ == 0 else {'NAME': scope_['NAME'], 'DEFS': {}, 'DERIVED': {}, 'SINKS': {}, 'MEMO': {}}
+            for line_, names_ in scope_['DEFS'].items():
+                merged_['DEFS'].setdefault(line_ + offset_, set()).update(names_)
+            for name_, edges_ in scope_['DERIVED'].items():
+                merged_['DERIVED'].setdefault(name_, []).extend((line_ + offset_, target_) for line_, target_ in edges_)
+            for name_, sink_lines in scope_['SINKS'].items():
+                merged_['SINKS'].setdefault(name_, []).extend(line_ + offset_ for line_ in sink_lines)
+            if position_:
+                scopes_.append(merged_)
+    return getLineScopes(scopes_)
+
+
+@tracing.traced
+def getPythonParseObjectIncremental(source, pyFile):
+    offset_trees = []
+    for first_line, segment_text in getTopLevelSegments(source):
+        segment_tree = getSegmentTree(segment_text)
+        if segment_tree is None:
+            # a segment that only parses in context (or not at all): parse the whole file
+            return getPythonParseObjectFromSource(source, pyFile)
+        offset_trees.append((first_line - 1, segment_tree))
+    return assembleSegmentTrees(offset_trees, pyFile)
+
+
+def recoverPythonParseObject(source, pyFile):
+    offset_trees = []
+    recovery_ = {'RECOVERED_LINES': 0, 'LOST_LINES': 0, 'LOST_SEGMENTS': []}
+    for first_line, segment_text in getTopLevelSegments(source):
+        segment_lines = segment_text.count('\n') + (1 if segment_text and not segment_text.endswith('\n') else 0)
+        segment_tree = getSegmentTree(segment_text)
+        if segment_tree is None:
+            recovery_['LOST_LINES'] += segment_lines
+            recovery_['LOST_SEGMENTS'].append((first_line, first_line + segment_lines - 1))
+        else:
+            recovery_['RECOVERED_LINES'] += segment_lines
+            offset_trees.append((first_line - 1, segment_tree))
+    module_ = assembleSegmentTrees(offset_trees, pyFile)
+    RECOVERY_STATS[module_] = recovery_
+    return module_
 
-                if isinstance(value, ast.Attribute):
-                    funcDict = value.__dict__ 
-                    className, featureName, funcLineNo = funcDict.get(constants.VALUE_KW), funcDict.get(constants.ATTRIB_KW), funcDict.get(constants.LINE_NO_KW)
-                    if isinstance(className, ast.Name):
-                        feature_list.append((lhs, className.id, featureName, funcLineNo))
-    logging.info(f"Total features extracted: {len(feature_list)}")
-    return feature_list
 
+def getRecoveryStats(tree_object):
+    # lines kept and lost, and the (first, last) lines of every dropped
+    # segment, for a tree recovered from a file with syntax errors; None otherwise
+    return RECOVERY_STATS.get(tree_object)
@@ -0,0 +1,196 @@
+'''
+Parallel corpus scan with per-file budgets. Worker processes analyse one
+distinct file content per task under a CPU-time and RSS watchdog: a SIGPROF
+interval timer checks both while the file is analysed, and a file over budget
+is abandoned with the categories counted so far (STATUS PARTIAL). Workers are
+recycled after RECYCLE_AFTER files to cap memory drift, and a file that does
+not come back within the hard timeout (stuck in C code, worker killed) gets
+its pool torn down and is recorded without counts (STATUS QUARANTINED).
+Every abandoned file is listed in the quarantine list.
+'''
+
+import os
+import csv
+import time
+import signal
+import logging
+import resource
+import multiprocessing
+import multiprocessing.util
+from collections import OrderedDict
+
+import constants
+import lint_engine
+import frequency
+import scanner
+import tracing
+import forensic_logging
+
+CPU_BUDGET = 30.0                 # CPU seconds per file
+RSS_BUDGET = 2 * 1024 ** 3        # resident bytes of the worker process
+RECYCLE_AFTER = 200               # files per worker process
+WATCHDOG_TICK = 0.1               # CPU seconds between watchdog checks
+QUARANTINE_HEADER = ['REPO_FULL_PATH', 'FILE_FULL_PATH', 'STATUS', 'REASON', 'CPU_SECONDS', 'RSS_BYTES']
+
+class FileBudgetExceeded(BaseException):
+    # BaseException so the per-detector `except Exception` in lint_engine lets it through
+    pass
+
+# ----------------------------
+# Worker side
+# ----------------------------
+
+_budgets = {'cpu': CPU_BUDGET, 'rss': RSS_BUDGET}
+_task_cpu_start = None
+
+def getCurrentRSS():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # peak rather than current, but the best other platforms offer (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _watchdogTick(signum, frame):
+    if _task_cpu_start is None:
+        return
+    cpu_used = time.process_time() - _task_cpu_start
+    if cpu_used > _budgets['cpu']:
+        raise FileBudgetExceeded('CPU_BUDGET')
+    if getCurrentRSS() > _budgets['rss']:
+        raise FileBudgetExceeded('RSS_BUDGET')
+
+def initWorker(cpu_budget, rss_budget):
+    _budgets['cpu'], _budgets['rss'] = cpu_budget, rss_budget
+    signal.signal(signal.SIGPROF, _watchdogTick)
+    # forked workers start with the parent's spans and leave through os._exit, which skips atexit
+    tracing.TRACE_EVENTS.clear()
+    multiprocessing.util.Finalize(None, tracing.dumpTrace, exitpriority=10)
+
+def analyseTask(task_):
+    global _task_cpu_start
+    content_key, file_full_path, source = task_
+    sloc_ = frequency.getSourceSLOC(source)
+    event_counts, status_, reason_ = {}, scanner.STATUS_OK, None
+    cpu_start = _task_cpu_start = time.process_time()
+    signal.setitimer(signal.ITIMER_PROF, WATCHDOG_TICK, WATCHDOG_TICK)
+    try:
+        try:
+            lint_engine.getEventCounts(file_full_path, source, event_counts)
+        finally:
+            # a tick already pending still runs after the timer is disarmed;
+            # it returns early once _task_cpu_start is cleared
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            _task_cpu_start = None
+    except FileBudgetExceeded as e:
+        status_, reason_ = scanner.STATUS_PARTIAL, e.args[0]
+        logging.warning("Budget %s exceeded on %s, keeping %s finished categories", reason_, file_full_path, len(event_counts))
+    cpu_used = time.process_time() - cpu_start
+    if status_ == scanner.STATUS_PARTIAL:
+        event_counts.pop(constants.TOTAL_EVENT_COUNT_KW, None)
+        event_counts = {category_: event_counts.get(category_, 0) for category_ in lint_engine.EVENT_DETECTORS}
+        event_counts[constants.TOTAL_EVENT_COUNT_KW] = sum(event_counts.values())
+    usage_ = {'REASON': reason_, 'CPU_SECONDS': round(cpu_used, 3), 'RSS_BYTES': getCurrentRSS()}
+    return content_key, (sloc_,) + tuple(event_counts.values()) + (status_,), usage_
+
+# ----------------------------
+# Parent side
+# ----------------------------
+
+def getQuarantinedValues(source):
+    return (frequency.getSourceSLOC(source),) + (0,) * (len(lint_engine.EVENT_DETECTORS) + 1) + (scanner.STATUS_QUARANTINED,)
+
+def scanFilesParallel(file_iter, workers=None, cpu_budget=CPU_BUDGET, rss_budget=RSS_BUDGET,
+                      hard_timeout=None, recycle_after=RECYCLE_AFTER):
+    workers = workers or os.cpu_count() or 1
+    # a worker that ignores SIGPROF for this long is stuck outside Python
+    hard_timeout = hard_timeout or cpu_budget * 2 + 30
+    max_in_flight = workers * 2
+
+    def newPool():
+        return multiprocessing.Pool(workers, initializer=initWorker, initargs=(cpu_budget, rss_budget),
+                                    maxtasksperchild=recycle_after)
+
+    row_keys, content_cache, quarantine_list, task_repos = [], {}, [], {}
+    in_flight = OrderedDict()   # content key -> (task, async result, submit time)
+    dedup_stats = {'FILES': 0, 'DISTINCT_CONTENTS': 0, 'DUPLICATE_FILES': 0, 'DUPLICATE_SLOC': 0}
+    pool = newPool()
+
+    def submit(task_):
+        in_flight[task_[0]] = (task_, pool.apply_async(analyseTask, (task_,)), time.monotonic())
+
+    def drainOldest():
+        nonlocal pool
+        content_key, (task_, result_, submitted_) = in_flight.popitem(last=False)
+        try:
+            _, values_, usage_ = result_.get(timeout=max(0, hard_timeout - (time.monotonic() - submitted_)))
+        except multiprocessing.TimeoutError:
+            values_, usage_ = getQuarantinedValues(task_[2]), {'REASON': 'HARD_TIMEOUT', 'CPU_SECONDS': None, 'RSS_BYTES': None}
+            logging.error("No result for %s after %ss, restarting the worker pool", task_[1], hard_timeout)
+            pool.terminate()
+            pool.join()
+            pool = newPool()
+            for pending_task, _, _ in list(in_flight.values()):
+                submit(pending_task)
+        except Exception as e:
+            # the analysis itself raised; the pool is still healthy
+            values_, usage_ = getQuarantinedValues(task_[2]), {'REASON': f"WORKER_ERROR: {e}"[:200], 'CPU_SECONDS': None, 'RSS_BYTES': None}
+            logging.error("Worker failed on %s: %s", task_[1], e)
+        content_cache[content_key] = values_
+        repo_path = task_repos.pop(content_key)
+        if usage_['REASON']:
+            quarantine_list.append((repo_path, task_[1], values_[-1], usage_['REASON'], usage_['CPU_SECONDS'], usage_['RSS_BYTES']))
+
+    try:
+        for repo_path, file_full_path, source in file_iter:
+            dedup_stats['FILES'] += 1
+            content_key = scanner.getContentKey(file_full_path, source)
+            row_keys.append((repo_path, file_full_path, content_key))
+            if content_key in content_cache or content_key in in_flight:
+                dedup_stats['DUPLICATE_FILES'] += 1
+                continue
+            while len(in_flight) >= max_in_flight:
+                drainOldest()
+            task_repos[content_key] = repo_path
+            submit((content_key, file_full_path, source))
+        while in_flight:
+            drainOldest()
+    finally:
+        if in_flight:
+            pool.terminate()
+        else:
+            # a clean close lets idle workers run their exit finalizers
+            pool.close()
+        pool.join()
+
+    scan_list, seen_keys = [], set()
+    for repo_path, file_full_path, content_key in row_keys:
+        values_ = content_cache[content_key]
+        if content_key in seen_keys:
+            dedup_stats['DUPLICATE_SLOC'] += values_[0]
+        seen_keys.add(content_key)
+        scan_list.append((repo_path, file_full_path) + values_)
+    dedup_stats['DISTINCT_CONTENTS'] = len(content_cache)
+    logging.info("Scanned %s files, %s distinct contents, %s quarantined", dedup_stats['FILES'], dedup_stats['DISTINCT_CONTENTS'], len(quarantine_list))
+    return scan_list, dedup_stats, quarantine_list
+
+def scanCorpusParallel(corpus_dir, workers=None, **budgets):
+    logging.info("Scanning corpus %s", corpus_dir)
+    scan_list, dedup_stats, quarantine_list = scanFilesParallel(scanner.iterCorpusFiles(corpus_dir), workers, **budgets)
+    print(scanner.getDedupReport(dedup_stats))
+    print(f"Quarantined files: {len(quarantine_list)}")
+    return scan_list, dedup_stats, quarantine_list
+
+def dumpQuarantine(quarantine_list, output_file):
+    with open(output_file, 'w', newline='') as fileToWrite:
+        writer = csv.writer(fileToWrite)
+        writer.writerow(QUARANTINE_HEADER)
+        writer.writerows(quarantine_list)
+    logging.info("Quarantine list saved to %s", output_file)
+
+if __name__ == '__main__':
+    forensic_logging.setupForensicLogging('forensics.log')
+    import sys
+    corpus_rows, _, quarantined = scanCorpusParallel(sys.argv[1] if len(sys.argv) > 1 else '../FSE2021_REPOS/')
+    scanner.dumpScan(corpus_rows, 'SCAN_OUTPUT.csv')
+    dumpQuarantine(quarantined, 'SCAN_QUARANTINE.csv')
@@ -0,0 +1,107 @@
+'''
+Corpus scanner: runs lint_engine and the SLOC counter over every Python and
+notebook file of a corpus. File contents are hashed during the walk, so
+content shared by vendored copies and forks is analysed once and the result
+is fanned out to every (REPO_FULL_PATH, FILE_FULL_PATH) row.
+'''
+
+import os
+import csv
+import hashlib
+import logging
+
+import constants
+import lint_engine
+import frequency
+import forensic_logging
+import tracing
+
+SCAN_EXTENSIONS = (constants.PY_FILE_EXTENSION, constants.IPYNB_FILE_EXTENSION)
+SCAN_HEADER = ['REPO_FULL_PATH', 'FILE_FULL_PATH', 'SLOC'] + list(lint_engine.EVENT_DETECTORS) + [constants.TOTAL_EVENT_COUNT_KW, 'STATUS']
+# STATUS of a row: complete analysis, counts of the detectors that finished
+# before a budget ran out (scan_pool), or no analysis at all
+STATUS_OK, STATUS_PARTIAL, STATUS_QUARANTINED = 'OK', 'PARTIAL', 'QUARANTINED'
+
+# ----------------------------
+# File sources
+# ----------------------------
+
+def decodeSource(content):
+    # utf-8 (BOM dropped) as Python 3 reads source; latin-1 never fails for legacy encodings
+    try:
+        return content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return content.decode('latin-1')
+
+def iterRepoFiles(repo_path):
+    for root_, _, filenames in os.walk(repo_path):
+        for file_ in filenames:
+            if file_.endswith(SCAN_EXTENSIONS):
+                full_path_file = os.path.join(root_, file_)
+                with open(full_path_file, 'rb') as f:
+                    yield repo_path, full_path_file, decodeSource(f.read())
+
+def iterCorpusFiles(corpus_dir):
+    # one cloned repo per sub-folder, as laid out by mining.cloneRepos
+    all_repos = sorted(f.path for f in os.scandir(corpus_dir) if f.is_dir())
+    logging.info("Walking %s repos under %s", len(all_repos), corpus_dir)
+    for repo_path in all_repos:
+        yield from iterRepoFiles(repo_path)
+
+# ----------------------------
+# Deduplicating scan
+# ----------------------------
+
+def getContentKey(file_full_path, source):
+    # notebooks are parsed differently, so the extension is part of the key
+    digest_ = hashlib.sha1(source.encode('utf-8', 'surrogatepass')).hexdigest()
+    return digest_, os.path.splitext(file_full_path)[1]
+
+def scanFiles(file_iter):
+    scan_list, content_cache = [], {}
+    dedup_stats = {'FILES': 0, 'DISTINCT_CONTENTS': 0, 'DUPLICATE_FILES': 0, 'DUPLICATE_SLOC': 0}
+    for repo_path, file_full_path, source in file_iter:
+        dedup_stats['FILES'] += 1
+        content_key = getContentKey(file_full_path, source)
+        if content_key in content_cache:
+            dedup_stats['DUPLICATE_FILES'] += 1
+            dedup_stats['DUPLICATE_SLOC'] += content_cache[content_key][0]
+        else:
+            with tracing.traceSpan('scanner.analyseFile', 'scanner', file=file_full_path):
+                event_counts = lint_engine.getEventCounts(file_full_path, source)
+                content_cache[content_key] = (frequency.getSourceSLOC(source),) + tuple(event_counts.values()) + (STATUS_OK,)
+        scan_list.append((repo_path, file_full_path) + content_cache[content_key])
+    dedup_stats['DISTINCT_CONTENTS'] = len(content_cache)
+    logging.info("Scanned %s files, %s distinct contents", dedup_stats['FILES'], dedup_stats['DISTINCT_CONTENTS'])
+    return scan_list, dedup_stats
+
+def getDedupReport(dedup_stats):
+    try:
+        saved_prop = round(dedup_stats['DUPLICATE_FILES'] / dedup_stats['FILES'], 5) * 100
+    except ZeroDivisionError:
+        saved_prop = 0
+    report_ = (f"Files: {dedup_stats['FILES']} | Distinct contents: {dedup_stats['DISTINCT_CONTENTS']} | "
+               f"Analyses skipped: {dedup_stats['DUPLICATE_FILES']} ({saved_prop}%) | "
+               f"SLOC not re-analysed: {dedup_stats['DUPLICATE_SLOC']}")
+    logging.info("Dedup report: %s", report_)
+    return report_
+
+def scanCorpus(corpus_dir):
+    logging.info("Scanning corpus %s", corpus_dir)
+    scan_list, dedup_stats = scanFiles(iterCorpusFiles(corpus_dir))
+    print(getDedupReport(dedup_stats))
+    return scan_list, dedup_stats
+
+@tracing.traced
+def dumpScan(scan_list, output_file):
+    with open(output_file, 'w', newline='') as fileToWrite:
+        writer = csv.writer(fileToWrite)
+        writer.writerow(SCAN_HEADER)
+        writer.writerows(scan_list)
+    logging.info("Scan results saved to %s", output_file)
+
+if __name__ == '__main__':
+    forensic_logging.setupForensicLogging('forensics.log')
+    import sys
+    corpus_rows, _ = scanCorpus(sys.argv[1] if len(sys.argv) > 1 else '../FSE2021_REPOS/')
+    dumpScan(corpus_rows, 'SCAN_OUTPUT.csv')
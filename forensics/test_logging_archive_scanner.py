@@ -0,0 +1,74 @@
+import sys
+import os
+import io
+import tarfile
+import zipfile
+import tempfile
+import shutil
+
+# Add current folder (forensics) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import mining
+import archive_scanner
+
+work_dir = tempfile.mkdtemp(prefix='archive_scanner_test_')
+members = {
+    'repoA/train.py': "import torch\nx = get_loader(path)\n",
+    'repoA/README.md': "get_loader(path)\n",
+    'repoB/pkg/load.py': "import tensorflow as tf\ny = frombuffer(buf)\nz = 1",
+    # utf-8 with a BOM, as some editors save it
+    'repoC/encoded.py': "\ufeffdonn\u00e9es = get_loader(path)\nimport \u212aeras\n",  # KELVIN SIGN lowers to k
+}
+
+# ---------------------------------------
+# Build tar.gz and zip snapshots in memory
+# ---------------------------------------
+tar_path = os.path.join(work_dir, 'snapshot.tar.gz')
+with tarfile.open(tar_path, 'w:gz') as tar_:
+    for name_, text_ in members.items():
+        data_ = text_.encode()
+        info_ = tarfile.TarInfo(name_)
+        info_.size = len(data_)
+        tar_.addfile(info_, io.BytesIO(data_))
+
+zip_path = os.path.join(work_dir, 'snapshot.zip')
+with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_:
+    for name_, text_ in members.items():
+        zip_.writestr(name_, text_)
+
+for archive_path in (tar_path, zip_path):
+    print(f"\n--- Scanning {os.path.basename(archive_path)} ---")
+    rows = archive_scanner.scanArchive(archive_path)
+    for row_ in rows:
+        print(row_)
+    assert [row_[1] for row_ in rows] == [os.path.join(archive_path, 'repoA/train.py'),
+                                         os.path.join(archive_path, 'repoB/pkg/load.py'),
+                                         os.path.join(archive_path, 'repoC/encoded.py')]
+    assert [row_[0] for row_ in rows] == [os.path.join(archive_path, 'repoA'),
+                                         os.path.join(archive_path, 'repoB'),
+                                         os.path.join(archive_path, 'repoC')]
+    assert [row_[2] for row_ in rows] == [2, 3, 2]  # SLOC
+    assert [row_[3] for row_ in rows] == [1, 1, 1]  # DATA_LOAD_COUNT
+
+    assert dict(archive_scanner.iterArchiveFiles(archive_path))['repoC/encoded.py'] == "donn\u00e9es = get_loader(path)\nimport \u212aeras\n"
+
+    patterns = archive_scanner.checkArchivePatterns(archive_path)
+    print("Pattern usage:", patterns)
+    assert patterns > 0
+
+# the same files on disk count the same patterns as in the archives
+disk_dir = tempfile.mkdtemp(prefix='archive_scanner_disk_')
+for name_, text_ in members.items():
+    os.makedirs(os.path.join(disk_dir, os.path.dirname(name_)), exist_ok=True)
+    with open(os.path.join(disk_dir, name_), 'wb') as f:
+        f.write(text_.encode())
+assert mining.checkPythonFile(disk_dir) == archive_scanner.checkArchivePatterns(tar_path) == archive_scanner.checkArchivePatterns(zip_path)
+assert mining.checkPythonSource(members['repoC/encoded.py'], 'encoded.py') == 1
+shutil.rmtree(disk_dir)
+
+# nothing may have been extracted next to the archives
+assert sorted(os.listdir(work_dir)) == ['snapshot.tar.gz', 'snapshot.zip']
+
+shutil.rmtree(work_dir)
+print("\n=== All archive_scanner tests completed ===")
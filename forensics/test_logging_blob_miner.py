@@ -0,0 +1,110 @@
+import sys
+import os
+import subprocess
+import json
+import tempfile
+import shutil
+
+# Add current folder (forensics) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import blob_miner
+
+def git(repo_dir, *args):
+    subprocess.check_output(['git', '-C', repo_dir, '-c', 'user.name=ci', '-c', 'user.email=ci@example.com'] + list(args))
+
+# ---------------------------------------
+# Build a small repo with three commits
+# ---------------------------------------
+repo_dir = tempfile.mkdtemp(prefix='blob_miner_test_')
+git(repo_dir, 'init', '-q', '-b', 'master')
+
+with open(os.path.join(repo_dir, 'train.py'), 'w') as f:
+    f.write("import torch\nx = get_loader(path)\n")
+with open(os.path.join(repo_dir, 'util.py'), 'w') as f:
+    f.write("def helper():\n    return 1\n")
+git(repo_dir, 'add', '.')
+git(repo_dir, 'commit', '-q', '-m', 'first')
+
+with open(os.path.join(repo_dir, 'README.md'), 'w') as f:
+    f.write("not python\n")
+git(repo_dir, 'add', '.')
+git(repo_dir, 'commit', '-q', '-m', 'second')
+
+with open(os.path.join(repo_dir, 'train.py'), 'a') as f:
+    f.write("y = get_loader(other)\nz = frombuffer(buf)\n")
+git(repo_dir, 'add', '.')
+git(repo_dir, 'commit', '-q', '-m', 'third')
+
+# ---------------------------------------
+# Blob enumeration and cat-file reads
+# ---------------------------------------
+print("\n--- Python blobs at HEAD ---")
+blobs = blob_miner.listPythonBlobs(repo_dir, 'HEAD')
+for path_, blob_id in blobs:
+    print(f"{path_}: {blob_id}")
+assert sorted(p_ for p_, _ in blobs) == ['train.py', 'util.py']
+
+cat_proc = blob_miner.openCatFileBatch(repo_dir)
+content = blob_miner.readBlob(cat_proc, dict(blobs)['util.py'])
+missing = blob_miner.readBlob(cat_proc, '0' * 40)
+blob_miner.closeCatFileBatch(cat_proc)
+print("util.py content:", content)
+assert content == b"def helper():\n    return 1\n"
+assert missing is None
+
+# ---------------------------------------
+# Per-commit event totals
+# ---------------------------------------
+print("\n--- History events ---")
+history = blob_miner.mineHistoryEvents(repo_dir, 'master')
+for row_ in history:
+    print(row_)
+assert len(history) == 3
+assert [row_[2] for row_ in history] == [2, 2, 2]
+assert [row_[3] for row_ in history] == [1, 1, 3]  # DATA_LOAD_COUNT
+
+# a utf-8 BOM is dropped, bytes that are not utf-8 still decode as latin-1
+print("\n--- Blob decoding ---")
+cat_proc = blob_miner.openCatFileBatch(repo_dir)
+for content_ in (b"\xef\xbb\xbfdonn\xc3\xa9es = get_loader(path)\n", b"# caf\xe9\nx = get_loader(path)\n"):
+    blob_id = subprocess.run(['git', '-C', repo_dir, 'hash-object', '-w', '--stdin'], input=content_,
+                             capture_output=True, check=True).stdout.decode().strip()
+    assert blob_miner.getBlobEventCounts(cat_proc, blob_id, 'encoded.py', {})['DATA_LOAD_COUNT'] == 1
+blob_miner.closeCatFileBatch(cat_proc)
+
+output_csv = os.path.join(repo_dir, 'history.csv')
+blob_miner.dumpHistoryEvents(history, output_csv)
+print(open(output_csv).read())
+
+# ---------------------------------------
+# HEAD scan of a bare mirror (incl. notebooks)
+# ---------------------------------------
+print("\n--- Mirror HEAD scan ---")
+notebook = {
+    "cells": [
+        {"cell_type": "markdown", "source": ["# x = get_loader(a)\n"]},
+        {"cell_type": "code", "source": ["%matplotlib inline\n", "w = get_loader(path)"]},
+    ]
+}
+with open(os.path.join(repo_dir, 'explore.ipynb'), 'w') as f:
+    json.dump(notebook, f)
+with open(os.path.join(repo_dir, 'encoded.py'), 'wb') as f:
+    f.write(b"\xef\xbb\xbfdonn\xc3\xa9es = get_loader(path)\n")
+git(repo_dir, 'add', '.')
+git(repo_dir, 'commit', '-q', '-m', 'fourth')
+
+mirror_dir = repo_dir + '.git'
+subprocess.check_output(['git', 'clone', '--mirror', '--quiet', repo_dir, mirror_dir])
+scan_results = blob_miner.scanMirrorHead(mirror_dir)
+for path_, counts in sorted(scan_results.items()):
+    print(path_, counts['TOTAL_EVENT_COUNT'])
+assert sorted(scan_results) == ['encoded.py', 'explore.ipynb', 'train.py', 'util.py']
+assert dict(blob_miner.iterHeadFiles(mirror_dir))['encoded.py'] == "donn\u00e9es = get_loader(path)\n"
+assert scan_results['encoded.py']['DATA_LOAD_COUNT'] == 1
+assert scan_results['explore.ipynb']['DATA_LOAD_COUNT'] == 1
+assert scan_results['train.py']['DATA_LOAD_COUNT'] == 3
+
+shutil.rmtree(mirror_dir)
+shutil.rmtree(repo_dir)
+print("\n=== All blob_miner tests completed ===")
@@ -0,0 +1,49 @@
+import sys
+import os
+import json
+import tempfile
+import shutil
+
+# Add current folder (forensics) and the repo root (ci_runner) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ast
+import py_parser
+import ci_runner
+
+print("\n--- Imports extracted from the AST ---")
+tree = ast.parse("import os, torch.nn as nn\nfrom pandas import DataFrame\nfrom . import sibling\n"
+                 "def f():\n    import lint_engine\n")
+assert py_parser.getImportedModules(tree) == ['os', 'torch.nn', 'pandas', 'lint_engine']
+
+print("\n--- Import graph, built and then read from the cache ---")
+cache_dir = tempfile.mkdtemp(prefix='ci_cache_')
+cache_file = os.path.join(cache_dir, 'import_graph.json')
+graph = ci_runner.build_import_graph(cache_file)
+assert 'forensics/lint_engine.py' in graph['forensics/scanner.py']
+assert 'forensics/py_parser.py' in graph['forensics/lint_engine.py']
+assert 'fuzz_engine.py' in graph['forensics/test_logging_fuzz_engine.py']
+cached = json.load(open(cache_file))
+assert 0 < len(cached) <= len(graph)   # identical files share an entry
+assert ci_runner.build_import_graph(cache_file) == graph
+
+print("\n--- Tests selected for a change ---")
+closure = ci_runner.get_import_closure('forensics/test_logging_scan_pool.py', graph)
+assert 'forensics/py_parser.py' in closure and 'fuzz_engine.py' not in closure
+selected, reason = ci_runner.select_tests(ci_runner.tests, ['forensics/log_analyzer.py', 'README.md'], graph)
+print(selected, reason)
+assert selected == ['forensics/test_logging_log_analyzer.py']
+selected, _ = ci_runner.select_tests(ci_runner.tests, ['forensics/py_parser.py'], graph)
+assert 'forensics/test_logging_py_parser.py' in selected and 'forensics/test_logging_scan_pool.py' in selected
+assert 'forensics/test_logging_log_analyzer.py' not in selected
+selected, _ = ci_runner.select_tests(ci_runner.tests, ['forensics/test_logging_mining.py'], graph)
+assert selected == ['forensics/test_logging_mining.py']
+assert ci_runner.select_tests(ci_runner.tests, ['README.md'], graph)[0] == []
+for full_run in (['forensics/constants.py'], ['forensics/test_file.txt'], None):
+    selected, reason = ci_runner.select_tests(ci_runner.tests, full_run, graph)
+    print(reason)
+    assert selected == ci_runner.tests
+
+shutil.rmtree(cache_dir)
+print("\nci_runner selection checks passed")
@@ -0,0 +1,59 @@
+import sys
+import os
+import tempfile
+import shutil
+
+# Add current folder (forensics) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import content_store
+
+work_dir = tempfile.mkdtemp(prefix='content_store_test_')
+repo_root = os.path.join(work_dir, 'REPOS')
+store_dir = os.path.join(work_dir, 'STORE')
+shared = "import torch\nx = torch.load(path)\n" * 50
+files = {
+    'owner@repoA/lib/model.py': shared,
+    'owner@repoA/run.py': "print('run')\n",
+    'fork@repoA/lib/model.py': shared,
+    'other@repoC/model.py': shared,
+    'other@repoC/data.csv': shared,
+}
+for rel_path, text_ in files.items():
+    full_path = os.path.join(repo_root, rel_path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'w') as f:
+        f.write(text_)
+
+def tree_contents():
+    contents = {}
+    for root_, _, names_ in os.walk(repo_root):
+        for name_ in names_:
+            full_path = os.path.join(root_, name_)
+            contents[full_path] = open(full_path).read()
+    return contents
+
+before = tree_contents()
+
+print("\n--- Compacting ---")
+stats = content_store.compactRepos(repo_root, store_dir)
+print("Stats:", stats)
+assert stats == {'FILES': 4, 'LINKED': 2, 'STORED': 2, 'BYTES_RECLAIMED': 2 * len(shared)}
+assert tree_contents() == before
+model_paths = [os.path.join(repo_root, p_) for p_ in files if p_.endswith('model.py')]
+assert len({os.stat(p_).st_ino for p_ in model_paths}) == 1
+assert os.stat(os.path.join(repo_root, 'other@repoC/data.csv')).st_nlink == 1
+
+print("\n--- Compacting again is a no-op ---")
+again = content_store.compactRepos(repo_root, store_dir)
+assert again['LINKED'] == 0 and again['BYTES_RECLAIMED'] == 0
+
+print("\n--- Expanding ---")
+for repo_ in os.listdir(repo_root):
+    content_store.expandRepo(os.path.join(repo_root, repo_))
+assert tree_contents() == before
+assert all(os.stat(p_).st_nlink == 1 for p_ in model_paths)
+assert content_store.pruneStore(store_dir) == 2
+
+shutil.rmtree(work_dir)
+print("\n=== All content_store tests completed ===")
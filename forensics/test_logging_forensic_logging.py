@@ -0,0 +1,54 @@
+import sys
+import os
+import logging
+import tempfile
+import shutil
+
+# Add current folder (forensics) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import forensic_logging
+import py_parser
+
+work_dir = tempfile.mkdtemp(prefix='forensic_logging_test_')
+log_file = os.path.join(work_dir, 'forensics_test.log')
+
+print("=== Testing queue-backed setup ===")
+listener = forensic_logging.setupForensicLogging(log_file)
+assert listener is not None
+root_handlers = logging.getLogger().handlers
+assert len(root_handlers) == 1 and isinstance(root_handlers[0], logging.handlers.QueueHandler)
+logging.info("Queue logging for %s", 'setup')
+
+print("\n=== Testing per-call-site sampling ===")
+forensic_logging.resetSampling()
+for i in range(2500):
+    forensic_logging.logSampled(logging.INFO, "Hot site A hit %s", i)
+for i in range(5):
+    forensic_logging.logSampled(logging.INFO, "Hot site B hit %s", i)
+print("Site counts:", forensic_logging.SITE_COUNTS)
+assert forensic_logging.SITE_COUNTS == {"Hot site A hit %s": 2500, "Hot site B hit %s": 5}
+
+print("\n=== Testing hot-path logging in py_parser ===")
+tree = py_parser.getPythonParseObject(os.path.join(os.path.dirname(__file__), 'py_parser.py'))
+py_parser.getFunctionAssignments(tree)
+
+print("\n=== Testing lazy formatting below the level ===")
+class Exploding:
+    def __str__(self):
+        raise AssertionError("formatted although filtered out")
+logging.debug("Never formatted: %s", Exploding())
+
+forensic_logging.stopForensicLogging()
+lines = open(log_file).read().splitlines()
+site_a = [l_ for l_ in lines if 'Hot site A' in l_]
+site_b = [l_ for l_ in lines if 'Hot site B' in l_]
+print(f"Site A lines: {len(site_a)}, site B lines: {len(site_b)}")
+expected_a = forensic_logging.HOT_PATH_BURST + 2500 // forensic_logging.HOT_PATH_SAMPLE_EVERY
+assert len(site_a) == expected_a
+assert len(site_b) == 5
+assert any('Queue logging for setup' in l_ for l_ in lines)
+assert any('Found assignment at line' in l_ for l_ in lines) == forensic_logging.HOT_PATH_LOGGING
+
+shutil.rmtree(work_dir)
+print("\n=== All forensic_logging tests completed ===")
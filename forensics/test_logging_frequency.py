@@ -5,22 +5,15 @@ import sys
 #import os
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 import frequency
+import forensic_logging
 
 
 # -----------------------------
 # Setup dedicated logger
 # -----------------------------
-logger = logging.getLogger('frequency_logger')
-logger.setLevel(logging.INFO)
-
 log_file = 'forensics_frequency.log'
-fh = logging.FileHandler(log_file)
-fh.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-fh.setFormatter(formatter)
-
-if not logger.hasHandlers():
-    logger.addHandler(fh)
+forensic_logging.setupForensicLogging(log_file)
+logger = logging.getLogger('frequency_logger')
 
 print("=== Testing giveTimeStamp ===")
 ts = frequency.giveTimeStamp()
@@ -0,0 +1,92 @@
+import sys
+import os
+import tempfile
+import shutil
+
+# Add current folder (forensics) and the repo root (fuzz_engine) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ast
+import random
+import fuzz_engine
+import fuzz_grammar
+import fuzz_perf
+import py_parser
+
+def target_parser(source):
+    tree = py_parser.getPythonParseObjectFromSource(source, '<fuzz>.py')
+    py_parser.getPythonAttributeFuncs(tree)
+
+def target_crash(source):
+    if 'torch' in source:
+        raise KeyError('torch')
+
+out_dir = tempfile.mkdtemp(prefix='fuzz_engine_test_')
+
+print("\n--- Mutation stays bounded ---")
+corpus = ["x = torch.load(path)\n", "import logging\nlogging.info(x)\n"]
+for _ in range(200):
+    child = fuzz_engine.mutateSource(corpus[0] * 500, corpus, ['env.step(a)', 'torch.'])
+    assert len(child) <= fuzz_engine.MAX_INPUT_SIZE
+
+print("\n--- Single worker run ---")
+merged = fuzz_engine.runFuzzer([('parser', target_parser), ('crash', target_crash)], corpus,
+                               [os.path.dirname(os.path.abspath(__file__))], out_dir,
+                               workers=1, seconds=30, dictionary=['torch.load(x)', 'a, b = c'], max_execs=300)
+print(fuzz_engine.formatReport(merged))
+assert merged['EXECS'] == 300
+assert any(file_.endswith('py_parser.py') for file_, _ in merged['COVERED'])
+crash_targets = [crash_['TARGET'] for crash_ in merged['CRASHES'].values()]
+assert crash_targets == ['crash'], crash_targets
+crash_ = next(iter(merged['CRASHES'].values()))
+assert crash_['COUNT'] > 1 and os.path.exists(crash_['FILE'])
+assert merged['CORPUS'] >= len(corpus)
+
+print("\n--- Grammar generator ---")
+random.seed(7)
+generator = fuzz_grammar.GrammarGenerator(['torch', 'load', 'env', 'step', 'class'])
+assert 'class' not in generator.vocab
+sources = [generator() for _ in range(300)]
+for source in sources:
+    compile(source, '<generated>', 'exec')
+assert any('torch.load(' in source for source in sources)
+assert any(isinstance(node_, ast.Tuple) and isinstance(node_.ctx, ast.Store)
+           for source in sources for node_ in ast.walk(ast.parse(source)))
+assert any('f\'' in source for source in sources)
+attrib_calls = sum(len(py_parser.getPythonAttributeFuncs(ast.parse(source))) for source in sources)
+print("Attribute calls in 300 generated modules:", attrib_calls)
+assert attrib_calls > 300
+
+merged = fuzz_engine.runFuzzer([('parser', target_parser)], corpus, [os.path.dirname(os.path.abspath(__file__))],
+                               out_dir, workers=1, seconds=30, max_execs=100, generator=generator, generate_ratio=1)
+print(fuzz_engine.formatReport(merged))
+assert merged['EXECS'] == 100 and not merged['CRASHES']
+
+print("\n--- Performance mode ---")
+def target_quadratic(source):
+    rows_ = source.count('\n')
+    total_ = 0
+    for i_ in range(rows_ * rows_):
+        total_ += i_
+
+def target_linear(source):
+    return sorted(source.split('\n'))
+
+def target_deep(source):
+    if source.count('.') > 300:
+        raise RecursionError('too deep')
+
+perf_dir = os.path.join(out_dir, 'slow')
+results = fuzz_perf.runPerfFuzz([('quadratic', target_quadratic), ('linear', target_linear), ('deep', target_deep)], perf_dir,
+                                time_budget=0.5, start_n=64, max_n=2048, axes=['literal_table', 'nested_attributes'])
+print(fuzz_perf.formatPerfReport(results))
+by_key = {(r_['TARGET'], r_['AXIS']): r_ for r_ in results}
+assert by_key[('quadratic', 'literal_table')]['FLAGGED'] and by_key[('quadratic', 'literal_table')]['EXPONENT'] > 1.5
+assert not by_key[('linear', 'literal_table')]['FLAGGED']
+deep_ = by_key[('deep', 'nested_attributes')]
+assert deep_['FLAGGED'] and deep_['MIN_SIZE'] == 301, deep_['MIN_SIZE']
+assert os.path.exists(deep_['REPRODUCER']) and os.path.exists(os.path.join(perf_dir, 'perf_report.json'))
+
+shutil.rmtree(out_dir)
+print("\n=== All fuzz_engine tests completed ===")
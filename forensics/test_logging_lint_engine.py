@@ -0,0 +1,64 @@
+import sys
+import os
+
+# Add current folder (forensics) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import lint_engine
+import py_parser
+import forensic_logging
+
+forensic_logging.setupForensicLogging('forensics.log')
+
+print("\n--- Rules match through import aliases ---")
+aliased = (
+    "import torch as T\n"
+    "import numpy\n"
+    "import gym as G\n"
+    "from pickle import load\n"
+    "from PIL import Image\n"
+    "m = T.load(path)\n"
+    "d = numpy.load(f)\n"
+    "e = load(fh)\n"
+    "env = G.make('CartPole-v1')\n"
+    "img = Image.open(path)\n"
+)
+tree = py_parser.getPythonParseObjectFromSource(aliased, 'aliased.py')
+rule_funcs = lint_engine.getRuleAttributeFuncs(tree)
+print(rule_funcs)
+# only aliases of the rule modules are renamed: Image keeps the name its rule uses
+assert [(c_, f_, l_) for c_, f_, l_, _ in rule_funcs] == [('torch', 'load', 6), ('np', 'load', 7), ('gym', 'make', 9),
+                                                         ('Image', 'open', 10), ('pickle', 'load', 8)]
+assert lint_engine.getRuleAttributeFuncs(tree) is rule_funcs
+
+counts = lint_engine.getEventCounts('aliased.py', aliased)
+print(counts)
+plain = lint_engine.getEventCounts('plain.py', aliased.replace('T.load', 'torch.load').replace('numpy.load', 'np.load')
+                                   .replace('G.make', 'gym.make').replace('e = load(fh)', 'e = pickle.load(fh)'))
+print(plain)
+assert counts == plain
+assert counts['ENVIRONMENT_COUNT'] == 1
+assert lint_engine.getDNNImportStatus(tree)
+
+print("\n--- Every detector runs ---")
+import logging
+detector_errors = []
+class ErrorCollector(logging.Handler):
+    def emit(self, record):
+        detector_errors.append(record.getMessage())
+collector = ErrorCollector(logging.ERROR)
+logging.getLogger().addHandler(collector)
+labelled = (
+    "import numpy as np\n"
+    "train_labels, test_labels = load_data_and_labels(path)\n"
+    "labels = [sent for sent in input_batch_list]\n"
+    "model = load_checkpoint(ckpt)\n"
+)
+counts = lint_engine.getEventCounts('labelled.py', labelled)
+py_parser.cachePythonSource('labelled.py', labelled)
+assert lint_engine.getExcepts('labelled.py') is False
+py_parser.evictPythonSource('labelled.py')
+logging.getLogger().removeHandler(collector)
+print(counts, detector_errors)
+assert detector_errors == []
+assert counts['MODEL_LABEL_COUNT'] == 3 and counts['MODEL_LOAD_COUNT'] == 1
@@ -0,0 +1,59 @@
+import sys
+import os
+import tempfile
+import shutil
+
+# Add current folder (forensics) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import log_analyzer
+
+work_dir = tempfile.mkdtemp(prefix='log_analyzer_test_')
+mining_log = os.path.join(work_dir, 'forensics_mining.log')
+frequency_log = os.path.join(work_dir, 'forensics_frequency.log')
+empty_log = os.path.join(work_dir, 'forensics.log')
+with open(mining_log, 'w') as f:
+    f.write(
+        "2025-11-24 16:00:00,000 - INFO - Processing repo 1: https://github.com/a/b\n"
+        "2025-11-24 16:00:00,100 - INFO - Cloning repo https://github.com/a/b into ../REPOS/a@b\n"
+        "2025-11-24 16:00:02,100 - INFO - Successfully cloned https://github.com/a/b\n"
+        "2025-11-24 16:00:03,000 - INFO - Completed repo 1: https://github.com/a/b, flag=True\n"
+        "2025-11-24 17:00:00,000 - INFO - Processing repo 2: https://github.com/c/d\n"
+        "2025-11-24 17:00:00,000 - INFO - Cloning repo https://github.com/c/d into ../REPOS/c@d\n"
+        "2025-11-24 17:00:01,000 - ERROR - Trouble cloning repo https://github.com/c/d: exit 128\n"
+        "Traceback line without a timestamp\n"
+        "2025-11-24 17:00:01,500 - INFO - Completed repo 2: https://github.com/c/d, flag=False\n"
+        "2025-11-24 17:00:02,000 - ERROR - Failed deleting ../REPOS/c@d: gone\n"
+    )
+with open(frequency_log, 'w') as f:
+    f.write(
+        "2025-11-24 18:00:00,000 - INFO - Calculating total SLOC from dataframe\n"
+        "2025-11-24 18:00:00,250 - INFO - Total SLOC calculated: 42\n"
+    )
+open(empty_log, 'w').close()
+
+print("\n--- Analyzing logs ---")
+stats = log_analyzer.analyzeLogs([mining_log, frequency_log, empty_log])
+rows = {row_[0]: row_ for row_ in log_analyzer.getLatencyRows(stats)}
+for row_ in rows.values():
+    print(row_)
+
+assert rows['mining.cloneRepo'][1:] == (1, 2000.0, 2000.0, 2000.0, 2000.0, 1, 0.5)
+assert rows['mining.cloneRepos[repo]'][1] == 2
+assert rows['mining.cloneRepos[repo]'][2] == 1500.0 and rows['mining.cloneRepos[repo]'][5] == 3000.0
+assert rows['frequency.getAllSLOC'][1:3] == (1, 250.0)
+assert rows[log_analyzer.UNATTRIBUTED_KW][6] == 1
+
+hourly = log_analyzer.getHourlyRows(stats)
+assert ('mining.cloneRepos[repo]', '2025-11-24 16', 1) in hourly
+assert ('mining.cloneRepos[repo]', '2025-11-24 17', 1) in hourly
+
+print("\n--- Writing reports ---")
+latency_file = os.path.join(work_dir, 'LOG_LATENCY.csv')
+hourly_file = os.path.join(work_dir, 'LOG_HOURLY.csv')
+log_analyzer.dumpLogReport(stats, latency_file, hourly_file)
+assert open(latency_file).readline().startswith('FUNCTION,COMPLETED,P50_MS')
+assert len(open(hourly_file).readlines()) == len(hourly) + 1
+
+shutil.rmtree(work_dir)
+print("\n=== All log_analyzer tests completed ===")
@@ -6,6 +6,9 @@ import ast
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 import py_parser  # now imports correctly
+import forensic_logging
+
+forensic_logging.setupForensicLogging('forensics.log')
 
 # Correct path to py_parser.py
 py_file_path = os.path.join(os.path.dirname(__file__), 'py_parser.py')
@@ -52,3 +55,275 @@ features = py_parser.getModelFeature(tree)
 for lhs, class_name, feature_name, line_no in features:
     print(f"Line {line_no}: {lhs} = {class_name}.{feature_name}")
 
+
+# ---------------------------------------
+# Sources nested too deep for the parser
+# ---------------------------------------
+print("\n--- Deeply Nested Source ---")
+deep_tree = py_parser.getPythonParseObjectFromSource("x = obj" + ".a" * 20000 + "\n", "deep.py")
+assert deep_tree.body == []
+
+# ---------------------------------------
+# Batched logging lookups
+# ---------------------------------------
+print("\n--- Batched logging check ---")
+logged_tree = ast.parse(
+    "import logging\n"
+    "model = torch.load(path)\n"
+    "logging.info(model)\n"
+    "logging.warning(f'loaded {path} into {model.name}')\n"
+    "logging.debug('%s items', len(batch), extra=config)\n"
+    "print(unlogged)\n"
+)
+logged = py_parser.getLoggedLines(logged_tree, ['model', 'path', 'batch', 'config', 'unlogged', 'len'])
+print(logged)
+assert logged == {'model': [3, 4], 'path': [4], 'batch': [5], 'config': [5], 'unlogged': [], 'len': [5]}
+assert py_parser.getLoggingIndex(logged_tree) is py_parser.getLoggingIndex(logged_tree)
+assert py_parser.checkLoggingPerData(logged_tree, 'model') and not py_parser.checkLoggingPerData(logged_tree, 'unlogged')
+# no `import logging`, no logged names
+assert py_parser.getLoggedLines(ast.parse("logging.info(model)\n"), ['model']) == {'model': []}
+
+# ---------------------------------------
+# Def-use flow into logging calls
+# ---------------------------------------
+print("\n--- Value flow into logging ---")
+flow_tree = ast.parse(
+    "import logging\n"                                  # 1
+    "def train(path, batch):\n"                         # 2
+    "    model = torch.load(path)\n"                    # 3
+    "    state = pickle.load(open(path))\n"             # 4
+    "    out, loss = model(batch), 0\n"                 # 5
+    "    results = []\n"                                # 6
+    "    results.append(out)\n"                         # 7
+    "    logging.info('results %s', results)\n"         # 8
+    "    with open(path) as fh:\n"                      # 9
+    "        data = fh.read()\n"                        # 10
+    "    logging.info(state.keys())\n"                  # 11
+    "class Agent:\n"                                    # 12
+    "    def act(self, obs):\n"                         # 13
+    "        self.net = torch.load(obs)\n"              # 14
+    "        logging.debug(f'{self.net.fc}')\n"         # 15
+    "x = torch.load('a')\n"                             # 16
+    "logging.info(x)\n"                                 # 17
+    "logging.info(y)\n"                                 # 18
+    "y = torch.load('b')\n"                             # 19
+)
+flows = {line_: py_parser.getValueLoggingLines(flow_tree, line_) for line_ in (3, 4, 5, 10, 14, 16, 19, 99)}
+print(flows)
+assert flows == {3: [8], 4: [11], 5: [8], 10: [], 14: [15], 16: [17], 19: [], 99: []}
+assert py_parser.getDefUseIndex(flow_tree) is py_parser.getDefUseIndex(flow_tree)
+assert [scope_['NAME'] for scope_ in py_parser.getDefUseIndex(flow_tree)['SCOPES']] == ['<module>', 'train', 'act']
+
+# ---------------------------------------
+# Import index
+# ---------------------------------------
+print("\n--- Import aliases ---")
+import tempfile
+import shutil
+repo_dir = tempfile.mkdtemp(prefix='import_index_')
+os.makedirs(os.path.join(repo_dir, '.git'))
+os.makedirs(os.path.join(repo_dir, 'pkg', 'models'))
+for rel_path in ('pkg/__init__.py', 'pkg/utils.py', 'pkg/models/__init__.py', 'pkg/models/io.py'):
+    open(os.path.join(repo_dir, rel_path), 'w').close()
+train_file = os.path.join(repo_dir, 'pkg', 'models', 'train.py')
+with open(train_file, 'w') as f:
+    f.write("import torch as T\nimport numpy as np, os.path\nfrom torch import load as L\nfrom .io import read\n"
+            "from ..utils import helper\nfrom pickle import *\ndef f():\n    import gym\n")
+import_tree = py_parser.getPythonParseObject(train_file)
+import_index = py_parser.getImportIndex(import_tree)
+print(import_index)
+assert import_index['ALIASES'] == {'T': 'torch', 'np': 'numpy', 'os': 'os', 'L': 'torch.load',
+                                   'read': 'pkg.models.io.read', 'helper': 'pkg.utils.helper', 'gym': 'gym'}
+assert 'LOCAL' not in import_index
+assert py_parser.getLocalModules(import_tree) == {'pkg.models.io', 'pkg.utils'}
+assert py_parser.getImport(import_tree) == ['torch', 'numpy', 'os', 'torch', 'pkg', 'pkg', 'pickle', 'gym']
+assert py_parser.getCanonicalName(import_tree, 'T.load') == 'torch.load'
+assert py_parser.getCanonicalName(import_tree, 'L') == 'torch.load'
+assert py_parser.getCanonicalName(import_tree, 'model.fit') == 'model.fit'
+assert py_parser.getImportIndex(import_tree) is import_index
+# one repo root lookup serves every folder below it
+assert py_parser.getRepoRoot(os.path.join(repo_dir, 'pkg', 'utils.py')) == repo_dir
+hits_ = py_parser.findRepoRoot.cache_info().hits
+assert py_parser.getRepoRoot(os.path.join(repo_dir, 'pkg', 'models', 'io.py')) == repo_dir
+assert py_parser.findRepoRoot.cache_info().hits == hits_ + 1
+assert py_parser.findRepoRoot.cache_info().maxsize == py_parser.REPO_ROOT_CACHE_SIZE
+assert py_parser.resolveRepoModule.cache_info().maxsize == py_parser.MODULE_RESOLUTION_CACHE_SIZE
+# a cwd-relative name is not resolved, even when it exists under the cwd
+cwd_ = os.getcwd()
+os.chdir(os.path.join(repo_dir, 'pkg', 'models'))
+relative_tree = py_parser.getPythonParseObjectFromSource("from .io import read\nimport io\n", 'train.py')
+assert py_parser.getImportIndex(relative_tree)['ALIASES'] == {'read': '.io.read', 'io': 'io'}
+assert py_parser.getLocalModules(relative_tree) == set()
+os.chdir(cwd_)
+# content that is not on disk keeps relative imports unresolved
+blob_tree = py_parser.getPythonParseObjectFromSource("from .io import read\n", '<blob>/train.py')
+assert py_parser.getImportIndex(blob_tree)['ALIASES'] == {'read': '.io.read'}
+shutil.rmtree(repo_dir)
+
+# ---------------------------------------
+# Fact table views
+# ---------------------------------------
+print("\n--- Fact table views ---")
+fact_tree = ast.parse(
+    "import logging\n"
+    "x_train, (y_train, labels) = load_data_and_labels(path, f'{root}/x')\n"
+    "labels = [sent for sent in input_batch_list]\n"
+    "tags = np.array([sent.tag for sent in batch])\n"
+    "size = data.batch_size\n"
+    "try:\n"
+    "    model.fit(x_train)\n"
+    "except ValueError as e:\n"
+    "    logging.error(e)\n"
+    "except:\n"
+    "    cleanup.run()\n"
+)
+multi_assignments = py_parser.getFunctionAssignmentsWithMultipleLHS(fact_tree)
+assert multi_assignments[0] == (['x_train', 'y_train', 'labels'], 'load_data_and_labels', 2, [('path', 1), ('{expr}/x', 2)])
+assert [(lhs_, f_, l_, len(a_)) for lhs_, f_, l_, a_ in multi_assignments[1:]] == [(['tags'], 'array', 4, 1)]
+assert [lhs_ for lhs_, _, _, _ in py_parser.getFunctionAssignments(fact_tree)] == ['', 'tags']
+assert py_parser.getTupAssiDetails(fact_tree) == [('labels', 'sent', 'sent', 'input_batch_list', 3), ('tags', 'sent', 'sent', 'batch', 4)]
+assert py_parser.getModelFeature(fact_tree) == [('size', 'data', 'batch_size', 5)]
+assert [f_ for f_, _, _ in py_parser.getFunctionDefinitions(fact_tree)] == ['load_data_and_labels', 'array', 'fit', 'error', 'run']
+assert py_parser.getPythonAtrributeFuncs(fact_tree) == py_parser.getPythonAttributeFuncs(fact_tree)
+excepts = py_parser.getPythonExcepts(fact_tree)
+print(excepts)
+assert [(first_, last_, type_) for first_, last_, type_, _ in excepts] == [(8, 9, 'ValueError'), (10, 11, '')]
+handler_calls = py_parser.checkAttribFuncsInExcept(excepts)
+assert [[(p_, f_) for p_, f_, _, _ in calls_] for calls_ in handler_calls] == [[('logging', 'error')], [('cleanup', 'run')]]
+assert py_parser.checkExceptLogging(handler_calls)
+assert not py_parser.checkExceptLogging(handler_calls[1:])
+assert py_parser.getFactTable(fact_tree) is py_parser.getFactTable(fact_tree)
+
+print("\n--- Lazy fact records ---")
+lazy_tree = ast.parse("torch.save(model.state_dict(), os.path.join(root, 'm.pt'))\nself.net.load(ckpt)\nfactory()(x)\n")
+lazy_table = py_parser.getFactTable(lazy_tree)
+assert [(p_, f_) for p_, f_, _, _ in py_parser.getPythonAttributeFuncs(lazy_tree)] == [
+    ('torch', 'save'), ('model', 'state_dict'), ('', 'join'), ('', 'load')]
+assert [f_ for f_, _, _ in py_parser.getFunctionDefinitions(lazy_tree)] == ['save', 'state_dict', 'join', 'load', '', 'factory']
+save_args = py_parser.getFunctionDefinitions(lazy_tree)[0][2]
+# counting arguments renders nothing; reading one renders just that one
+assert len(save_args) == 2 and all(lazy_table['DEFERRED'])
+assert save_args[1] == ("os.path.join(root, 'm.pt')", 2)
+assert lazy_table['DEFERRED'][0] is not None and lazy_table['DEFERRED'][1] is None
+assert list(save_args) == [('model.state_dict()', 1), ("os.path.join(root, 'm.pt')", 2)]
+
+print("\n--- Except handler index ---")
+handler_tree = ast.parse(
+    "import logging\n"                   # 1
+    "try:\n"                             # 2
+    "    model.fit(x)\n"                 # 3
+    "except ValueError:\n"               # 4
+    "    try:\n"                         # 5
+    "        cache.clear()\n"            # 6
+    "    except OSError:\n"              # 7
+    "        logging.warning('cache')\n" # 8
+    "    cleanup.run()\n"                # 9
+    "except (KeyError, IndexError):\n"   # 10
+    "    pass\n"                         # 11
+    "def step():\n"                      # 12
+    "    try:\n"                         # 13
+    "        env.step(a)\n"              # 14
+    "    except Exception as e:\n"       # 15
+    "        log.error(e)\n"             # 16
+)
+except_index = py_parser.getExceptIndex(handler_tree)
+assert list(except_index['STARTS']) == [4, 7, 10, 15] and list(except_index['PARENTS']) == [-1, 0, -1, -1]
+assert [[py_parser.getFactTable(handler_tree)['LINE'][c_] for c_ in b_] for b_ in except_index['BUCKETS']] == [[9, 6], [8], [], [16]]
+assert list(except_index['LOGS']) == [1, 1, 0, 0]
+assert py_parser.getUnloggedExcepts(handler_tree) == [(10, 11, ''), (15, 16, 'Exception')]
+assert py_parser.getExceptLoggingCounts(handler_tree) == (2, 4)
+assert py_parser.getExceptLoggingRatio(handler_tree) == 0.5
+assert py_parser.getExceptLoggingRatio(ast.parse("x = 1\n")) == 0.0
+excepts = py_parser.getPythonExcepts(handler_tree)
+assert [(l_, [c_[2] for c_ in calls_]) for l_, _, _, calls_ in excepts] == [(4, [9, 6, 8]), (7, [8]), (10, []), (15, [16])]
+assert py_parser.checkExceptLogging(py_parser.checkAttribFuncsInExcept(excepts))
+
+print("\n--- Incremental parsing ---")
+version_one = (
+    "# header\n"
+    "import logging\n"
+    "import torch\n"
+    "@decorator\n"
+    "def load(path):\n"
+    "    model = torch.load(path)\n"
+    "    return model\n"
+    "DOC = '''\n"
+    "x = 1\n"
+    "'''\n"
+    "CONFIG = dict(a=1,\n"
+    "b=2)\n"
+    "TOTAL = 1 + \\\n"
+    "2\n"
+    "if CONFIG:\n"
+    "    pass\n"
+    "else:\n"
+    "    logging.info(CONFIG)\n"
+)
+segments = py_parser.getTopLevelSegments(version_one)
+print([first_ for first_, _ in segments])
+assert [first_ for first_, _ in segments] == [1, 3, 4, 8, 11, 13, 15]
+assert ''.join(text_ for _, text_ in segments) == version_one
+version_two = version_one.replace("import torch\n", "import torch\nimport numpy as np\n\n").replace("    return model\n", "    np.save(path, model)\n    return model\n")
+
+def getViews(tree_, source_):
+    # every query, line-aware ones asked for each line of the source
+    line_count = source_.count('\n') + 1
+    names_ = sorted({name_ for _, _, _, args_ in py_parser.getPythonAttributeFuncs(tree_) for name_, _ in args_})
+    return repr([py_parser.getFunctionAssignments(tree_), py_parser.getFunctionAssignmentsWithMultipleLHS(tree_),
+                 py_parser.getFunctionDefinitions(tree_), py_parser.getPythonAttributeFuncs(tree_), py_parser.getModelFeature(tree_),
+                 py_parser.getTupAssiDetails(tree_), py_parser.getPythonExcepts(tree_), py_parser.getUnloggedExcepts(tree_),
+                 py_parser.getExceptLoggingCounts(tree_), py_parser.getImportIndex(tree_), py_parser.getImport(tree_),
+                 py_parser.getImportedNameCalls(tree_), py_parser.getImportedModules(tree_), py_parser.getLoggingIndex(tree_),
+                 py_parser.getLoggedLines(tree_, names_), [py_parser.getValueLoggingLines(tree_, line_) for line_ in range(1, line_count + 1)],
+                 sorted(scope_['NAME'] for scope_ in py_parser.getDefUseIndex(tree_)['SCOPES'])])
+
+py_parser.getPythonParseObjectIncremental(version_one, 'versions.py')
+cached_segments = len(py_parser.SEGMENT_CACHE)
+incremental_tree = py_parser.getPythonParseObjectIncremental(version_two, 'versions.py')
+# only the new import line and the edited function were parsed
+assert len(py_parser.SEGMENT_CACHE) == cached_segments + 2
+assert getViews(incremental_tree, version_two) == getViews(ast.parse(version_two), version_two)
+# value flow across segments and inside a reused function, at file line numbers
+flow_source = "import logging\nx = 1\n\ndef f():\n    m = torch.load(p)\n    logging.info(m)\nlogging.info(x)\n"
+py_parser.getPythonParseObjectIncremental(flow_source.replace("x = 1", "x = 0"), 'flow.py')
+flow_tree = py_parser.getPythonParseObjectIncremental("# moved\n" + flow_source, 'flow.py')
+assert py_parser.getValueLoggingLines(flow_tree, 6) == [7] and py_parser.getValueLoggingLines(flow_tree, 3) == [8]
+assert getViews(flow_tree, "# moved\n" + flow_source) == getViews(ast.parse("# moved\n" + flow_source), "# moved\n" + flow_source)
+assert [l_ for _, _, l_, _ in py_parser.getPythonAttributeFuncs(incremental_tree)] == [8, 9, 21]
+assert py_parser.getLoggedLines(incremental_tree, ['CONFIG']) == {'CONFIG': [21]}
+assert py_parser.getTopLevelSegments("x = 1\nelse_ = 2\n")[1] == (2, "else_ = 2\n")
+# a segment that does not parse on its own falls back to a full parse, which recovers what it can
+fallback_tree = py_parser.getPythonParseObjectIncremental("def f():\n    pass\n\nx = (1 +\n", 'broken.py')
+assert [type(stmt_).__name__ for stmt_ in fallback_tree.body] == ['FunctionDef']
+
+print("\n--- Syntax error recovery ---")
+python2_source = (
+    "import logging\n"                        # 1
+    "import torch\n"                          # 2
+    "print 'loading'\n"                       # 3
+    "def load(path):\n"                       # 4
+    "    print 'model from', path\n"          # 5
+    "    return torch.load(path)\n"           # 6
+    "\n"                                      # 7
+    "model = torch.load(PATH)\n"              # 8
+    "try:\n"                                  # 9
+    "    env.step(model)\n"                   # 10
+    "except ValueError, e:\n"                 # 11
+    "    logging.error(e)\n"                  # 12
+    "data = pickle.load(f)\n"                 # 13
+)
+recovered_tree = py_parser.getPythonParseObjectFromSource(python2_source, 'python2.py')
+recovery = py_parser.getRecoveryStats(recovered_tree)
+print(recovery)
+assert recovery == {'RECOVERED_LINES': 4, 'LOST_LINES': 9, 'LOST_SEGMENTS': [(3, 3), (4, 7), (9, 12)]}
+assert [(p_, f_, l_) for p_, f_, l_, _ in py_parser.getPythonAttributeFuncs(recovered_tree)] == [('torch', 'load', 8), ('pickle', 'load', 13)]
+assert py_parser.getImport(recovered_tree) == ['logging', 'torch']
+# value flow in the recovered segments is reported at file line numbers
+flow_source = "import logging\nx = 1\n\ndef f():\n    m = torch.load(p)\n    logging.info(m)\nprint \"py2\"\n"
+flow_tree = py_parser.getPythonParseObjectFromSource(flow_source, 'flow2.py')
+assert py_parser.getRecoveryStats(flow_tree)['LOST_SEGMENTS'] == [(7, 7)]
+assert [py_parser.getValueLoggingLines(flow_tree, line_) for line_ in range(1, 8)] == [[], [], [], [], [6], [], []]
+assert sorted(py_parser.getDefUseIndex(flow_tree)['LINE_SCOPES']) == [2, 5]
+assert py_parser.getRecoveryStats(py_parser.getPythonParseObjectFromSource(version_two, 'versions.py')) is None
+# the nesting guard still holds, with every line accounted for
+assert py_parser.getRecoveryStats(deep_tree) == {'RECOVERED_LINES': 0, 'LOST_LINES': 1, 'LOST_SEGMENTS': [(1, 1)]}
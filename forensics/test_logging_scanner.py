@@ -0,0 +1,62 @@
+import sys
+import os
+import tempfile
+import shutil
+
+# Add current folder (forensics) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import scanner
+
+# ---------------------------------------
+# Corpus of three repos sharing a vendored file
+# ---------------------------------------
+corpus_dir = tempfile.mkdtemp(prefix='scanner_test_')
+vendored = "import torch\nx = get_loader(path)\ny = frombuffer(buf)\n"
+files = {
+    'owner@repoA/vendor/loader.py': vendored,
+    'owner@repoA/main.py': "print('a')\n",
+    'owner@repoB/third_party/loader.py': vendored,
+    'fork@repoA/vendor/loader.py': vendored,
+    'fork@repoA/main.py': "print('a')\n",
+    'fork@repoA/notes.txt': vendored,
+}
+for rel_path, text_ in files.items():
+    full_path = os.path.join(corpus_dir, rel_path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'w') as f:
+        f.write(text_)
+
+print("\n--- Corpus scan ---")
+rows, stats = scanner.scanCorpus(corpus_dir)
+for row_ in rows:
+    print(row_)
+print("Dedup stats:", stats)
+
+assert len(rows) == 5
+assert stats == {'FILES': 5, 'DISTINCT_CONTENTS': 2, 'DUPLICATE_FILES': 3, 'DUPLICATE_SLOC': 7}
+loader_rows = [row_ for row_ in rows if row_[1].endswith('loader.py')]
+assert len(loader_rows) == 3
+assert all(row_[2:] == loader_rows[0][2:] for row_ in loader_rows)
+assert loader_rows[0][3] == 2  # DATA_LOAD_COUNT
+assert {row_[0] for row_ in rows} == {os.path.join(corpus_dir, r_) for r_ in ('owner@repoA', 'owner@repoB', 'fork@repoA')}
+
+output_csv = os.path.join(corpus_dir, 'scan.csv')
+scanner.dumpScan(rows, output_csv)
+print(open(output_csv).read().splitlines()[0])
+
+# a utf-8 BOM and non-ASCII text decode as they do from blobs and archives
+print("\n--- Encoded files ---")
+encoded = b"\xef\xbb\xbfimport torch\nx = get_loader(path)\nlogging.info(\"caf\xc3\xa9\")\n"
+encoded_dir = os.path.join(corpus_dir, 'encoded@repoC')
+os.makedirs(encoded_dir)
+with open(os.path.join(encoded_dir, 'train.py'), 'wb') as f:
+    f.write(encoded)
+(_, encoded_file, encoded_source), = scanner.iterRepoFiles(encoded_dir)
+assert encoded_source == encoded.decode('utf-8-sig')
+assert scanner.getContentKey(encoded_file, encoded_source) == scanner.getContentKey('blob/train.py', scanner.decodeSource(encoded))
+encoded_rows, _ = scanner.scanFiles(scanner.iterRepoFiles(encoded_dir))
+assert encoded_rows[0][3] == 1  # DATA_LOAD_COUNT
+
+shutil.rmtree(corpus_dir)
+print("\n=== All scanner tests completed ===")
@@ -0,0 +1,70 @@
+import sys
+import os
+import ast
+import csv
+import tempfile
+import shutil
+
+# Add current folder (forensics) and the repo root (synthetic_corpus) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import synthetic_corpus
+import py_parser
+import frequency
+import scanner
+
+def read_tree(root_dir):
+    contents_ = {}
+    for dir_, _, files_ in os.walk(root_dir):
+        for file_ in files_:
+            with open(os.path.join(dir_, file_)) as f:
+                contents_[os.path.relpath(os.path.join(dir_, file_), root_dir)] = f.read()
+    return contents_
+
+first_dir, second_dir = tempfile.mkdtemp(prefix='corpus_a_'), tempfile.mkdtemp(prefix='corpus_b_')
+
+print("\n--- Same seed, same corpus ---")
+density = {'torch.load': 0.05, 'gym.make': 0.02, 'logging.info': 0.05}
+manifest = synthetic_corpus.generateCorpus(first_dir, repos=4, files_per_repo=6, notebook_ratio=0.25, seed=11,
+                                           median_lines=60, max_depth=4, hit_density=density)
+synthetic_corpus.generateCorpus(second_dir, repos=4, files_per_repo=6, notebook_ratio=0.25, seed=11,
+                                median_lines=60, max_depth=4, hit_density=density)
+assert read_tree(first_dir) == read_tree(second_dir)
+print(f"{len(manifest)} files, {sum(e_['LINES'] for e_ in manifest)} lines")
+assert len({e_['REPO'] for e_ in manifest}) == 4
+
+print("\n--- Files parse and carry the planted sites ---")
+notebooks, deepest = 0, 0
+for entry_ in manifest:
+    source_ = open(entry_['FILE']).read()
+    if entry_['FILE'].endswith('.ipynb'):
+        notebooks += 1
+        source_ = py_parser.getNotebookSource(source_)
+    else:
+        assert entry_['LINES'] == frequency.getSourceSLOC(source_)
+    tree_ = ast.parse(source_)
+    deepest = max(deepest, max((len(line_) - len(line_.lstrip(' '))) // 4 for line_ in source_.splitlines()))
+    assert source_.count('torch.load(') == entry_['SITES']['torch.load']
+    assert source_.count('gym.make(') == entry_['SITES']['gym.make'] == entry_['HITS']['ENVIRONMENT_COUNT']
+    assert source_.count('logging.info(') == entry_['SITES']['logging.info']
+    assert entry_['HITS']['DATA_LOAD_COUNT'] == entry_['SITES']['torch.load']
+assert notebooks > 0 and 1 < deepest <= 4, (notebooks, deepest)
+assert sum(e_['SITES']['torch.load'] for e_ in manifest) > 0
+
+print("\n--- V5 results CSV feeds the reports ---")
+results_file = synthetic_corpus.dumpResultsCsv(manifest, os.path.join(first_dir, 'V5_OUTPUT_SYNTHETIC.csv'))
+rows = list(csv.DictReader(open(results_file)))
+assert len(rows) == len(manifest)
+assert all(int(r_['TOTAL_EVENT_COUNT']) == sum(int(r_[c_]) for c_ in synthetic_corpus.EVENT_CATEGORIES) for r_ in rows)
+density_file = os.path.join(first_dir, 'DENSITY.csv')
+frequency.reportEventDensity(results_file, density_file)
+density_rows = list(csv.DictReader(open(density_file)))
+assert len(density_rows) == 4 * 9
+total_loc = sum(int(r_['TOTAL_LOC']) for r_ in density_rows if r_['CATEGORY'] == 'TOTAL_EVENT_COUNT')
+assert total_loc == sum(e_['LINES'] for e_ in manifest), total_loc
+assert len(list(scanner.iterCorpusFiles(first_dir))) == len(manifest)
+
+shutil.rmtree(first_dir)
+shutil.rmtree(second_dir)
+print("\nSynthetic corpus checks passed")
@@ -0,0 +1,76 @@
+import sys
+import os
+import json
+import subprocess
+import tempfile
+import shutil
+
+# Add current folder (forensics) to sys.path so imports work
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import tracing
+import scanner
+import py_parser
+import scan_pool
+
+FORENSICS_DIR = os.path.abspath(os.path.dirname(__file__))
+trace_dir = tempfile.mkdtemp(prefix='tracing_test_')
+files = [
+    ('repoA', 'repoA/train.py', "import torch\nx = get_loader(path)\n"),
+    ('repoB', 'repoB/train.py', "import torch\nx = get_loader(path)\n"),
+]
+
+print("=== Testing disabled tracing ===")
+assert tracing.traceSpan('anything') is tracing.NO_SPAN
+scanner.scanFiles(iter(files))
+assert tracing.TRACE_EVENTS == []
+
+print("\n=== Testing spans in this process ===")
+tracing.enableTracing(trace_dir)
+rows, _ = scanner.scanFiles(iter(files))
+names = [event_['name'] for event_ in tracing.TRACE_EVENTS]
+print("Span names:", sorted(set(names)))
+assert 'scanner.analyseFile' in names
+assert 'lint_engine.getDataLoadCountb' in names
+assert 'py_parser.getPythonParseObjectFromSource' in names
+assert names.count('scanner.analyseFile') == 1  # second file is a duplicate
+assert all(event_['ph'] == 'X' and event_['dur'] >= 0 for event_ in tracing.TRACE_EVENTS)
+main_trace = tracing.dumpTrace()
+print("Trace written to", main_trace)
+
+print("\n=== Testing a traced worker process ===")
+worker_code = ("import sys; sys.path.insert(0, %r); import py_parser; "
+               "py_parser.getPythonParseObjectFromSource('x = 1', 'worker.py')") % FORENSICS_DIR
+subprocess.check_call([sys.executable, '-c', worker_code], env=dict(os.environ, FORENSICS_TRACE_DIR=trace_dir))
+assert len([f_ for f_ in os.listdir(trace_dir) if f_.startswith('trace-')]) == 2
+
+print("\n=== Testing a traced parallel scan ===")
+os.environ['FORENSICS_TRACE_DIR'] = trace_dir
+with tracing.traceSpan('parent only'):
+    pass
+parallel_files = [('repoC', f"repoC/train_{i_}.py", f"import torch\nx_{i_} = torch.load(path)\n") for i_ in range(6)]
+rows, _, _ = scan_pool.scanFilesParallel(iter(parallel_files), workers=2)
+assert len(rows) == 6
+worker_traces = [f_ for f_ in os.listdir(trace_dir) if f_.startswith('trace-') and f_ != os.path.basename(main_trace)]
+print("Worker trace files:", worker_traces)
+assert len(worker_traces) >= 3
+for file_ in worker_traces:
+    events_ = json.load(open(os.path.join(trace_dir, file_)))['traceEvents']
+    # each worker writes only its own spans, not the ones it inherited from the parent
+    assert {event_['pid'] for event_ in events_} == {int(file_[len('trace-'):-len('.json')])}
+    assert 'parent only' not in {event_['name'] for event_ in events_}
+assert sum(event_['name'] == 'lint_engine.getDataLoadCountb' for file_ in worker_traces
+           for event_ in json.load(open(os.path.join(trace_dir, file_)))['traceEvents']) == 6
+tracing.TRACE_EVENTS.clear()
+del os.environ['FORENSICS_TRACE_DIR']
+
+merged_file = os.path.join(trace_dir, 'merged.json')
+merged_count = tracing.mergeTraces(trace_dir, merged_file)
+merged = json.load(open(merged_file))['traceEvents']
+print("Merged events:", merged_count)
+assert merged_count == len(merged)
+assert len({event_['pid'] for event_ in merged}) >= 4
+
+tracing.disableTracing()
+shutil.rmtree(trace_dir)
+print("\n=== All tracing tests completed ===")
@@ -0,0 +1,102 @@
+'''
+Span instrumentation in Chrome trace-event format (chrome://tracing, Perfetto).
+
+Set FORENSICS_TRACE_DIR (or call enableTracing) and every process writes its
+spans to <dir>/trace-<pid>.json at exit; mergeTraces combines the per-worker
+files into one trace. With tracing off, traceSpan hands back a shared no-op
+context and traced functions cost one flag check per call.
+'''
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+import functools
+
+TRACE_DIR = None
+TRACE_EVENTS = []
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc_info):
+        return False
+
+NO_SPAN = _NoSpan()
+
+class _Span:
+    __slots__ = ('name', 'cat', 'args', 'start_us')
+
+    def __init__(self, name, cat, args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        # perf_counter is CLOCK_MONOTONIC on Linux, so spans of different workers line up
+        self.start_us = time.perf_counter_ns() // 1000
+        return self
+
+    def __exit__(self, *exc_info):
+        end_us = time.perf_counter_ns() // 1000
+        event_ = {'name': self.name, 'cat': self.cat, 'ph': 'X', 'ts': self.start_us,
+                  'dur': end_us - self.start_us, 'pid': os.getpid(), 'tid': threading.get_ident()}
+        if self.args:
+            event_['args'] = self.args
+        TRACE_EVENTS.append(event_)
+        return False
+
+def enableTracing(trace_dir):
+    global TRACE_DIR
+    os.makedirs(trace_dir, exist_ok=True)
+    if TRACE_DIR is None:
+        atexit.register(dumpTrace)
+    TRACE_DIR = trace_dir
+
+def disableTracing():
+    global TRACE_DIR
+    TRACE_DIR = None
+
+def traceSpan(name, cat='forensics', **args):
+    if TRACE_DIR is None:
+        return NO_SPAN
+    return _Span(name, cat, args)
+
+def traced(fn):
+    span_name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if TRACE_DIR is None:
+            return fn(*args, **kwargs)
+        with _Span(span_name, fn.__module__, None):
+            return fn(*args, **kwargs)
+    return wrapper
+
+def dumpTrace(trace_file=None):
+    if not TRACE_EVENTS:
+        return None
+    if trace_file is None:
+        if TRACE_DIR is None:
+            return None
+        trace_file = os.path.join(TRACE_DIR, f"trace-{os.getpid()}.json")
+    with open(trace_file, 'w') as fileToWrite:
+        json.dump({'traceEvents': TRACE_EVENTS}, fileToWrite)
+    logging.info("Wrote %s trace events to %s", len(TRACE_EVENTS), trace_file)
+    TRACE_EVENTS.clear()
+    return trace_file
+
+def mergeTraces(trace_dir, output_file):
+    all_events = []
+    for file_ in sorted(os.listdir(trace_dir)):
+        if file_.startswith('trace-') and file_.endswith('.json'):
+            with open(os.path.join(trace_dir, file_)) as f:
+                all_events += json.load(f)['traceEvents']
+    all_events.sort(key=lambda event_: event_['ts'])
+    with open(output_file, 'w') as fileToWrite:
+        json.dump({'traceEvents': all_events}, fileToWrite)
+    logging.info("Merged %s trace events from %s into %s", len(all_events), trace_dir, output_file)
+    return len(all_events)
+
+if os.environ.get('FORENSICS_TRACE_DIR'):
+    enableTracing(os.environ['FORENSICS_TRACE_DIR'])
@@ -1,49 +1,27 @@
 """
 Guaranteed working fuzz.py
 Loads py_parser FIRST so lint_engine can import it.
-Mocks numpy/pandas/git, no project modifications needed.
+The forensics modules import pandas/numpy/git lazily, so no mocks are needed.
+
+    python fuzz.py                                  # random smoke calls, errors in fuzz_errors.txt
+    python fuzz.py --engine --workers 4 --seconds 60  # coverage-guided fuzzing (fuzz_engine.py)
+    python fuzz.py --engine --grammar 0.5             # half the inputs from fuzz_grammar.py
+    python fuzz.py --perf --time-budget 2             # pathological-size hunting (fuzz_perf.py)
 """
 
-import os, sys, random, string, traceback, importlib.util, types
+import os, sys, random, string, traceback, importlib.util, types, argparse
+
+import fuzz_engine
+import fuzz_grammar
+import fuzz_perf
+import shutil
+import tempfile
 
 BASE = os.path.dirname(os.path.abspath(__file__))
 FORENSICS = os.path.join(BASE, "forensics")
 
-# ---------------------------------------------------------
-# MOCK numpy
-# ---------------------------------------------------------
-fake_np = types.ModuleType("numpy")
-fake_np.array = lambda *a, **k: a
-fake_np.mean = fake_np.std = fake_np.var = (lambda *a, **k: 0)
-sys.modules["numpy"] = fake_np
-sys.modules["np"] = fake_np
-
-# ---------------------------------------------------------
-# MOCK pandas
-# ---------------------------------------------------------
-fake_pd = types.ModuleType("pandas")
-fake_pd.read_csv = lambda *a, **k: []
-fake_pd.DataFrame = lambda *a, **k: []
-sys.modules["pandas"] = fake_pd
-sys.modules["pd"] = fake_pd
-
-# ---------------------------------------------------------
-# MOCK git and git.exc
-# ---------------------------------------------------------
-fake_git = types.ModuleType("git")
-
-class FakeRepo:
-    def __init__(self, *a, **k): pass
-    def clone_from(self, *a, **k): pass
-
-fake_git.Repo = FakeRepo
-
-fake_exc = types.ModuleType("git.exc")
-fake_exc.GitError = Exception
-fake_git.exc = fake_exc
-
-sys.modules["git"] = fake_git
-sys.modules["git.exc"] = fake_exc
+# forensics modules import their helpers (constants, forensic_logging, ...) by name
+sys.path.insert(0, FORENSICS)
 
 # ---------------------------------------------------------
 # Make the forensics folder a pseudo-package
@@ -52,11 +30,6 @@ pkg = types.ModuleType("forensics")
 pkg.__path__ = [FORENSICS]
 sys.modules["forensics"] = pkg
 
-# fake constants
-const = types.ModuleType("forensics.constants")
-sys.modules["constants"] = const
-sys.modules["forensics.constants"] = const
-
 # ---------------------------------------------------------
 # Loader
 # ---------------------------------------------------------
@@ -101,10 +74,9 @@ def rpath(): return rstr(8) + ".txt"
 def rurl(): return "http://" + rstr(12) + ".git"
 def rlist(): return [random.randint(0, 50) for _ in range(random.randint(2, 10))]
 
-def log_error(name, args, exc):
-    with open("fuzz_errors.txt", "a") as f:
-        f.write(f"\n--- {name} ---\nArgs={args}\n")
-        f.write("".join(traceback.format_exception(type(exc), exc, exc.__traceback__)))
+def log_error(error_file, name, args, exc):
+    error_file.write(f"\n--- {name} ---\nArgs={args}\n")
+    error_file.write("".join(traceback.format_exception(type(exc), exc, exc.__traceback__)))
 
 # ---------------------------------------------------------
 # SAFE real functions
@@ -120,20 +92,142 @@ TARGETS = [
 # ---------------------------------------------------------
 # Fuzz loop
 # ---------------------------------------------------------
-def fuzz(name, fn, gen):
+def fuzz(error_file, name, fn, gen):
     print(f"[+] Fuzzing {name}")
     for _ in range(20):
         try:
             args = gen()
             fn(*args)
         except Exception as e:
-            log_error(name, args, e)
+            log_error(error_file, name, args, e)
+
+# ---------------------------------------------------------
+# Coverage-guided targets: each takes Python source text
+# ---------------------------------------------------------
+FUZZ_FILE = "<fuzz>.py"
+
+def fuzz_py_parser(source):
+    tree = py_parser.getPythonParseObjectFromSource(source, FUZZ_FILE)
+    py_parser.getFunctionAssignments(tree)
+    py_parser.getFunctionDefinitions(tree)
+    py_parser.getPythonAttributeFuncs(tree)
+    py_parser.getModelFeature(tree)
+    py_parser.getFunctionAssignmentsWithMultipleLHS(tree)
+    py_parser.getTupAssiDetails(tree)
+    py_parser.checkExceptLogging(py_parser.checkAttribFuncsInExcept(py_parser.getPythonExcepts(tree)))
+    py_parser.checkLoggingPerData(tree, "data")
+
+def fuzz_lint_engine(source):
+    # detectors are called directly: getEventCounts would swallow their exceptions
+    py_parser.cachePythonSource(FUZZ_FILE, source)
+    try:
+        for detectors_ in lint_engine.EVENT_DETECTORS.values():
+            for detector_ in detectors_:
+                detector_(FUZZ_FILE)
+    finally:
+        py_parser.evictPythonSource(FUZZ_FILE)
+
+def fuzz_check_python_source(source):
+    mining.checkPythonSource(source, FUZZ_FILE)
+
+ENGINE_TARGETS = [
+    ("py_parser", fuzz_py_parser),
+    ("lint_engine", fuzz_lint_engine),
+    ("mining.checkPythonSource", fuzz_check_python_source),
+]
+
+def fuzz_event_counts(source):
+    lint_engine.getEventCounts(FUZZ_FILE, source)
+
+PERF_DIR = None
+
+def fuzz_check_python_file(source):
+    global PERF_DIR
+    if PERF_DIR is None:
+        PERF_DIR = tempfile.mkdtemp(prefix="fuzz_perf_")
+    with open(os.path.join(PERF_DIR, "input.py"), "w") as f:
+        f.write(source)
+    mining.checkPythonFile(PERF_DIR)
+
+PERF_TARGETS = [
+    ("py_parser", fuzz_py_parser),
+    ("lint_engine", fuzz_event_counts),
+    ("mining.checkPythonFile", fuzz_check_python_file),
+]
+
+def get_rule_names():
+    constants = sys.modules["constants"]
+    return sorted({v for k, v in vars(constants).items() if k.endswith("_KW") and isinstance(v, str) and v.isidentifier()})
+
+def get_dictionary():
+    # identifiers the rules match on, plus the constructs they look for
+    names_ = get_rule_names()
+    snippets_ = ["torch.load(path)", "env.step(action)", "a, b = f(x)", "x = obj.attr", "f'{x}'",
+                 "import logging", "logging.info(data)", "try:\n    pass\nexcept Exception as e:\n    pass",
+                 "def f(x):\n    return x", "(", ")", ",", ".", "=", ":", "lambda: 0", "[i for i in x]"]
+    return names_ + [n_ + "." for n_ in names_] + snippets_
+
+def get_seeds():
+    # top-level statements of the forensics modules: small inputs keep exec/s high
+    import ast
+    seeds_ = set()
+    for file_ in sorted(os.listdir(FORENSICS)):
+        if file_.endswith(".py"):
+            with open(os.path.join(FORENSICS, file_), encoding="latin-1") as f:
+                source_ = f.read()
+            try:
+                tree_ = ast.parse(source_)
+            except SyntaxError:
+                continue
+            for stmt_ in tree_.body:
+                segment_ = ast.get_source_segment(source_, stmt_)
+                if segment_:
+                    seeds_.add(segment_[:fuzz_engine.MAX_INPUT_SIZE])
+    return sorted(seeds_)
 
 def main():
-    open("fuzz_errors.txt", "w").write("Fuzzing Errors\n==============\n")
-    for name, fn, gen in TARGETS:
-        fuzz(name, fn, gen)
+    with open("fuzz_errors.txt", "w") as error_file:
+        error_file.write("Fuzzing Errors\n==============\n")
+        for name, fn, gen in TARGETS:
+            fuzz(error_file, name, fn, gen)
     print("\n[*] Complete — see fuzz_errors.txt")
 
+def main_engine(opts):
+    print(f"[+] Coverage-guided fuzzing with {opts.workers} workers for {opts.seconds}s")
+    generator_ = fuzz_grammar.GrammarGenerator(get_rule_names()) if opts.grammar > 0 else None
+    merged_ = fuzz_engine.runFuzzer(ENGINE_TARGETS, get_seeds(), [FORENSICS], opts.out_dir,
+                                    workers=opts.workers, seconds=opts.seconds,
+                                    dictionary=get_dictionary(), seed=opts.seed, max_execs=opts.max_execs,
+                                    generator=generator_, generate_ratio=opts.grammar)
+    print(fuzz_engine.formatReport(merged_))
+    return merged_
+
+def main_perf(opts):
+    print(f"[+] Performance fuzzing, budgets {opts.time_budget}s / {opts.mem_budget_mb}MiB per call")
+    results_ = fuzz_perf.runPerfFuzz(PERF_TARGETS, os.path.join(opts.out_dir, "slow"), time_budget=opts.time_budget,
+                                     mem_budget=opts.mem_budget_mb * 1024 * 1024, max_n=opts.max_size)
+    print(fuzz_perf.formatPerfReport(results_))
+    if PERF_DIR is not None:
+        shutil.rmtree(PERF_DIR)
+    return results_
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", action="store_true", help="coverage-guided fuzzing instead of random smoke calls")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--max-execs", type=int, default=0, help="per-worker execution cap, 0 for none")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out-dir", default="fuzz_out")
+    parser.add_argument("--grammar", type=float, default=0, help="share of engine inputs generated by fuzz_grammar")
+    parser.add_argument("--perf", action="store_true", help="hunt for inputs with superlinear time or memory cost")
+    parser.add_argument("--time-budget", type=float, default=2.0, help="seconds per target call")
+    parser.add_argument("--mem-budget-mb", type=int, default=256, help="tracemalloc peak per target call")
+    parser.add_argument("--max-size", type=int, default=65536, help="largest input size tried on each axis")
+    opts = parser.parse_args()
+    if opts.perf:
+        main_perf(opts)
+    elif opts.engine:
+        main_engine(opts)
+    else:
+        main()
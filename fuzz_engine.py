@@ -0,0 +1,307 @@
+"""
+Coverage-guided, in-process fuzzing engine used by fuzz.py --engine.
+
+- coverage: sys.monitoring LINE events on 3.12+ (each line reports once and is
+  then disabled), sys.settrace on older interpreters; only code under the
+  scope directories is recorded
+- corpus: Python source strings; a mutant that reaches new lines is kept and
+  written to the shared corpus directory, where the other workers pick it up
+- workers: forked processes, each with its own random seed
+- crashes: deduplicated by a hash of the exception type and innermost frames
+- generator: optionally, part of the inputs come fresh from a grammar
+  (fuzz_grammar.GrammarGenerator) instead of from corpus mutation
+"""
+
+import os
+import sys
+import time
+import random
+import hashlib
+import logging
+import warnings
+import traceback
+import multiprocessing
+
+MAX_INPUT_SIZE = 4 * 1024
+SYNC_EVERY = 500          # executions between corpus directory syncs
+CRASH_FRAMES = 5          # innermost frames that identify a crash
+# settrace fallback: a code object whose last SATURATE_AFTER traced calls found
+# nothing new is only traced on one call in RETRACE_EVERY
+SATURATE_AFTER = 50
+RETRACE_EVERY = 64
+# ... and once PLATEAU_EXECS executions in a row found nothing new, only one
+# execution in RETRACE_EVERY runs with the tracer installed
+PLATEAU_EXECS = 200
+
+COVERED = set()
+COVERAGE_SCOPE = ()
+_new_lines = 0
+_scope_cache = {}
+_code_state = {}
+
+# ---------------------------------------------------------
+# Coverage
+# ---------------------------------------------------------
+def _inScope(code):
+    in_scope = _scope_cache.get(code)
+    if in_scope is None:
+        in_scope = _scope_cache[code] = code.co_filename.startswith(COVERAGE_SCOPE)
+    return in_scope
+
+def _recordLine(filename, line_no):
+    global _new_lines
+    key_ = (filename, line_no)
+    if key_ not in COVERED:
+        COVERED.add(key_)
+        _new_lines += 1
+
+def _localTrace(frame, event, arg):
+    if event == 'line':
+        _recordLine(frame.f_code.co_filename, frame.f_lineno)
+    return _localTrace
+
+def _globalTrace(frame, event, arg):
+    code = frame.f_code
+    if not _inScope(code):
+        return None
+    # [calls, stale calls, new-line count at the previous call]
+    state_ = _code_state.get(code)
+    if state_ is None:
+        state_ = _code_state[code] = [0, 0, -1]
+    state_[0] += 1
+    if state_[2] == _new_lines:
+        state_[1] += 1
+    else:
+        state_[1] = 0
+    state_[2] = _new_lines
+    if state_[1] > SATURATE_AFTER and state_[0] % RETRACE_EVERY:
+        return None
+    return _localTrace
+
+def _onLine(code, line_no):
+    if _inScope(code):
+        _recordLine(code.co_filename, line_no)
+    return sys.monitoring.DISABLE
+
+def startCoverage(scope_dirs):
+    global COVERAGE_SCOPE
+    COVERAGE_SCOPE = tuple(os.path.abspath(d_) + os.sep for d_ in scope_dirs)
+    _scope_cache.clear()
+    _code_state.clear()
+    if hasattr(sys, 'monitoring'):
+        tool_id = sys.monitoring.COVERAGE_ID
+        sys.monitoring.use_tool_id(tool_id, 'forensics-fuzz')
+        sys.monitoring.register_callback(tool_id, sys.monitoring.events.LINE, _onLine)
+        sys.monitoring.set_events(tool_id, sys.monitoring.events.LINE)
+    else:
+        sys.settrace(_globalTrace)
+
+def untraced(fn, *args):
+    # input generation is outside the scope, but settrace would still be
+    # called for each of its frames
+    if hasattr(sys, 'monitoring'):
+        return fn(*args)
+    sys.settrace(None)
+    try:
+        return fn(*args)
+    finally:
+        sys.settrace(_globalTrace)
+
+def stopCoverage():
+    if hasattr(sys, 'monitoring'):
+        tool_id = sys.monitoring.COVERAGE_ID
+        sys.monitoring.set_events(tool_id, 0)
+        sys.monitoring.free_tool_id(tool_id)
+    else:
+        sys.settrace(None)
+
+# ---------------------------------------------------------
+# Mutation
+# ---------------------------------------------------------
+def _splitPoint(source):
+    return random.randint(0, len(source)) if source else 0
+
+def mutateSource(source, corpus, dictionary):
+    lines_ = source.split('\n')
+    for _ in range(random.randint(1, 4)):
+        choice_ = random.randrange(8)
+        if choice_ == 0:
+            # dictionary token at a random offset
+            pos_ = _splitPoint(source)
+            source = source[:pos_] + random.choice(dictionary) + source[pos_:]
+        elif choice_ == 1:
+            # token as a new statement
+            index_ = random.randint(0, len(lines_))
+            indent_ = ' ' * (4 * random.randint(0, 2))
+            lines_.insert(index_, indent_ + random.choice(dictionary))
+            source = '\n'.join(lines_)
+        elif choice_ == 2 and source:
+            start_ = _splitPoint(source)
+            source = source[:start_] + source[start_ + random.randint(1, 32):]
+        elif choice_ == 3 and lines_:
+            index_ = random.randrange(len(lines_))
+            lines_.insert(index_, lines_[index_])
+            source = '\n'.join(lines_)
+        elif choice_ == 4 and len(lines_) > 1:
+            i_, j_ = random.randrange(len(lines_)), random.randrange(len(lines_))
+            lines_[i_], lines_[j_] = lines_[j_], lines_[i_]
+            source = '\n'.join(lines_)
+        elif choice_ == 5 and corpus:
+            # splice with another corpus entry
+            other_ = random.choice(corpus)
+            source = source[:_splitPoint(source)] + other_[_splitPoint(other_):]
+        elif choice_ == 6 and lines_:
+            index_ = random.randrange(len(lines_))
+            lines_[index_] = ' ' * (4 * random.randint(0, 3)) + lines_[index_].lstrip()
+            source = '\n'.join(lines_)
+        else:
+            pos_ = _splitPoint(source)
+            source = source[:pos_] + chr(random.randint(32, 126)) + source[pos_:]
+        lines_ = source.split('\n')
+    return source[:MAX_INPUT_SIZE]
+
+# ---------------------------------------------------------
+# Corpus and crashes
+# ---------------------------------------------------------
+def getInputDigest(source):
+    return hashlib.sha1(source.encode('utf-8', 'replace')).hexdigest()
+
+def saveInput(out_dir, source, prefix=''):
+    path_ = os.path.join(out_dir, prefix + getInputDigest(source) + '.py')
+    if not os.path.exists(path_):
+        with open(path_, 'w', encoding='utf-8', errors='replace') as f:
+            f.write(source)
+    return path_
+
+def syncCorpus(corpus_dir, corpus, seen_files):
+    for file_ in os.listdir(corpus_dir):
+        if file_ not in seen_files:
+            seen_files.add(file_)
+            with open(os.path.join(corpus_dir, file_), encoding='utf-8', errors='replace') as f:
+                corpus.append(f.read())
+
+def getCrashHash(target_name, exc):
+    frames_ = traceback.extract_tb(exc.__traceback__)[-CRASH_FRAMES:]
+    where_ = [(os.path.basename(f_.filename), f_.name, f_.lineno) for f_ in frames_]
+    return hashlib.sha1(repr((target_name, type(exc).__name__, where_)).encode()).hexdigest()[:16]
+
+def recordCrash(crash_dir, crashes, target_name, source, exc):
+    crash_hash = getCrashHash(target_name, exc)
+    if crash_hash in crashes:
+        crashes[crash_hash]['COUNT'] += 1
+        return
+    crash_file = os.path.join(crash_dir, f"crash-{crash_hash}.py")
+    if not os.path.exists(crash_file):
+        with open(crash_file, 'w', encoding='utf-8', errors='replace') as f:
+            f.write(source)
+        with open(crash_file[:-3] + '.txt', 'w') as f:
+            f.write(f"target: {target_name}\n")
+            f.write(''.join(traceback.format_exception(type(exc), exc, exc.__traceback__)))
+    crashes[crash_hash] = {'COUNT': 1, 'TARGET': target_name, 'ERROR': f"{type(exc).__name__}: {exc}"[:200], 'FILE': crash_file}
+
+# ---------------------------------------------------------
+# Workers
+# ---------------------------------------------------------
+def runTargets(targets, source, crash_dir, crashes):
+    for target_name, target_fn in targets:
+        try:
+            target_fn(source)
+        except Exception as e:
+            recordCrash(crash_dir, crashes, target_name, source, e)
+
+def runWorker(worker_id, targets, options, result_queue=None):
+    random.seed(options['seed'] + worker_id)
+    # detectors print their findings and the parser logs syntax errors;
+    # both would dominate the cost of an execution
+    saved_stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings('ignore', category=SyntaxWarning)
+    corpus, seen_files = [], set()
+    syncCorpus(options['corpus_dir'], corpus, seen_files)
+    corpus = corpus or ['']
+    crashes, execs, kept, last_new = {}, 0, 0, 0
+    startCoverage(options['scope'])
+    start_time = time.perf_counter()
+    deadline = start_time + options['seconds']
+    try:
+        while time.perf_counter() < deadline and (not options['max_execs'] or execs < options['max_execs']):
+            if execs and execs % SYNC_EVERY == 0:
+                syncCorpus(options['corpus_dir'], corpus, seen_files)
+            if options['generator'] is not None and random.random() < options['generate_ratio']:
+                child_ = untraced(options['generator'])
+            else:
+                child_ = untraced(mutateSource, random.choice(corpus), corpus, options['dictionary'])
+            lines_before = _new_lines
+            if execs - last_new < PLATEAU_EXECS or execs % RETRACE_EVERY == 0:
+                runTargets(targets, child_, options['crash_dir'], crashes)
+            else:
+                untraced(runTargets, targets, child_, options['crash_dir'], crashes)
+            execs += 1
+            if _new_lines > lines_before:
+                corpus.append(child_)
+                seen_files.add(os.path.basename(saveInput(options['corpus_dir'], child_)))
+                kept += 1
+                last_new = execs
+    finally:
+        stopCoverage()
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+        logging.disable(logging.NOTSET)
+    stats_ = {'WORKER': worker_id, 'EXECS': execs, 'SECONDS': time.perf_counter() - start_time,
+              'KEPT': kept, 'COVERED': sorted(COVERED), 'CRASHES': crashes}
+    if result_queue is not None:
+        result_queue.put(stats_)
+    return stats_
+
+def mergeResults(worker_stats):
+    merged_ = {'EXECS': 0, 'SECONDS': 0.0, 'KEPT': 0, 'COVERED': set(), 'CRASHES': {}}
+    for stats_ in worker_stats:
+        merged_['EXECS'] += stats_['EXECS']
+        merged_['SECONDS'] = max(merged_['SECONDS'], stats_['SECONDS'])
+        merged_['KEPT'] += stats_['KEPT']
+        merged_['COVERED'].update(stats_['COVERED'])
+        for crash_hash, crash_ in stats_['CRASHES'].items():
+            if crash_hash in merged_['CRASHES']:
+                merged_['CRASHES'][crash_hash]['COUNT'] += crash_['COUNT']
+            else:
+                merged_['CRASHES'][crash_hash] = crash_
+    merged_['EXECS_PER_SEC'] = round(merged_['EXECS'] / merged_['SECONDS'], 1) if merged_['SECONDS'] else 0
+    return merged_
+
+def runFuzzer(targets, seeds, scope, out_dir, workers=1, seconds=30, dictionary=('',), seed=0, max_execs=0,
+              generator=None, generate_ratio=0.5):
+    # generator: optional zero-argument callable returning fresh source text,
+    # used instead of a corpus mutation for generate_ratio of the executions
+    corpus_dir, crash_dir = os.path.join(out_dir, 'corpus'), os.path.join(out_dir, 'crashes')
+    os.makedirs(corpus_dir, exist_ok=True)
+    os.makedirs(crash_dir, exist_ok=True)
+    for seed_ in seeds:
+        saveInput(corpus_dir, seed_)
+    options = {'corpus_dir': corpus_dir, 'crash_dir': crash_dir, 'scope': scope, 'seconds': seconds,
+               'dictionary': list(dictionary), 'seed': seed, 'max_execs': max_execs,
+               'generator': generator, 'generate_ratio': generate_ratio}
+
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        # targets are plain callables and are handed to the workers by fork, not pickled
+        worker_stats = [runWorker(0, targets, options)]
+    else:
+        ctx = multiprocessing.get_context('fork')
+        result_queue = ctx.Queue()
+        procs = [ctx.Process(target=runWorker, args=(i_, targets, options, result_queue)) for i_ in range(workers)]
+        for proc_ in procs:
+            proc_.start()
+        worker_stats = [result_queue.get() for _ in procs]
+        for proc_ in procs:
+            proc_.join()
+    merged_ = mergeResults(worker_stats)
+    merged_['CORPUS'] = len(os.listdir(corpus_dir))
+    merged_['WORKERS'] = len(worker_stats)
+    return merged_
+
+def formatReport(merged_):
+    lines_ = [f"Workers: {merged_['WORKERS']} | Executions: {merged_['EXECS']} in {merged_['SECONDS']:.1f}s "
+              f"({merged_['EXECS_PER_SEC']} exec/s) | Lines covered: {len(merged_['COVERED'])} | "
+              f"Corpus: {merged_['CORPUS']} (+{merged_['KEPT']}) | Unique crashes: {len(merged_['CRASHES'])}"]
+    for crash_hash, crash_ in sorted(merged_['CRASHES'].items(), key=lambda item_: -item_[1]['COUNT']):
+        lines_.append(f"  [{crash_hash}] x{crash_['COUNT']} {crash_['TARGET']}: {crash_['ERROR']} -> {crash_['FILE']}")
+    return '\n'.join(lines_)
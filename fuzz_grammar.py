@@ -0,0 +1,131 @@
+"""
+Grammar-based Python source generator for fuzz.py.
+
+Builds random but valid module ASTs and unparses them, so every input gets
+past ast.parse and reaches the extractors. Choices are biased toward what the
+py_parser extractors and lint_engine rules look at: attribute calls such as
+torch.load / env.step on rule identifiers, single and tuple assignments from
+calls, attribute reads, f-string and string arguments, imports, and
+try/except handlers with logging calls.
+"""
+
+import ast
+import random
+import string
+import keyword
+
+VOCAB_BIAS = 0.8          # chance an identifier comes from the rule vocabulary
+
+class GrammarGenerator:
+    def __init__(self, vocab, rng=random, max_depth=3, max_stmts=6):
+        # the random module by default, so forked fuzz workers follow their own seeds
+        self.vocab = [v_ for v_ in vocab if v_.isidentifier() and not keyword.iskeyword(v_)] or ['x']
+        self.rng = rng
+        self.max_depth = max_depth
+        self.max_stmts = max_stmts
+
+    # -------------------------- identifiers --------------------------
+    def name(self):
+        if self.rng.random() < VOCAB_BIAS:
+            return self.rng.choice(self.vocab)
+        name_ = self.rng.choice(string.ascii_lowercase) + ''.join(self.rng.choice(string.ascii_lowercase + string.digits + '_') for _ in range(self.rng.randint(0, 6)))
+        return name_ + '_' if keyword.iskeyword(name_) else name_
+
+    def text(self):
+        return ''.join(self.rng.choice(string.ascii_letters + string.digits + ' ./_') for _ in range(self.rng.randint(0, 12)))
+
+    # -------------------------- expressions --------------------------
+    def attribute(self, depth):
+        value_ = ast.Name(self.name(), ast.Load()) if depth <= 0 or self.rng.random() < 0.7 else self.attribute(depth - 1)
+        return ast.Attribute(value_, self.name(), ast.Load())
+
+    def fstring(self):
+        values_ = []
+        for _ in range(self.rng.randint(1, 3)):
+            if self.rng.random() < 0.5:
+                values_.append(ast.Constant(self.text() or 'x'))
+            else:
+                # no strings inside the replacement fields: 3.11 cannot unparse nested quotes
+                field_ = ast.Name(self.name(), ast.Load()) if self.rng.random() < 0.6 else self.attribute(0)
+                values_.append(ast.FormattedValue(field_, -1, None))
+        return ast.JoinedStr(values_)
+
+    def call(self, depth):
+        func_ = self.attribute(depth - 1) if self.rng.random() < 0.75 else ast.Name(self.name(), ast.Load())
+        args_ = [self.expr(depth - 1) for _ in range(self.rng.randint(0, 3))]
+        keywords_ = [ast.keyword(self.name(), self.expr(depth - 1)) for _ in range(self.rng.randint(0, 1))]
+        return ast.Call(func_, args_, keywords_)
+
+    def expr(self, depth=None):
+        depth = self.max_depth if depth is None else depth
+        if depth <= 0:
+            choice_ = self.rng.randrange(3)
+        else:
+            choice_ = self.rng.randrange(9)
+        if choice_ == 0:
+            return ast.Name(self.name(), ast.Load())
+        if choice_ == 1:
+            return ast.Constant(self.text() if self.rng.random() < 0.7 else self.rng.randint(-5, 100))
+        if choice_ == 2:
+            return self.fstring()
+        if choice_ in (3, 4, 5):
+            return self.call(depth)
+        if choice_ == 6:
+            return self.attribute(depth - 1)
+        if choice_ == 7:
+            return ast.Tuple([self.expr(depth - 1) for _ in range(self.rng.randint(2, 3))], ast.Load())
+        return ast.Subscript(ast.Name(self.name(), ast.Load()), self.expr(depth - 1), ast.Load())
+
+    # -------------------------- statements --------------------------
+    def target(self):
+        if self.rng.random() < 0.35:
+            return ast.Tuple([ast.Name(self.name(), ast.Store()) for _ in range(self.rng.randint(2, 4))], ast.Store())
+        return ast.Name(self.name(), ast.Store())
+
+    def logging_call(self, depth):
+        level_ = self.rng.choice(['info', 'debug', 'warning', 'error', 'exception'])
+        return ast.Expr(ast.Call(ast.Attribute(ast.Name('logging', ast.Load()), level_, ast.Load()),
+                                 [self.expr(depth - 1)], []))
+
+    def body(self, depth):
+        return [self.stmt(depth - 1) for _ in range(self.rng.randint(1, 3))]
+
+    def stmt(self, depth=None):
+        depth = self.max_depth if depth is None else depth
+        choice_ = self.rng.randrange(11 if depth > 0 else 6)
+        if choice_ in (0, 1):
+            value_ = self.call(depth) if self.rng.random() < 0.7 else self.attribute(depth - 1)
+            return ast.Assign([self.target()], value_)
+        if choice_ == 2:
+            return ast.Expr(self.call(depth))
+        if choice_ == 3:
+            return self.logging_call(depth)
+        if choice_ == 4:
+            if self.rng.random() < 0.5:
+                return ast.Import([ast.alias(self.name(), self.name() if self.rng.random() < 0.3 else None)])
+            return ast.ImportFrom(self.name(), [ast.alias(self.name(), None)], 0)
+        if choice_ == 5:
+            return ast.AugAssign(ast.Name(self.name(), ast.Store()), ast.Add(), self.expr(depth - 1))
+        if choice_ == 6:
+            handler_body = [self.logging_call(depth)] if self.rng.random() < 0.5 else self.body(depth)
+            handler_ = ast.ExceptHandler(ast.Name(self.rng.choice(['Exception', 'ValueError', self.name()]), ast.Load()),
+                                         'e' if self.rng.random() < 0.5 else None, handler_body)
+            return ast.Try(self.body(depth), [handler_], [], [])
+        if choice_ == 7:
+            return ast.If(self.expr(depth - 1), self.body(depth), self.body(depth) if self.rng.random() < 0.3 else [])
+        if choice_ == 8:
+            return ast.For(self.target(), self.expr(depth - 1), self.body(depth), [])
+        if choice_ == 9:
+            return ast.With([ast.withitem(self.call(depth), ast.Name(self.name(), ast.Store()))], self.body(depth))
+        arg_names = dict.fromkeys(self.name() for _ in range(self.rng.randint(0, 3)))
+        args_ = ast.arguments([], [ast.arg(name_) for name_ in arg_names], None, [], [], None, [])
+        return ast.FunctionDef(self.name(), args_, self.body(depth) + [ast.Return(self.expr(depth - 1))], [], None)
+
+    def module(self):
+        module_ = ast.Module([self.stmt() for _ in range(self.rng.randint(1, self.max_stmts))], [])
+        return ast.fix_missing_locations(module_)
+
+    def source(self):
+        return ast.unparse(self.module()) + '\n'
+
+    __call__ = source
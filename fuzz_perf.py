@@ -0,0 +1,189 @@
+"""
+Slowness / memory fuzzing used by fuzz.py --perf.
+
+Each target is run on inputs grown along size and nesting axes (literal
+tables, autogenerated modules, long lines, nested expressions and blocks).
+Inputs are doubled until the target exceeds its time or tracemalloc budget.
+A target is reported when it breaks a budget or when its cost grows
+superlinearly with input size (log-log slope above SUPERLINEAR_EXPONENT).
+For budget breaks and exceptions the smallest breaking size is found by
+bisection and saved as the reproducer.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import logging
+import warnings
+import tracemalloc
+
+SUPERLINEAR_EXPONENT = 1.5
+MIN_TIMING = 0.005        # seconds; faster points are too noisy to fit a slope
+SLOPE_POINTS = 3          # largest sizes used for the slope fit
+
+# ---------------------------------------------------------
+# Growth axes: size n -> Python source
+# ---------------------------------------------------------
+def genLiteralTable(n):
+    rows_ = ''.join(f"    ({i_}, 'name_{i_}', {i_ * 0.5}, None),\n" for i_ in range(n))
+    return f"TABLE = [\n{rows_}]\n"
+
+def genGeneratedModule(n):
+    # the shape of autogenerated protobuf / config modules, with rule calls sprinkled in
+    return ''.join(f"field_{i_} = descriptor.FieldDescriptor(name='f{i_}', index={i_})\n"
+                   f"model_{i_} = torch.load(path_{i_})\n" for i_ in range(n // 2 + 1))
+
+def genLongLine(n):
+    return "x = " + " + ".join(f"data.load(a{i_})" for i_ in range(n)) + "\n"
+
+def genTupleTargets(n):
+    return ", ".join(f"v{i_}" for i_ in range(n)) + " = env.step(action)\n"
+
+def genNestedCalls(n):
+    return "x = " + "torch.load(" * n + "path" + ")" * n + "\n"
+
+def genNestedAttributes(n):
+    return "x = obj" + "".join(f".a{i_}" for i_ in range(n)) + "\n"
+
+def genNestedBlocks(n):
+    lines_ = [" " * i_ + f"if cond_{i_}:" for i_ in range(n)]
+    lines_.append(" " * n + "logging.info(data)")
+    return "\n".join(lines_) + "\n"
+
+GROWTH_AXES = {
+    'literal_table': genLiteralTable,
+    'generated_module': genGeneratedModule,
+    'long_line': genLongLine,
+    'tuple_targets': genTupleTargets,
+    'nested_calls': genNestedCalls,
+    'nested_attributes': genNestedAttributes,
+    'nested_blocks': genNestedBlocks,
+}
+# nesting axes start and stop lower: the parser's own limits sit in the hundreds
+AXIS_LIMITS = {'nested_calls': 512, 'nested_attributes': 8192, 'nested_blocks': 512}
+
+# ---------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------
+def measureCost(target_fn, source):
+    # time and memory in separate runs: tracemalloc slows the traced run down
+    error_ = None
+    start_ = time.perf_counter()
+    try:
+        target_fn(source)
+    except Exception as e:
+        error_ = f"{type(e).__name__}: {e}"[:200]
+    seconds_ = time.perf_counter() - start_
+    if seconds_ < MIN_TIMING:
+        # repeat cheap runs and keep the minimum
+        for _ in range(2):
+            start_ = time.perf_counter()
+            try:
+                target_fn(source)
+            except Exception:
+                pass
+            seconds_ = min(seconds_, time.perf_counter() - start_)
+    tracemalloc.start()
+    try:
+        target_fn(source)
+    except Exception:
+        pass
+    peak_ = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds_, peak_, error_
+
+def getExponent(points):
+    # least-squares slope of log(seconds) over log(size) for the largest sizes
+    usable_ = [(n_, s_) for n_, s_, _ in points if s_ >= MIN_TIMING][-SLOPE_POINTS:]
+    if len(usable_) < 2:
+        return None
+    xs_ = [math.log(n_) for n_, _ in usable_]
+    ys_ = [math.log(s_) for _, s_ in usable_]
+    mean_x, mean_y = sum(xs_) / len(xs_), sum(ys_) / len(ys_)
+    var_x = sum((x_ - mean_x) ** 2 for x_ in xs_)
+    if var_x == 0:
+        return None
+    return round(sum((x_ - mean_x) * (y_ - mean_y) for x_, y_ in zip(xs_, ys_)) / var_x, 2)
+
+def breaksBudget(seconds_, peak_, error_, budgets):
+    return bool(error_) or seconds_ > budgets['seconds'] or peak_ > budgets['bytes']
+
+def minimizeSize(target_fn, make_source, low_n, high_n, budgets):
+    # smallest size in (low_n, high_n] that still fails or breaks a budget
+    while high_n - low_n > 1:
+        mid_n = (low_n + high_n) // 2
+        if breaksBudget(*measureCost(target_fn, make_source(mid_n)), budgets):
+            high_n = mid_n
+        else:
+            low_n = mid_n
+    return high_n
+
+# ---------------------------------------------------------
+# Probing
+# ---------------------------------------------------------
+def probeAxis(target_name, target_fn, axis_name, make_source, budgets, start_n, max_n):
+    points_, n_, prev_n, breach_ = [], start_n, 0, None
+    max_n = min(max_n, AXIS_LIMITS.get(axis_name, max_n))
+    while n_ <= max_n:
+        seconds_, peak_, error_ = measureCost(target_fn, make_source(n_))
+        points_.append((n_, seconds_, peak_))
+        if breaksBudget(seconds_, peak_, error_, budgets):
+            breach_ = {'SIZE': n_, 'SECONDS': round(seconds_, 4), 'PEAK_BYTES': peak_, 'ERROR': error_}
+            break
+        prev_n, n_ = n_, n_ * 2
+    exponent_ = getExponent([(n_, s_, p_) for n_, s_, p_ in points_])
+    result_ = {'TARGET': target_name, 'AXIS': axis_name, 'EXPONENT': exponent_,
+               'POINTS': [(n_, round(s_, 5), p_) for n_, s_, p_ in points_], 'BREACH': breach_}
+    result_['FLAGGED'] = bool(breach_) or (exponent_ is not None and exponent_ > SUPERLINEAR_EXPONENT)
+    if breach_:
+        result_['MIN_SIZE'] = minimizeSize(target_fn, make_source, prev_n, breach_['SIZE'], budgets)
+    elif result_['FLAGGED']:
+        result_['MIN_SIZE'] = points_[-1][0]
+    return result_
+
+def saveReproducer(out_dir, result_, make_source):
+    file_ = os.path.join(out_dir, f"{result_['TARGET']}-{result_['AXIS']}-n{result_['MIN_SIZE']}.py")
+    with open(file_, 'w') as f:
+        f.write(make_source(result_['MIN_SIZE']))
+    return file_
+
+def runPerfFuzz(targets, out_dir, time_budget=2.0, mem_budget=256 * 1024 * 1024, start_n=16, max_n=65536, axes=None):
+    os.makedirs(out_dir, exist_ok=True)
+    budgets = {'seconds': time_budget, 'bytes': mem_budget}
+    saved_stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings('ignore', category=SyntaxWarning)
+    results_ = []
+    try:
+        for target_name, target_fn in targets:
+            for axis_name in axes or GROWTH_AXES:
+                make_source = GROWTH_AXES[axis_name]
+                result_ = probeAxis(target_name, target_fn, axis_name, make_source, budgets, start_n, max_n)
+                if result_['FLAGGED']:
+                    result_['REPRODUCER'] = saveReproducer(out_dir, result_, make_source)
+                results_.append(result_)
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved_stdout
+        logging.disable(logging.NOTSET)
+    with open(os.path.join(out_dir, 'perf_report.json'), 'w') as f:
+        json.dump(results_, f, indent=2)
+    return results_
+
+def formatPerfReport(results_):
+    lines_ = []
+    for result_ in results_:
+        largest_ = result_['POINTS'][-1]
+        status_ = 'FLAGGED' if result_['FLAGGED'] else 'ok'
+        line_ = (f"{status_:7} {result_['TARGET']:28} {result_['AXIS']:18} exponent={result_['EXPONENT']} "
+                 f"largest n={largest_[0]} {largest_[1]}s {largest_[2] // 1024}KiB")
+        if result_['BREACH']:
+            line_ += f" | budget broken at n={result_['BREACH']['SIZE']}"
+            if result_['BREACH']['ERROR']:
+                line_ += f" ({result_['BREACH']['ERROR']})"
+        if result_.get('REPRODUCER'):
+            line_ += f" -> {result_['REPRODUCER']}"
+        lines_.append(line_)
+    return '\n'.join(lines_)
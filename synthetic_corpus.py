@@ -0,0 +1,191 @@
+"""
+Deterministic synthetic corpus for benchmarks and tests.
+
+Writes one folder per repo (the mining.cloneRepos layout that
+scanner.iterCorpusFiles walks) holding .py files and notebooks. File counts
+and line counts are drawn from log-normal distributions, statements are
+nested in def/for/if/with blocks up to a maximum depth, and rule call sites
+(torch.load, gym.make, env.step, logging.info, ...) are planted with a
+per-line probability each. The same seed always gives the same bytes.
+
+The matching V5 results CSV holds the planted call sites per event
+category. These are counts by construction, not lint_engine output: a
+detector may match a site under more than one rule.
+
+    python synthetic_corpus.py OUT_DIR --repos 20 --seed 7
+"""
+
+import os
+import sys
+import csv
+import json
+import math
+import random
+import argparse
+
+EVENT_CATEGORIES = ['DATA_LOAD_COUNT', 'MODEL_LOAD_COUNT', 'DATA_DOWNLOAD_COUNT', 'MODEL_LABEL_COUNT',
+                    'MODEL_OUTPUT_COUNT', 'DATA_PIPELINE_COUNT', 'ENVIRONMENT_COUNT', 'STATE_OBSERVE_COUNT']
+RESULTS_HEADER = ['REPO_FULL_PATH', 'FILE_FULL_PATH'] + EVENT_CATEGORIES + ['TOTAL_EVENT_COUNT']
+
+# call site -> (statement template, event categories the site belongs to)
+RULE_SITES = {
+    'torch.load': ("{v} = torch.load({a})", ('DATA_LOAD_COUNT',)),
+    'pickle.load': ("{v} = pickle.load({a})", ('DATA_LOAD_COUNT',)),
+    'pd.read_csv': ("{v} = pd.read_csv({a})", ('DATA_LOAD_COUNT',)),
+    'model.load_state_dict': ("model.load_state_dict({a})", ('MODEL_LOAD_COUNT',)),
+    'wget.download': ("wget.download({s})", ('DATA_DOWNLOAD_COUNT',)),
+    'data.show_data_summary': ("data.show_data_summary({a})", ('MODEL_OUTPUT_COUNT',)),
+    'argparse.ArgumentParser': ("parser = argparse.ArgumentParser(description={s})", ('DATA_PIPELINE_COUNT',)),
+    'gym.make': ("{v} = gym.make({s})", ('ENVIRONMENT_COUNT',)),
+    'env.step': ("{v}, reward, done, info = env.step({a})", ('ENVIRONMENT_COUNT', 'STATE_OBSERVE_COUNT')),
+    'logging.info': ("logging.info({s}, {a})", ()),
+}
+DEFAULT_DENSITY = {'torch.load': 0.02, 'gym.make': 0.005, 'env.step': 0.01, 'logging.info': 0.03,
+                   'pickle.load': 0.005, 'argparse.ArgumentParser': 0.002}
+
+IMPORT_LINES = ["import os", "import logging", "import pickle", "import torch", "import gym",
+                "import pandas as pd", "import argparse", "import wget"]
+BLOCK_HEADERS = ["def step_{n}({a}, {b}):", "for {v} in {a}:", "if {a} is not None:", "with open({a}) as {v}:"]
+FILLER_LINES = ["{v} = {a} + {n}", "{v} = helper_{n}({a}, {b})", "{v} = [{a}, {b}, {n}]",
+                "{v} = {a}.{b}", "{v} = '{s_raw}'", "# {s_raw}", "{v} += {n}"]
+WORDS = ['path', 'batch', 'model', 'data', 'state', 'action', 'config', 'item', 'score', 'value', 'buffer', 'label']
+
+class CorpusGenerator:
+    def __init__(self, seed=0, median_lines=120, line_sigma=1.0, min_lines=5, max_lines=5000, max_depth=3,
+                 hit_density=None):
+        self.rng = random.Random(seed)
+        self.median_lines = median_lines
+        self.line_sigma = line_sigma
+        self.min_lines = min_lines
+        self.max_lines = max_lines
+        self.max_depth = max_depth
+        self.hit_density = DEFAULT_DENSITY if hit_density is None else hit_density
+
+    def lineCount(self):
+        count_ = self.rng.lognormvariate(math.log(self.median_lines), self.line_sigma)
+        return int(min(self.max_lines, max(self.min_lines, count_)))
+
+    def fill(self, template):
+        rng = self.rng
+        return template.format(v=rng.choice(WORDS) + '_' + str(rng.randrange(100)), a=rng.choice(WORDS),
+                               b=rng.choice(WORDS), n=rng.randrange(1000), s=repr(rng.choice(WORDS) + ' %s'),
+                               s_raw=' '.join(rng.choices(WORDS, k=3)))
+
+    def plantedSite(self):
+        # at most one rule site per line, picked in proportion to the densities
+        roll_ = self.rng.random()
+        for site_, density_ in self.hit_density.items():
+            if roll_ < density_:
+                return site_
+            roll_ -= density_
+        return None
+
+    def moduleLines(self, lines):
+        # returns (indent, text) pairs and the planted sites; every opened block gets a body
+        body_, hits_ = [], dict.fromkeys(EVENT_CATEGORIES, 0)
+        site_counts = dict.fromkeys(self.hit_density, 0)
+        for import_ in self.rng.sample(IMPORT_LINES, k=min(len(IMPORT_LINES), 4)):
+            body_.append((0, import_))
+        depth_, need_body = 0, False
+        while len(body_) < lines or need_body:
+            if not need_body and depth_ < self.max_depth and self.rng.random() < 0.08:
+                body_.append((depth_, self.fill(self.rng.choice(BLOCK_HEADERS))))
+                depth_, need_body = depth_ + 1, True
+                continue
+            if not need_body and depth_ > 0 and self.rng.random() < 0.1:
+                depth_ -= 1
+                continue
+            site_ = self.plantedSite()
+            if site_ is None:
+                body_.append((depth_, self.fill(self.rng.choice(FILLER_LINES))))
+            else:
+                template_, categories_ = RULE_SITES[site_]
+                body_.append((depth_, self.fill(template_)))
+                site_counts[site_] += 1
+                for category_ in categories_:
+                    hits_[category_] += 1
+            need_body = need_body and body_[-1][1].startswith('#')
+        return body_, hits_, site_counts
+
+    def pythonFile(self, lines):
+        body_, hits_, site_counts = self.moduleLines(lines)
+        return ''.join('    ' * indent_ + text_ + '\n' for indent_, text_ in body_), hits_, site_counts
+
+    def notebookFile(self, lines):
+        # code cells split at top-level statements, with markdown and magics in between
+        body_, hits_, site_counts = self.moduleLines(lines)
+        cells_, current_ = [], []
+        for indent_, text_ in body_:
+            if indent_ == 0 and len(current_) >= 8 and not current_[-1].rstrip().endswith(':'):
+                cells_.append(current_)
+                current_ = []
+            current_.append('    ' * indent_ + text_ + '\n')
+        cells_.append(current_)
+        notebook_cells = []
+        for i_, cell_lines in enumerate(cells_):
+            if i_ % 3 == 0:
+                notebook_cells.append({'cell_type': 'markdown', 'metadata': {}, 'source': [f"## Step {i_}\n"]})
+            if i_ == 0:
+                cell_lines = ['%matplotlib inline\n'] + cell_lines
+            notebook_cells.append({'cell_type': 'code', 'execution_count': None, 'metadata': {}, 'outputs': [],
+                                   'source': cell_lines})
+        notebook_ = {'cells': notebook_cells, 'metadata': {}, 'nbformat': 4, 'nbformat_minor': 4}
+        return json.dumps(notebook_, indent=1) + '\n', hits_, site_counts
+
+def generateCorpus(out_dir, repos=10, files_per_repo=20, notebook_ratio=0.1, seed=0, **generator_options):
+    # returns the manifest: one dict per written file
+    generator_ = CorpusGenerator(seed, **generator_options)
+    manifest_ = []
+    for r_ in range(repos):
+        repo_path = os.path.join(out_dir, f"synth@repo{r_:03}")
+        file_count = max(1, int(generator_.rng.lognormvariate(math.log(files_per_repo), 0.5)))
+        for f_ in range(file_count):
+            lines_ = generator_.lineCount()
+            sub_dir = os.path.join(repo_path, *generator_.rng.sample(['src', 'models', 'utils', 'envs'], k=generator_.rng.randrange(3)))
+            if generator_.rng.random() < notebook_ratio:
+                content_, hits_, site_counts = generator_.notebookFile(lines_)
+                file_path = os.path.join(sub_dir, f"notebook_{f_}.ipynb")
+            else:
+                content_, hits_, site_counts = generator_.pythonFile(lines_)
+                file_path = os.path.join(sub_dir, f"module_{f_}.py")
+            os.makedirs(sub_dir, exist_ok=True)
+            with open(file_path, 'w') as f:
+                f.write(content_)
+            # LINES counts the file as written (frequency.getAllSLOC reads notebooks as raw JSON)
+            manifest_.append({'REPO': repo_path, 'FILE': file_path, 'LINES': content_.count('\n'), 'BYTES': len(content_),
+                              'HITS': hits_, 'SITES': site_counts})
+    return manifest_
+
+def dumpResultsCsv(manifest_, results_file):
+    with open(results_file, 'w', newline='') as fileToWrite:
+        writer = csv.writer(fileToWrite)
+        writer.writerow(RESULTS_HEADER)
+        for entry_ in manifest_:
+            counts_ = [entry_['HITS'][category_] for category_ in EVENT_CATEGORIES]
+            writer.writerow([entry_['REPO'], entry_['FILE']] + counts_ + [sum(counts_)])
+    return results_file
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('out_dir')
+    parser.add_argument('--repos', type=int, default=10)
+    parser.add_argument('--files-per-repo', type=int, default=20)
+    parser.add_argument('--median-lines', type=int, default=120)
+    parser.add_argument('--max-depth', type=int, default=3)
+    parser.add_argument('--notebook-ratio', type=float, default=0.1)
+    parser.add_argument('--density', action='append', default=[], metavar='SITE=P',
+                        help=f"per-line probability of a rule site, e.g. torch.load=0.05 (sites: {', '.join(RULE_SITES)})")
+    parser.add_argument('--seed', type=int, default=0)
+    opts = parser.parse_args()
+
+    density_ = dict(DEFAULT_DENSITY)
+    for option_ in opts.density:
+        site_, _, probability_ = option_.partition('=')
+        if site_ not in RULE_SITES:
+            sys.exit(f"Unknown rule site {site_}")
+        density_[site_] = float(probability_)
+    corpus_ = generateCorpus(opts.out_dir, opts.repos, opts.files_per_repo, opts.notebook_ratio, opts.seed,
+                             median_lines=opts.median_lines, max_depth=opts.max_depth, hit_density=density_)
+    dumpResultsCsv(corpus_, os.path.join(opts.out_dir, 'V5_OUTPUT_SYNTHETIC.csv'))
+    print(f"{len(corpus_)} files, {sum(e_['LINES'] for e_ in corpus_)} lines, "
+          f"{sum(e_['BYTES'] for e_ in corpus_) / 1e6:.2f} MB written to {opts.out_dir}")